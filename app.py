@@ -15,7 +15,11 @@ import os
 
 from server import create_app
 
-app = create_app()
+# Process-pool scan workers (server/library/scan_pool.py) re-import the main
+# script as __mp_main__. They only need the header parsing helpers, so skip
+# building a second app (database init, library sources) inside each worker.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 
 def _find_free_port(preferred, host):
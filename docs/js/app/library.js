@@ -19,7 +19,10 @@
     } = app.dom;
     const { escapeHtml, formatDate } = app.utils;
     const { getTransferSyntaxInfo } = app.dicom;
-    const { normalizeStudiesPayload } = app.sources;
+    const { normalizeStudiesPayload, readNdjsonEvents } = app.sources;
+
+    // Minimum time between list re-renders while a streamed scan is running
+    const STREAM_RENDER_INTERVAL_MS = 1000;
 
     // -- Reveal in Finder helpers --
 
@@ -356,6 +359,56 @@
         }
     }
 
+    // Rescan via the streaming endpoint, rendering studies as they are found.
+    // Resolves with the final payload (same shape as /api/library/refresh).
+    async function streamLibraryRefresh() {
+        const response = await notesApi.authenticatedFetch('/api/library/refresh/stream', { method: 'POST' });
+        if (!response.ok) {
+            const payload = await response.json().catch(() => ({}));
+            throw new Error(payload.error || `Failed to refresh library: ${response.status}`);
+        }
+
+        const partial = {};
+        let finalPayload = null;
+        let lastRender = 0;
+        await readNdjsonEvents(response, async (event) => {
+            if (event.type === 'study') {
+                partial[event.study.studyInstanceUid] = event.study;
+            } else if (event.type === 'series') {
+                const study = partial[event.studyInstanceUid];
+                if (study) {
+                    study.series.push(event.series);
+                    study.seriesCount = study.series.length;
+                }
+            } else if (event.type === 'progress') {
+                const scan = event.scan;
+                setLibraryFolderMessage(
+                    `Scanning library folder... ${scan.filesWalked} files found ` +
+                        `(${scan.filesParsed} parsed, ${scan.filesSkipped} skipped).`,
+                    'info',
+                );
+            } else if (event.type === 'error') {
+                throw new Error(event.error);
+            } else if (event.type === 'done') {
+                finalPayload = event;
+                return;
+            }
+
+            const now = Date.now();
+            if (event.type !== 'progress' && now - lastRender >= STREAM_RENDER_INTERVAL_MS) {
+                lastRender = now;
+                state.studies = normalizeStudiesPayload(
+                    { studies: Object.values(partial), available: true },
+                    '/api/library',
+                ).studies;
+                await displayStudies();
+            }
+        });
+
+        if (!finalPayload) throw new Error('Library scan ended unexpectedly');
+        return finalPayload;
+    }
+
     async function refreshLibrary() {
         if (state.libraryAbort) {
             state.libraryAbort.abort();
@@ -384,11 +437,8 @@
                 return;
             }
 
-            const response = await notesApi.authenticatedFetch('/api/library/refresh', { method: 'POST' });
-            const payload = await response.json();
-            if (!response.ok) {
-                throw new Error(payload.error || `Failed to refresh library: ${response.status}`);
-            }
+            const payload = await streamLibraryRefresh();
+            setLibraryFolderMessage('');
             const result = normalizeStudiesPayload(payload, '/api/library');
             state.libraryAvailable = !!result.available;
             if (result.folder) state.libraryFolder = result.folder;
@@ -935,6 +935,27 @@
         return normalizeStudiesPayload(payload, apiBase);
     }
 
+    // Call onEvent for each JSON line of an NDJSON response body, awaiting it
+    // before reading on so handlers can render between events.
+    async function readNdjsonEvents(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+            let newline = buffered.indexOf('\n');
+            while (newline >= 0) {
+                const line = buffered.slice(0, newline).trim();
+                buffered = buffered.slice(newline + 1);
+                if (line) await onEvent(JSON.parse(line));
+                newline = buffered.indexOf('\n');
+            }
+            if (done) break;
+        }
+        if (buffered.trim()) await onEvent(JSON.parse(buffered));
+    }
+
     async function loadDroppedStudies(items) {
         uploadProgress.style.display = 'flex';
         progressText.textContent = 'Reading folder...';
@@ -1513,6 +1534,7 @@
         readDesktopRenderHeaderDataSet,
         normalizeStudiesPayload,
         loadStudiesFromApi,
+        readNdjsonEvents,
         expandFrameSlices,
         getSliceDedupKey,
         getSliceCacheKey,
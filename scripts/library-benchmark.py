@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""Benchmarks for the personal-mode library scanner.
+
+Run from the repo root, for example:
+
+    python scripts/library-benchmark.py engines --copies 8
+    python scripts/library-benchmark.py engines --folder ~/DICOMs --workers 8 --chunk-size 128
+    python scripts/library-benchmark.py headers --private-elements 4000 --private-kb 512
+    python scripts/library-benchmark.py memory --slices 1000000
+    python scripts/library-benchmark.py series-keys --series 2000 --collide-every 4
+    python scripts/library-benchmark.py --copies 4 serve --clients 8
+    python scripts/library-benchmark.py --folder /mnt/nas/DICOMs scroll --scroll-ms 30
+
+Without --folder, a synthetic corpus is built in a temp directory from the
+sample MRI in docs/sample-mri (one subfolder per copy).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+SAMPLE_DIR = REPO_ROOT / "docs" / "sample-mri"
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def build_corpus(target: pathlib.Path, copies: int) -> int:
+    """Copy the sample MRI *copies* times under *target*. Returns the file count."""
+    sources = sorted(SAMPLE_DIR.glob("*.dcm"))
+    for copy_index in range(copies):
+        copy_dir = target / f"copy-{copy_index:03d}"
+        copy_dir.mkdir(parents=True, exist_ok=True)
+        for source in sources:
+            shutil.copyfile(source, copy_dir / source.name)
+    return len(sources) * copies
+
+
+def time_runs(label: str, func: Callable[[], int], repeat: int, file_count: int) -> dict:
+    """Run *func* once to warm caches, then *repeat* timed runs."""
+    func()
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    best = min(durations)
+    median = statistics.median(durations)
+    result = {
+        "label": label,
+        "best_s": best,
+        "median_s": median,
+        "files_per_s": file_count / best if best else float("inf"),
+    }
+    print(
+        f"{label:<28} best {best:8.3f}s  median {median:8.3f}s  "
+        f"{result['files_per_s']:10.0f} files/s"
+    )
+    return result
+
+
+def count_files(folder: pathlib.Path) -> int:
+    return sum(1 for path in folder.rglob("*") if path.is_file())
+
+
+def bench_engines(args: argparse.Namespace, folder: pathlib.Path) -> None:
+    """Compare thread and process scan engines on the same folder."""
+    from server.routes.library import scan_dicom_folder
+
+    file_count = count_files(folder)
+    print(f"Scanning {file_count} files in {folder}")
+
+    def run(engine: str) -> Callable[[], int]:
+        def scan() -> int:
+            studies = scan_dicom_folder(
+                str(folder), engine=engine, workers=args.workers, chunk_size=args.chunk_size
+            )
+            return sum(study.image_count for study in studies.values())
+
+        return scan
+
+    for engine in ("thread", "process"):
+        time_runs(f"engine={engine}", run(engine), args.repeat, file_count)
+
+
+def add_private_tags(folder: pathlib.Path, elements: int, blob_kb: int) -> None:
+    """Rewrite every file under *folder* with vendor-style private data.
+
+    Half of *elements* short private elements go in group 0x0019, ahead of the
+    study and series tags like vendor acquisition groups; the rest go in group
+    0x0043. One *blob_kb* private OB value goes in group 0x0029, like a
+    Siemens CSA header.
+    """
+    import pydicom
+
+    for path in sorted(p for p in folder.rglob("*") if p.is_file()):
+        ds = pydicom.dcmread(path)
+        for group, count in ((0x0019, elements // 2), (0x0043, elements - elements // 2)):
+            for start in range(0, count, 0x100):
+                block = ds.private_block(group, f"BENCH {start // 0x100}", create=True)
+                for offset in range(min(0x100, count - start)):
+                    block.add_new(offset, "LO", f"value {offset}")
+        csa = ds.private_block(0x0029, "BENCH CSA", create=True)
+        csa.add_new(0x10, "OB", bytes(blob_kb * 1024))
+        ds.save_as(path)
+
+
+def bench_headers(args: argparse.Namespace, folder: pathlib.Path) -> None:
+    """Compare full and selective header parsing on headers with heavy private tags."""
+    from server.library.headers import HEADER_MODES, scan_dicom_file
+
+    if not args.folder:
+        add_private_tags(folder, args.private_elements, args.private_kb)
+    paths = [str(path) for path in sorted(folder.rglob("*")) if path.is_file()]
+    print(f"Parsing {len(paths)} headers in {folder} (single thread)")
+
+    results = {}
+    for mode in HEADER_MODES:
+        results[mode] = [scan_dicom_file(path, mode) for path in paths]
+
+        def parse(mode: str = mode) -> int:
+            return sum(1 for path in paths if scan_dicom_file(path, mode)[0] is not None)
+
+        time_runs(f"header_mode={mode}", parse, args.repeat, len(paths))
+
+    if results["selective"] != results["full"]:
+        raise SystemExit("Selective and full header parsing disagree")
+
+
+def synthetic_metas(slices: int, slices_per_series: int, series_per_study: int) -> Iterator[dict]:
+    """Yield scan metadata dicts shaped like a real archive export."""
+    root = "/Volumes/Archive/DICOM"
+    for index in range(slices):
+        series_index = index // slices_per_series
+        study_index = series_index // series_per_study
+        study_uid = f"1.2.826.0.1.3680043.8.498.{study_index}"
+        series_uid = f"{study_uid}.{series_index % series_per_study + 1}"
+        slice_index = index % slices_per_series
+        yield {
+            "file_path": f"{root}/PATIENT{study_index:06d}/STUDY1/SERIES{series_index:07d}/"
+            f"IM{slice_index:05d}.dcm",
+            "patient_name": f"PATIENT^{study_index}",
+            "patient_id": f"PID{study_index:06d}",
+            "study_date": "20240131",
+            "study_description": "MRI BRAIN WITH AND WITHOUT CONTRAST",
+            "study_instance_uid": study_uid,
+            "series_description": f"AX T2 FLAIR {series_index % series_per_study}",
+            "series_instance_uid": series_uid,
+            "series_number": str(series_index % series_per_study + 1),
+            "modality": "MR",
+            "instance_number": slice_index + 1,
+            "slice_location": slice_index * 0.5 - 60.0,
+            "sop_instance_uid": f"{series_uid}.{slice_index + 1}",
+            "file_size": 526_000,
+            "file_mtime_ns": 1_706_700_000_000_000_000 + index,
+            "image_position": [-120.0, -120.0, slice_index * 0.5 - 60.0],
+            "image_orientation": [1.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+            "rows": 512,
+            "columns": 512,
+            "pixel_spacing": [0.46875, 0.46875],
+            "slice_thickness": 0.5,
+            "bits_allocated": 16,
+            "bits_stored": 12,
+            "pixel_representation": 0,
+            "photometric_interpretation": "MONOCHROME2",
+            "rescale_slope": None,
+            "rescale_intercept": None,
+            "window_center": 600.0,
+            "window_width": 1200.0,
+            "transfer_syntax_uid": "1.2.840.10008.1.2.1",
+        }
+
+
+# Per-slice fields kept by the compact catalog, held one dict per slice by
+# the baseline so both layouts store the same information.
+DICT_SLICE_KEYS = (
+    "file_path",
+    "instance_number",
+    "slice_location",
+    "image_position",
+    "image_orientation",
+    "rows",
+    "columns",
+    "pixel_spacing",
+    "slice_thickness",
+    "bits_allocated",
+    "bits_stored",
+    "pixel_representation",
+    "photometric_interpretation",
+    "rescale_slope",
+    "rescale_intercept",
+    "window_center",
+    "window_width",
+    "transfer_syntax_uid",
+    "frame_table",
+    "sop_instance_uid",
+    "file_size",
+    "file_mtime_ns",
+    "link_target",
+)
+
+
+def build_dict_studies(metas: Iterator[dict]) -> dict:
+    """The one-dict-per-slice tree the library cache used before catalog.py."""
+    studies: dict = {}
+    for meta in metas:
+        study = studies.setdefault(
+            meta["study_instance_uid"],
+            {
+                "study_id": meta["study_instance_uid"],
+                "patient_name": meta["patient_name"],
+                "patient_id": meta["patient_id"],
+                "study_date": meta["study_date"],
+                "study_description": meta["study_description"],
+                "modality": meta["modality"],
+                "series": {},
+                "image_count": 0,
+            },
+        )
+        series = study["series"].setdefault(
+            meta["series_instance_uid"],
+            {
+                "series_id": meta["series_instance_uid"],
+                "series_description": meta["series_description"],
+                "series_number": meta["series_number"],
+                "modality": meta["modality"],
+                "slices": [],
+            },
+        )
+        series["slices"].append({key: meta[key] for key in DICT_SLICE_KEYS if key in meta})
+        study["image_count"] += 1
+    return studies
+
+
+def build_compact_studies(metas: Iterator[dict]) -> dict:
+    from server.library.catalog import DirectoryTable
+    from server.routes.library import _add_to_studies, _finalize_studies
+
+    studies: dict = {}
+    directories = DirectoryTable()
+    for meta in metas:
+        _add_to_studies(studies, meta, directories)
+    _finalize_studies(studies)
+    return studies
+
+
+def bench_memory(args: argparse.Namespace, folder: pathlib.Path | None) -> None:
+    """Compare memory held by the dict-per-slice and compact library caches."""
+    import server.routes.library  # noqa: F401  (import outside the traced region)
+
+    print(
+        f"Building {args.slices} synthetic slices "
+        f"({args.slices_per_series} per series, {args.series_per_study} series per study)"
+    )
+    builders = (("dict-per-slice", build_dict_studies), ("compact", build_compact_studies))
+    for label, build in builders:
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        studies = build(
+            synthetic_metas(args.slices, args.slices_per_series, args.series_per_study)
+        )
+        elapsed = time.perf_counter() - started
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label:<16} held {held / 2**20:9.1f} MiB  peak {peak / 2**20:9.1f} MiB  "
+            f"{held / args.slices:7.1f} B/slice  built in {elapsed:6.2f}s"
+        )
+        del studies
+
+
+def pathological_metas(series: int, slices_per_series: int, collide_every: int) -> list[dict]:
+    """One study with many series, slices interleaved across them.
+
+    This is the arrival order of a dynamic perfusion or DTI acquisition
+    written one time point at a time. Every *collide_every*-th series UID is
+    shared by a second description, so those UIDs need composite keys.
+    """
+    study_uid = "1.2.826.0.1.3680043.8.498.1"
+    metas = []
+    for slice_index in range(slices_per_series):
+        for series_index in range(series):
+            descriptions = [f"DTI DIR {series_index}"]
+            if collide_every and series_index % collide_every == 0:
+                descriptions.append(f"DTI DIR {series_index} ADC")
+            for description in descriptions:
+                metas.append(
+                    {
+                        "file_path": f"/data/DTI/{description.replace(' ', '_')}/"
+                        f"IM{slice_index:05d}.dcm",
+                        "patient_name": "PATIENT^DTI",
+                        "patient_id": "PID000001",
+                        "study_date": "20240131",
+                        "study_description": "MRI BRAIN DTI",
+                        "study_instance_uid": study_uid,
+                        "series_description": description,
+                        "series_instance_uid": f"{study_uid}.{series_index + 1}",
+                        "series_number": str(series_index + 1),
+                        "modality": "MR",
+                        "instance_number": slice_index + 1,
+                        "slice_location": slice_index * 2.0,
+                    }
+                )
+    return metas
+
+
+def scan_resolve_series_key(
+    series_map: dict, bare_uid: str, description: str, _composite_uids: set
+) -> str:
+    """The resolver before the per-study composite UID index: scans every key."""
+    existing = series_map.get(bare_uid)
+    if existing:
+        existing_desc = existing.series_description or ""
+        if existing_desc == description:
+            return bare_uid
+        old_key = f"{bare_uid}|{existing_desc}"
+        series_map[old_key] = existing
+        existing.series_id = old_key
+        del series_map[bare_uid]
+        return f"{bare_uid}|{description}"
+
+    composite_key = f"{bare_uid}|{description}"
+    if composite_key in series_map:
+        return composite_key
+
+    has_collision = any(key.startswith(f"{bare_uid}|") for key in series_map)
+    return composite_key if has_collision else bare_uid
+
+
+def bench_series_keys(args: argparse.Namespace, folder: pathlib.Path | None) -> None:
+    """Compare study assembly with the key-scanning and indexed series resolvers."""
+    import server.routes.library as library
+
+    metas = pathological_metas(args.series, args.slices_per_series, args.collide_every)
+    print(f"Assembling {len(metas)} slices into one study of {args.series} series")
+    indexed = library._resolve_series_key
+    resolvers = (("key-scan", scan_resolve_series_key), ("indexed", indexed))
+    results = {}
+
+    def build() -> int:
+        return len(build_compact_studies(iter(metas)))
+
+    try:
+        for label, resolver in resolvers:
+            library._resolve_series_key = resolver
+            time_runs(label, build, args.repeat, len(metas))
+            studies = build_compact_studies(iter(metas))
+            results[label] = {
+                study_id: sorted((key, len(series.slices)) for key, series in study.series.items())
+                for study_id, study in studies.items()
+            }
+    finally:
+        library._resolve_series_key = indexed
+    if results["key-scan"] != results["indexed"]:
+        raise SystemExit("Key-scanning and indexed resolvers produced different series keys")
+
+
+def serve_library(folder: pathlib.Path, data_dir: str):
+    """Start the app on an ephemeral port with *folder* as its only library root."""
+    import logging
+    import os
+    import threading
+
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    os.environ["DICOM_LIBRARY"] = str(folder)
+    os.environ["DICOM_VIEWER_DATA_DIR"] = data_dir
+    from server import create_app
+
+    app = create_app()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return app, server
+
+
+def bench_serve(args: argparse.Namespace, folder: pathlib.Path) -> None:
+    """Concurrent series loads: one request per slice vs one batch request per series.
+
+    Every client loads every series, over a fresh connection per request like
+    the development server. The byte cache case keeps the whole corpus in
+    memory; the others run without it. The offload case only measures the
+    app's side of an X-Sendfile handoff; the proxy would send the bytes.
+    """
+    import http.client
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    from server.library.slice_cache import SliceByteCache
+    from server.routes import library as library_routes
+    from server.security import SESSION_TOKEN
+
+    with tempfile.TemporaryDirectory(prefix="library-bench-data-") as data_dir:
+        app, server = serve_library(folder, data_dir)
+        port = server.server_port
+        headers = {"X-Session-Token": SESSION_TOKEN}
+
+        def get(path: str) -> bytes:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    raise SystemExit(f"GET {path} returned {response.status}")
+                return body
+            finally:
+                connection.close()
+
+        studies = json.loads(get("/api/library/studies"))["studies"]
+        series_list = [
+            (study["studyInstanceUid"], series["seriesInstanceUid"], series["sliceCount"])
+            for study in studies
+            for series in study["series"]
+        ]
+        slice_count = sum(count for _, _, count in series_list)
+        print(
+            f"Serving {len(series_list)} series ({slice_count} slices) to "
+            f"{args.clients} concurrent clients"
+        )
+
+        def load_slices(study_id: str, series_id: str, count: int) -> int:
+            return sum(
+                len(get(f"/api/library/dicom/{study_id}/{series_id}/{index}"))
+                for index in range(count)
+            )
+
+        def load_batch(study_id: str, series_id: str, count: int) -> int:
+            return len(get(f"/api/library/dicom-batch/{study_id}/{series_id}?format=framed"))
+
+        def run(load: Callable[[str, str, int], int]) -> Callable[[], int]:
+            def client(_: int) -> int:
+                return sum(load(*series) for series in series_list)
+
+            def loads() -> int:
+                with ThreadPoolExecutor(args.clients) as pool:
+                    return sum(pool.map(client, range(args.clients)))
+
+            return loads
+
+        total_bytes = run(load_batch)()
+        print(f"{total_bytes / 2**20:.1f} MiB per run")
+        corpus_mb = max(256, 2 * total_bytes // args.clients // 2**20)
+        cases = (
+            ("per-slice", load_slices, None, 0),
+            ("per-slice byte cache", load_slices, None, corpus_mb),
+            ("per-slice x-sendfile", load_slices, "x-sendfile", 0),
+            ("batch", load_batch, None, 0),
+        )
+        for label, load, offload, cache_mb in cases:
+            app.config["SLICE_OFFLOAD"] = offload
+            library_routes.slice_bytes = SliceByteCache(max_bytes=cache_mb * 2**20)
+            result = time_runs(label, run(load), args.repeat, slice_count * args.clients)
+            if not offload:
+                print(f"{'':<28} {total_bytes / 2**20 / result['best_s']:8.1f} MiB/s")
+            if cache_mb:
+                stats = library_routes.slice_bytes.stats()
+                print(f"{'':<28} {stats['hits']} hits, {stats['misses']} misses")
+        app.config["SLICE_OFFLOAD"] = None
+        server.shutdown()
+
+
+def evict_page_cache(folder: pathlib.Path) -> None:
+    """Drop the cached pages of every file under *folder* (Linux), so reads start cold."""
+    import os
+
+    # Dirty pages of a freshly built corpus are not dropped until written back.
+    os.sync()
+    for path in folder.rglob("*"):
+        if path.is_file():
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def bench_scroll(args: argparse.Namespace, folder: pathlib.Path) -> None:
+    """Scrolling through cold series one slice at a time, without and with read-ahead.
+
+    One client requests every slice of every series in order, pausing
+    --scroll-ms between requests like a reader scrolling, after the page
+    cache and the slice byte cache were emptied. Latency is per request; the
+    gain grows with the storage's latency, so point --folder at a network
+    share for meaningful numbers.
+    """
+    import http.client
+    import json
+    import os
+
+    from server.library.readahead import SliceReadAhead
+    from server.library.slice_cache import SliceByteCache
+    from server.routes import library as library_routes
+    from server.security import SESSION_TOKEN
+
+    if not hasattr(os, "posix_fadvise"):
+        raise SystemExit("The scroll benchmark needs os.posix_fadvise to empty the page cache")
+
+    with tempfile.TemporaryDirectory(prefix="library-bench-data-") as data_dir:
+        _, server = serve_library(folder, data_dir)
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        headers = {"X-Session-Token": SESSION_TOKEN}
+
+        def get(path: str) -> bytes:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise SystemExit(f"GET {path} returned {response.status}")
+            return body
+
+        studies = json.loads(get("/api/library/studies"))["studies"]
+        series_list = [
+            (study["studyInstanceUid"], series["seriesInstanceUid"], series["sliceCount"])
+            for study in studies
+            for series in study["series"]
+        ]
+        pause = args.scroll_ms / 1000
+        print(
+            f"Scrolling {len(series_list)} series "
+            f"({sum(count for _, _, count in series_list)} slices), {args.scroll_ms} ms per slice"
+        )
+        for label, max_window in (("no read-ahead", 0), ("read-ahead", args.window)):
+            library_routes.slice_readahead = SliceReadAhead(max_window=max_window)
+            latencies = []
+            for _ in range(args.repeat):
+                evict_page_cache(folder)
+                library_routes.slice_bytes = SliceByteCache()
+                for study_id, series_id, count in series_list:
+                    for index in range(count):
+                        start = time.perf_counter()
+                        get(f"/api/library/dicom/{study_id}/{series_id}/{index}")
+                        latencies.append(time.perf_counter() - start)
+                        time.sleep(pause)
+            latencies.sort()
+            print(
+                f"{label:<28} mean {statistics.mean(latencies) * 1000:7.2f} ms   "
+                f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.2f} ms"
+            )
+        connection.close()
+        server.shutdown()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Library scanner benchmarks.")
+    parser.add_argument(
+        "--folder",
+        help="Existing DICOM folder to benchmark. Default: synthetic copies of docs/sample-mri.",
+    )
+    parser.add_argument(
+        "--copies",
+        type=int,
+        default=8,
+        help="Number of sample MRI copies in the synthetic corpus. Default: 8",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case. Default: 3")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    engines = subparsers.add_parser("engines", help="Thread vs process scan engine.")
+    engines.add_argument("--workers", type=int, help="Worker count. Default: engine default")
+    engines.add_argument("--chunk-size", type=int, help="Paths per process-pool task.")
+    engines.set_defaults(func=bench_engines)
+
+    headers = subparsers.add_parser("headers", help="Full vs selective header parsing.")
+    headers.add_argument(
+        "--private-elements",
+        type=int,
+        default=2000,
+        help="Private elements added to each synthetic header. Default: 2000",
+    )
+    headers.add_argument(
+        "--private-kb",
+        type=int,
+        default=256,
+        help="Size of the private blob added to each synthetic header. Default: 256",
+    )
+    headers.set_defaults(func=bench_headers)
+
+    memory = subparsers.add_parser("memory", help="Dict-per-slice vs compact library cache.")
+    memory.add_argument(
+        "--slices", type=int, default=200_000, help="Synthetic slices. Default: 200000"
+    )
+    memory.add_argument("--slices-per-series", type=int, default=200, help="Default: 200")
+    memory.add_argument("--series-per-study", type=int, default=8, help="Default: 8")
+    memory.set_defaults(func=bench_memory, needs_corpus=False)
+
+    series_keys = subparsers.add_parser(
+        "series-keys", help="Series key resolution on a study with many series."
+    )
+    series_keys.add_argument("--series", type=int, default=1000, help="Default: 1000")
+    series_keys.add_argument("--slices-per-series", type=int, default=30, help="Default: 30")
+    series_keys.add_argument(
+        "--collide-every",
+        type=int,
+        default=4,
+        help="Give every Nth series UID a second description (0 disables). Default: 4",
+    )
+    series_keys.set_defaults(func=bench_series_keys, needs_corpus=False)
+
+    serve = subparsers.add_parser("serve", help="Concurrent series loads over HTTP.")
+    serve.add_argument("--clients", type=int, default=4, help="Concurrent clients. Default: 4")
+    serve.set_defaults(func=bench_serve)
+
+    scroll = subparsers.add_parser("scroll", help="Cold sequential scrolling with read-ahead.")
+    scroll.add_argument(
+        "--scroll-ms", type=float, default=30, help="Pause between slices. Default: 30"
+    )
+    scroll.add_argument(
+        "--window", type=int, default=32, help="Read-ahead window in slices. Default: 32"
+    )
+    scroll.set_defaults(func=bench_scroll)
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not getattr(args, "needs_corpus", True):
+        args.func(args, None)
+        return
+    if args.folder:
+        args.func(args, pathlib.Path(args.folder).expanduser())
+        return
+
+    with tempfile.TemporaryDirectory(prefix="library-bench-") as temp_dir:
+        folder = pathlib.Path(temp_dir)
+        build_corpus(folder, args.copies)
+        args.func(args, folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,11 @@ from flask import Flask, jsonify
 
 from server import db as db_module
 from server.audit import audit_after_request
+from server.library.serving import (
+    DEFAULT_ACCEL_PREFIX,
+    DEFAULT_SLICE_CACHE_CONTROL,
+    SLICE_OFFLOAD_MODES,
+)
 from server.maintenance import run_startup_maintenance
 from server.routes.auth import auth_bp
 from server.routes.comments import comments_bp
@@ -50,6 +55,21 @@ def _env_flag(name, default=False):
     return value.strip().lower() in {'1', 'true', 'yes', 'on'}
 
 
+def _configure_slice_serving(app):
+    """Configure the cache policy and optional proxy handoff of DICOM slice responses."""
+    mode = (os.environ.get('DICOM_SLICE_OFFLOAD') or '').strip().lower()
+    if mode and mode not in SLICE_OFFLOAD_MODES:
+        app.logger.warning('Ignoring unknown DICOM_SLICE_OFFLOAD value: %s', mode)
+        mode = ''
+    app.config['SLICE_OFFLOAD'] = mode or None
+    app.config['SLICE_OFFLOAD_PREFIX'] = (
+        os.environ.get('DICOM_SLICE_OFFLOAD_PREFIX') or DEFAULT_ACCEL_PREFIX
+    )
+    app.config['SLICE_CACHE_CONTROL'] = (
+        os.environ.get('DICOM_SLICE_CACHE_CONTROL') or ''
+    ).strip() or DEFAULT_SLICE_CACHE_CONTROL
+
+
 def create_app():
     """Flask application factory. Returns a fully configured app instance."""
     app = Flask(
@@ -61,6 +81,7 @@ def create_app():
     app.root_path = _PROJECT_ROOT
     app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50 MB upload limit
     app.config['TRUST_X_FORWARDED_FOR'] = _env_flag('TRUST_X_FORWARDED_FOR', False)
+    _configure_slice_serving(app)
 
     # Initialize database paths and schema
     db_module.configure(app.root_path)
@@ -21,6 +21,7 @@ DATA_DIR = None
 DB_PATH = None
 REPORTS_DIR = None
 SETTINGS_PATH = None
+LIBRARY_INDEX_PATH = None
 
 REPORT_TYPE_MAP = {
     'pdf': ('pdf', 'pdf', 'application/pdf'),
@@ -50,12 +51,15 @@ _SQLITE_COLUMN_DEFINITION_RE = re.compile(r"^[A-Z]+(?: [A-Z]+)*(?: DEFAULT (?:''
 
 def configure(app_root_path):
     """Set database paths based on app root. Called once from create_app()."""
-    global DATA_DIR, DB_PATH, REPORTS_DIR, SETTINGS_PATH
+    global DATA_DIR, DB_PATH, REPORTS_DIR, SETTINGS_PATH, LIBRARY_INDEX_PATH
 
     DATA_DIR = os.environ.get('DICOM_VIEWER_DATA_DIR', os.path.join(app_root_path, 'data'))
     DB_PATH = os.path.join(DATA_DIR, 'viewer.db')
     REPORTS_DIR = os.path.join(DATA_DIR, 'reports')
     SETTINGS_PATH = os.path.join(DATA_DIR, 'settings.json')
+    # Library scan index lives in its own file so long scans never contend
+    # with notes/sync writes on viewer.db.
+    LIBRARY_INDEX_PATH = os.path.join(DATA_DIR, 'library-index.db')
 
 
 def _ensure_data_dirs():
@@ -0,0 +1,9 @@
+"""
+Library scanning engine: persistent scan index and supporting machinery.
+
+The /api/library routes in server/routes/library.py own the study/series
+cache (DicomFolderSource). This package holds the pieces that cache is built
+from so the route module stays focused on request handling.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
@@ -0,0 +1,111 @@
+"""
+Streaming bodies for batch slice downloads.
+
+A viewer opening a series otherwise fetches it one slice per request, each
+paying the session, CSRF and audit hooks and a path check. A batch response
+carries a range of slices in one body instead, in one of two encodings:
+
+multipart
+    multipart/mixed, one part per slice with Content-Type application/dicom,
+    Content-Length and X-Slice-Index headers. A slice that cannot be read is
+    an application/json part holding {"error": ...}.
+
+framed
+    application/octet-stream, each slice preceded by a 12-byte big-endian
+    header: the slice index (uint32) and the byte length (uint64). A slice
+    that cannot be read has length 0 (DICOM files are never empty).
+
+Parts are opened by the caller's *open_slice* (see
+server.library.serving.open_cached_slice), so they come from the slice byte
+cache or the open-file cache like single slices do, and are streamed in
+blocks (FileRange) rather than read whole: a batch holds one block in
+memory, not one file. A part's length is the file's size when it is opened.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import json
+import struct
+
+from server.library.serving import FileRange
+
+BATCH_FORMATS = ('multipart', 'framed')
+DEFAULT_BATCH_FORMAT = 'multipart'
+
+FRAMED_MEDIA_TYPE = 'application/octet-stream'
+_FRAME_HEADER = struct.Struct('>IQ')
+
+READ_ERROR = 'Failed to read DICOM file'
+
+
+def _open_part(open_slice, file_path):
+    """Return (body, length) for one part, or None if *file_path* cannot be read.
+
+    *open_slice(file_path)* returns (opened, size) and raises OSError. The
+    body is a FileRange; close it when done.
+    """
+    if file_path is None:
+        return None
+    try:
+        opened, size = open_slice(file_path)
+    except OSError:
+        return None
+    if not size:
+        opened.release()
+        return None
+    return FileRange(opened, 0, size), size
+
+
+def multipart_media_type(boundary):
+    return f'multipart/mixed; boundary={boundary}'
+
+
+def _part_header(delimiter, content_type, length, index):
+    return (
+        f'{delimiter}Content-Type: {content_type}\r\n'
+        f'Content-Length: {length}\r\n'
+        f'X-Slice-Index: {index}\r\n\r\n'
+    ).encode('ascii')
+
+
+def iter_multipart(slices, boundary, open_slice):
+    """Yield a multipart/mixed body for *slices*, (index, safe path or None) pairs.
+
+    *open_slice(file_path)* returns an open part and its size; see
+    server.library.serving.open_cached_slice.
+    """
+    delimiter = f'--{boundary}\r\n'
+    for index, file_path in slices:
+        part = _open_part(open_slice, file_path)
+        if part is None:
+            error = json.dumps({'error': READ_ERROR}).encode()
+            yield _part_header(delimiter, 'application/json', len(error), index)
+            yield error
+        else:
+            body, length = part
+            try:
+                yield _part_header(delimiter, 'application/dicom', length, index)
+                yield from body
+            finally:
+                body.close()
+        yield b'\r\n'
+    yield f'--{boundary}--\r\n'.encode('ascii')
+
+
+def iter_framed(slices, open_slice):
+    """Yield a length-prefixed body for *slices*, (index, safe path or None) pairs.
+
+    *open_slice* opens each part, as for iter_multipart().
+    """
+    pack = _FRAME_HEADER.pack
+    for index, file_path in slices:
+        part = _open_part(open_slice, file_path)
+        if part is None:
+            yield pack(index, 0)
+            continue
+        body, length = part
+        try:
+            yield pack(index, length)
+            yield from body
+        finally:
+            body.close()
@@ -0,0 +1,34 @@
+"""
+Cooperative cancellation for library scans.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import threading
+
+
+class ScanCancelledError(Exception):
+    """Raised from inside a scan whose CancelToken was cancelled."""
+
+
+class CancelToken:
+    """Flag shared between the owner of a scan and the scan itself.
+
+    The owner calls cancel(); the scan polls check() between units of work
+    (one directory entry, one parse result) and unwinds promptly.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise ScanCancelledError if the token has been cancelled."""
+        if self._event.is_set():
+            raise ScanCancelledError()
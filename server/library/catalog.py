@@ -0,0 +1,483 @@
+"""
+Compact in-memory representation of a scanned library.
+
+A library with a million slices held as one dict per slice (full path string,
+boxed int and float) costs gigabytes. Here each series stores its slices as
+columns instead: an index into a per-snapshot table of interned directory
+prefixes, the file's base name, typed arrays for instance number, slice
+location and image position, the file validators recorded at scan time,
+and an id into the series' interned geometry tuples. Studies and series are
+__slots__ records.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import itertools
+import math
+import os
+import sys
+import time
+from array import array
+
+_SEPARATORS = (os.sep, os.altsep) if os.altsep else (os.sep,)
+
+# Size estimates: an empty str object, and a study or series record together
+# with its dict entry and short string fields.
+_STR_BYTES = sys.getsizeof('')
+_RECORD_BYTES = 512
+
+# Process-wide source of snapshot generations (see Snapshot). Seeded from the
+# clock in microseconds, so generations also keep increasing across restarts
+# and a generation a client held on to is never reused for other content.
+_generations = itertools.count(time.time_ns() // 1000)
+
+
+class DirectoryTable:
+    """Interned directory prefixes shared by every series of one snapshot.
+
+    Prefixes keep their trailing separator, so prefix + name reproduces the
+    original path exactly. The table only grows; a new scan starts a new one.
+    """
+
+    __slots__ = ('_prefixes', '_ids')
+
+    def __init__(self):
+        self._prefixes = []
+        self._ids = {}
+
+    def intern(self, prefix):
+        prefix_id = self._ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = len(self._prefixes)
+            self._prefixes.append(prefix)
+            self._ids[prefix] = prefix_id
+        return prefix_id
+
+    def __getitem__(self, prefix_id):
+        return self._prefixes[prefix_id]
+
+    def __len__(self):
+        return len(self._prefixes)
+
+    def nbytes(self):
+        """Approximate bytes held by the table."""
+        prefixes = self._prefixes
+        return (
+            sys.getsizeof(prefixes)
+            + sys.getsizeof(self._ids)
+            + len(prefixes) * _STR_BYTES
+            + sum(map(len, prefixes))
+        )
+
+
+def _split_path(file_path):
+    cut = max(file_path.rfind(separator) for separator in _SEPARATORS) + 1
+    return file_path[:cut], file_path[cut:]
+
+
+_NO_POSITION = (math.nan, math.nan, math.nan)
+# (SOP Instance UID hash, size, mtime_ns) of a slice scanned without them
+_NO_FILE_STAT = (0, 0, -1)
+
+
+class SliceColumns:
+    """The slices of one series, stored column-wise.
+
+    Besides the file and sort keys, each slice has its ImagePositionPatient
+    (three doubles, NaN when absent) and the id of its geometry tuple: the
+    remaining geometry and display attributes (see server.library.geometry),
+    interned per series because its slices nearly always share one.
+    Multi-frame slices also have a FrameTable (see server.library.frames).
+    The file's size and mtime at scan time and a 64-bit hash of its SOP
+    Instance UID make up its HTTP validators (see server.library.serving).
+    Symlinked slices also have their resolved target, recorded at scan time.
+    """
+
+    __slots__ = (
+        'directories',
+        'prefix_ids',
+        'names',
+        'instance_numbers',
+        'slice_locations',
+        'positions',
+        'geometries',
+        'geometry_ids',
+        'frame_tables',
+        'sop_hashes',
+        'sizes',
+        'mtimes',
+        'link_targets',
+    )
+
+    def __init__(self, directories):
+        self.directories = directories
+        self.prefix_ids = array('I')
+        self.names = []
+        self.instance_numbers = array('q')
+        self.slice_locations = array('d')
+        self.positions = array('d')
+        # Geometry tuple -> id, in id order
+        self.geometries = {}
+        self.geometry_ids = array('I')
+        # Slice index -> FrameTable, for multi-frame slices only
+        self.frame_tables = {}
+        self.sop_hashes = array('Q')
+        self.sizes = array('Q')
+        self.mtimes = array('q')
+        # Slice index -> resolved path, for symlinked files only
+        self.link_targets = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(
+        self,
+        file_path,
+        instance_number,
+        slice_location,
+        position=None,
+        geometry=(),
+        frame_table=None,
+        file_stat=None,
+        link_target=None,
+    ):
+        prefix, name = _split_path(file_path)
+        self.prefix_ids.append(self.directories.intern(prefix))
+        self.names.append(name)
+        self.instance_numbers.append(instance_number)
+        self.slice_locations.append(slice_location)
+        self.positions.extend(position or _NO_POSITION)
+        geometry_id = self.geometries.get(geometry)
+        if geometry_id is None:
+            geometry_id = self.geometries[geometry] = len(self.geometries)
+        self.geometry_ids.append(geometry_id)
+        if frame_table is not None:
+            self.frame_tables[len(self.names) - 1] = frame_table
+        sop_hash, size, mtime_ns = file_stat or _NO_FILE_STAT
+        self.sop_hashes.append(sop_hash)
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        if link_target is not None:
+            self.link_targets[len(self.names) - 1] = link_target
+
+    def position(self, index):
+        """Return the ImagePositionPatient of slice *index*, or None."""
+        x, y, z = self.positions[index * 3 : index * 3 + 3]
+        return None if math.isnan(x) else (x, y, z)
+
+    def file_stat(self, index):
+        """Return (SOP Instance UID hash, size, mtime_ns) of slice *index* at scan time, or None."""
+        mtime_ns = self.mtimes[index]
+        if mtime_ns < 0:
+            return None
+        return self.sop_hashes[index], self.sizes[index], mtime_ns
+
+    def geometry_table(self):
+        """Return the interned geometry tuples as a list indexed by geometry id."""
+        return list(self.geometries)
+
+    def nbytes(self):
+        """Approximate bytes held by the columns, excluding the shared DirectoryTable."""
+        names = self.names
+        arrays = (
+            self.prefix_ids,
+            self.instance_numbers,
+            self.slice_locations,
+            self.positions,
+            self.geometry_ids,
+            self.sop_hashes,
+            self.sizes,
+            self.mtimes,
+        )
+        return (
+            sum(column.buffer_info()[1] * column.itemsize for column in arrays)
+            + sys.getsizeof(names)
+            + len(names) * _STR_BYTES
+            + sum(map(len, names))
+            + sys.getsizeof(self.geometries)
+            + sum(map(sys.getsizeof, self.geometries))
+            + sum(table.nbytes() for table in self.frame_tables.values())
+            + sys.getsizeof(self.link_targets)
+            + sum(map(sys.getsizeof, self.link_targets.values()))
+        )
+
+    def file_path(self, index):
+        return self.directories[self.prefix_ids[index]] + self.names[index]
+
+    def copy(self):
+        copied = SliceColumns(self.directories)
+        copied.prefix_ids = self.prefix_ids[:]
+        copied.names = self.names[:]
+        copied.instance_numbers = self.instance_numbers[:]
+        copied.slice_locations = self.slice_locations[:]
+        copied.positions = self.positions[:]
+        copied.geometries = dict(self.geometries)
+        copied.geometry_ids = self.geometry_ids[:]
+        # Frame tables are never mutated, so copies share them.
+        copied.frame_tables = dict(self.frame_tables)
+        copied.sop_hashes = self.sop_hashes[:]
+        copied.sizes = self.sizes[:]
+        copied.mtimes = self.mtimes[:]
+        copied.link_targets = dict(self.link_targets)
+        return copied
+
+    def sort(self):
+        """Order slices by (slice_location, instance_number), stable for ties."""
+        locations = self.slice_locations
+        instances = self.instance_numbers
+        order = sorted(range(len(self)), key=lambda i: (locations[i], instances[i]))
+        if any(position != index for position, index in enumerate(order)):
+            sorted_columns = self._take(order)
+            self.prefix_ids = sorted_columns.prefix_ids
+            self.names = sorted_columns.names
+            self.instance_numbers = sorted_columns.instance_numbers
+            self.slice_locations = sorted_columns.slice_locations
+            self.positions = sorted_columns.positions
+            self.geometry_ids = sorted_columns.geometry_ids
+            self.frame_tables = sorted_columns.frame_tables
+            self.sop_hashes = sorted_columns.sop_hashes
+            self.sizes = sorted_columns.sizes
+            self.mtimes = sorted_columns.mtimes
+            self.link_targets = sorted_columns.link_targets
+
+    def without(self, exact_paths, stale_prefixes):
+        """Return a copy minus the slices at *exact_paths* or under *stale_prefixes*.
+
+        *stale_prefixes* end with a separator. Returns None when no slice
+        matches, so callers can skip copying. Each directory is tested once.
+        """
+        prefixes = self.directories
+        exact_by_prefix = {}
+        for path in exact_paths:
+            prefix, name = _split_path(path)
+            exact_by_prefix.setdefault(prefix, set()).add(name)
+
+        stale_dirs = {}
+        keep = []
+        for index, (prefix_id, name) in enumerate(zip(self.prefix_ids, self.names)):
+            stale = stale_dirs.get(prefix_id)
+            if stale is None:
+                prefix = prefixes[prefix_id]
+                stale = prefix.startswith(stale_prefixes) or exact_by_prefix.get(prefix, ())
+                stale_dirs[prefix_id] = stale
+            if stale is True or (stale and name in stale):
+                continue
+            keep.append(index)
+
+        if len(keep) == len(self):
+            return None
+        return self._take(keep)
+
+    def _take(self, indexes):
+        taken = SliceColumns(self.directories)
+        prefix_ids = self.prefix_ids
+        names = self.names
+        instances = self.instance_numbers
+        locations = self.slice_locations
+        positions = self.positions
+        geometry_ids = self.geometry_ids
+        taken.prefix_ids = array('I', (prefix_ids[i] for i in indexes))
+        taken.names = [names[i] for i in indexes]
+        taken.instance_numbers = array('q', (instances[i] for i in indexes))
+        taken.slice_locations = array('d', (locations[i] for i in indexes))
+        taken.positions = array('d', (positions[i * 3 + k] for i in indexes for k in range(3)))
+        # Ids stay valid; tuples no slice uses any more are harmless.
+        taken.geometries = dict(self.geometries)
+        taken.geometry_ids = array('I', (geometry_ids[i] for i in indexes))
+        sop_hashes = self.sop_hashes
+        sizes = self.sizes
+        mtimes = self.mtimes
+        taken.sop_hashes = array('Q', (sop_hashes[i] for i in indexes))
+        taken.sizes = array('Q', (sizes[i] for i in indexes))
+        taken.mtimes = array('q', (mtimes[i] for i in indexes))
+        frame_tables = self.frame_tables
+        if frame_tables:
+            taken.frame_tables = {
+                new: frame_tables[old] for new, old in enumerate(indexes) if old in frame_tables
+            }
+        link_targets = self.link_targets
+        if link_targets:
+            taken.link_targets = {
+                new: link_targets[old] for new, old in enumerate(indexes) if old in link_targets
+            }
+        return taken
+
+
+class Series:
+    __slots__ = ('series_id', 'series_description', 'series_number', 'modality', 'slices')
+
+    def __init__(self, series_id, series_description, series_number, modality, slices):
+        self.series_id = series_id
+        self.series_description = series_description
+        self.series_number = series_number
+        self.modality = modality
+        self.slices = slices
+
+    def copy(self):
+        return Series(
+            self.series_id,
+            self.series_description,
+            self.series_number,
+            self.modality,
+            self.slices.copy(),
+        )
+
+
+class Study:
+    __slots__ = (
+        'study_id',
+        'patient_name',
+        'patient_id',
+        'study_date',
+        'study_description',
+        'modality',
+        'series',
+        'composite_uids',
+        'image_count',
+        'series_count',
+    )
+
+    def __init__(self, study_id, patient_name, patient_id, study_date, study_description, modality):
+        self.study_id = study_id
+        self.patient_name = patient_name
+        self.patient_id = patient_id
+        self.study_date = study_date
+        self.study_description = study_description
+        self.modality = modality
+        self.series = {}
+        # Bare series UIDs keyed as "{uid}|{description}" in self.series
+        self.composite_uids = set()
+        self.image_count = 0
+        self.series_count = 0
+
+    def copy(self):
+        """Copy the study and its series, so the copy can be patched in place."""
+        study = Study(
+            self.study_id,
+            self.patient_name,
+            self.patient_id,
+            self.study_date,
+            self.study_description,
+            self.modality,
+        )
+        study.series = {key: series.copy() for key, series in self.series.items()}
+        study.composite_uids = set(self.composite_uids)
+        study.image_count = self.image_count
+        study.series_count = self.series_count
+        return study
+
+
+def estimate_bytes(studies):
+    """Approximate memory held by a studies snapshot, for cache budgets."""
+    total = 0
+    directories = {}
+    for study in studies.values():
+        total += _RECORD_BYTES
+        for series in study.series.values():
+            total += _RECORD_BYTES + series.slices.nbytes()
+            table = series.slices.directories
+            directories[id(table)] = table
+    return total + sum(table.nbytes() for table in directories.values())
+
+
+def _series_by_prefix(study):
+    """Return {directory prefix: keys of the series of *study* with slices in it}."""
+    keys_by_prefix = {}
+    for key, series in study.series.items():
+        slices = series.slices
+        directories = slices.directories
+        for prefix_id in set(slices.prefix_ids):
+            keys_by_prefix.setdefault(directories[prefix_id], set()).add(key)
+    return keys_by_prefix
+
+
+class DirectoryIndex:
+    """Which series of a snapshot have slices in each directory.
+
+    Maps each directory prefix (see DirectoryTable) to {study id: series
+    keys}, so a watcher patch finds the series a changed or removed path
+    affects without walking every slice of the library. Never mutated:
+    updated() returns a new index sharing the entries it does not touch.
+    """
+
+    __slots__ = ('_by_prefix', '_prefixes_by_study')
+
+    def __init__(self, by_prefix=None, prefixes_by_study=None):
+        self._by_prefix = by_prefix or {}
+        self._prefixes_by_study = prefixes_by_study or {}
+
+    @classmethod
+    def build(cls, studies):
+        return cls().updated(studies, studies)
+
+    def updated(self, studies, study_ids):
+        """Return a copy with the entries of *study_ids* taken from *studies* again.
+
+        Studies missing from *studies* are dropped.
+        """
+        by_prefix = dict(self._by_prefix)
+        prefixes_by_study = dict(self._prefixes_by_study)
+        touched = {}
+
+        def entries(prefix):
+            found = touched.get(prefix)
+            if found is None:
+                found = touched[prefix] = dict(by_prefix.get(prefix, ()))
+            return found
+
+        for study_id in study_ids:
+            for prefix in prefixes_by_study.pop(study_id, ()):
+                del entries(prefix)[study_id]
+            study = studies.get(study_id)
+            if study is None:
+                continue
+            keys_by_prefix = _series_by_prefix(study)
+            prefixes_by_study[study_id] = frozenset(keys_by_prefix)
+            for prefix, keys in keys_by_prefix.items():
+                entries(prefix)[study_id] = frozenset(keys)
+
+        for prefix, found in touched.items():
+            if found:
+                by_prefix[prefix] = found
+            else:
+                by_prefix.pop(prefix, None)
+        return DirectoryIndex(by_prefix, prefixes_by_study)
+
+    def series_at(self, exact_paths, stale_prefixes):
+        """Return {study id: series keys} with slices at *exact_paths* or under *stale_prefixes*.
+
+        *stale_prefixes* end with a separator. Matching them checks each
+        directory of the library once, not each slice.
+        """
+        prefixes = {_split_path(path)[0] for path in exact_paths}
+        if stale_prefixes:
+            prefixes.update(
+                prefix for prefix in self._by_prefix if prefix.startswith(stale_prefixes)
+            )
+        found = {}
+        for prefix in prefixes:
+            for study_id, keys in self._by_prefix.get(prefix, {}).items():
+                found.setdefault(study_id, set()).update(keys)
+        return found
+
+
+class Snapshot(dict):
+    """A published library snapshot (study id -> Study) tagged with a generation.
+
+    Generations come from one process-wide counter, so every publish of any
+    source gets a new, larger number. Like any snapshot, it is never mutated
+    after publishing; its DirectoryIndex is built on first use, or handed
+    over by the patch that produced it.
+    """
+
+    __slots__ = ('generation', '_directory_index')
+
+    def __init__(self, studies, directory_index=None):
+        super().__init__(studies)
+        self.generation = next(_generations)
+        self._directory_index = directory_index
+
+    def directory_index(self):
+        if self._directory_index is None:
+            self._directory_index = DirectoryIndex.build(self)
+        return self._directory_index
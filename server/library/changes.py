@@ -0,0 +1,129 @@
+"""
+Library change feed.
+
+Each DicomFolderSource keeps a bounded log of what changed between the
+snapshots it published, so clients that already hold the study list can
+fetch only the differences since the generation they loaded. Entries hold
+the change as it is sent to clients, formatted when it is recorded, not the
+Study and Series it describes: those keep their slices alive, and a log of
+them would pin every superseded snapshot it mentions.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+from collections import deque
+
+# Change operations
+STUDY_ADDED = 'studyAdded'
+STUDY_REMOVED = 'studyRemoved'
+STUDY_CHANGED = 'studyChanged'
+SERIES_ADDED = 'seriesAdded'
+SERIES_REMOVED = 'seriesRemoved'
+SERIES_CHANGED = 'seriesChanged'
+
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def _study_fields(study):
+    return (
+        study.patient_name,
+        study.patient_id,
+        study.study_date,
+        study.study_description,
+        study.modality,
+        study.image_count,
+        len(study.series),
+    )
+
+
+def _series_fields(series):
+    return (series.series_description, series.series_number, series.modality, len(series.slices))
+
+
+def diff_snapshots(old, new):
+    """Return the changes from snapshot *old* to *new*.
+
+    Each change is (op, study_id, series_key, record), where record is the
+    new Study or Series (None for removals and series_key None for study
+    operations). Studies and series shared between the snapshots are skipped
+    by identity, so diffing a watcher patch only looks at what it touched.
+    """
+    changes = []
+    for study_id, study in new.items():
+        previous = old.get(study_id)
+        if previous is None:
+            changes.append((STUDY_ADDED, study_id, None, study))
+            continue
+        if previous is study:
+            continue
+        if _study_fields(previous) != _study_fields(study):
+            changes.append((STUDY_CHANGED, study_id, None, study))
+        old_series = previous.series
+        for key, series in study.series.items():
+            before = old_series.get(key)
+            if before is None:
+                changes.append((SERIES_ADDED, study_id, key, series))
+            elif before is not series and _series_fields(before) != _series_fields(series):
+                changes.append((SERIES_CHANGED, study_id, key, series))
+        for key in old_series:
+            if key not in study.series:
+                changes.append((SERIES_REMOVED, study_id, key, None))
+    for study_id in old:
+        if study_id not in new:
+            changes.append((STUDY_REMOVED, study_id, None, None))
+    return changes
+
+
+class ChangeLog:
+    """Bounded log of formatted snapshot diffs, each entry tagged with its generation.
+
+    The log can answer "what changed since generation G" for any G at or
+    after its floor: the generation of the snapshot it started from, moved
+    forward when old entries are dropped. Earlier generations, and any
+    generation after a reset (first scan, folder switch), need a full
+    reload. Not thread-safe: the owning DicomFolderSource holds its lock.
+
+    *format_change* is called as format_change(generation, op, study_id,
+    series_key, record) for each change recorded (see diff_snapshots) and
+    returns what the log keeps for it.
+    """
+
+    def __init__(self, format_change, max_entries=DEFAULT_MAX_ENTRIES):
+        self.format_change = format_change
+        self.max_entries = max_entries
+        self._entries = deque()
+        self._floor = None
+
+    def reset(self, snapshot=None):
+        """Forget all changes; the log restarts from *snapshot* (None: from nothing)."""
+        self._entries.clear()
+        self._floor = snapshot.generation if snapshot is not None else None
+
+    def record(self, old, new):
+        """Log the changes from snapshot *old* to *new* (either may be None)."""
+        if old is None or new is None:
+            self.reset(new)
+            return
+        changes = diff_snapshots(old, new)
+        if len(changes) > self.max_entries:
+            self.reset(new)
+            return
+        generation = new.generation
+        self._entries.extend(
+            (generation, op, study_id, self.format_change(generation, op, study_id, key, record))
+            for op, study_id, key, record in changes
+        )
+        while len(self._entries) > self.max_entries:
+            dropped = self._entries[0][0]
+            while self._entries and self._entries[0][0] == dropped:
+                self._entries.popleft()
+            self._floor = dropped
+
+    def since(self, generation):
+        """Return [(generation, op, study_id, change)] after *generation*.
+
+        Returns None when the log cannot cover *generation*.
+        """
+        if self._floor is None or generation < self._floor:
+            return None
+        return [entry for entry in self._entries if entry[0] > generation]
@@ -0,0 +1,243 @@
+"""
+Frame offset tables for multi-frame DICOM files.
+
+An enhanced CT/MR file holds hundreds of frames in one Pixel Data element.
+For such files the scan records where each frame's bytes lie in the file,
+so a single frame can be served with a seek instead of sending the whole
+file. Native pixel data has fixed-size frames; encapsulated (compressed)
+pixel data is split into fragments, mapped to frames through the Extended
+Offset Table, the Basic Offset Table, or one fragment per frame.
+
+Kept free of Flask imports, like headers.py, for process-pool scan workers.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import struct
+import sys
+from array import array
+
+import pydicom
+
+_PIXEL_DATA_TAGS = (0x7FE00010, 0x7FE00008, 0x7FE00009)
+_ITEM_TAG = 0xFFFEE000
+_SEQUENCE_DELIMITER_TAG = 0xFFFEE0DD
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+
+_IMPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2'
+# The dataset of these is not stored byte for byte, so offsets cannot be used.
+_UNINDEXABLE_SYNTAXES = frozenset(('1.2.840.10008.1.2.2', '1.2.840.10008.1.2.1.99'))
+# Explicit VRs with a 2-byte reserved field and a 4-byte length.
+_LONG_VRS = frozenset((b'OB', b'OW', b'OF', b'OD', b'OL', b'OV', b'UN', b'SQ', b'UT', b'UC', b'UR'))
+
+# Media type of a frame by transfer syntax, for encapsulated pixel data.
+FRAME_MEDIA_TYPES = {
+    '1.2.840.10008.1.2.4.50': 'image/jpeg',
+    '1.2.840.10008.1.2.4.51': 'image/jpeg',
+    '1.2.840.10008.1.2.4.57': 'image/jpeg',
+    '1.2.840.10008.1.2.4.70': 'image/jpeg',
+    '1.2.840.10008.1.2.4.80': 'image/jls',
+    '1.2.840.10008.1.2.4.81': 'image/jls',
+    '1.2.840.10008.1.2.4.90': 'image/jp2',
+    '1.2.840.10008.1.2.4.91': 'image/jp2',
+    '1.2.840.10008.1.2.4.201': 'image/jphc',
+    '1.2.840.10008.1.2.4.202': 'image/jphc',
+    '1.2.840.10008.1.2.4.203': 'image/jphc',
+}
+DEFAULT_FRAME_MEDIA_TYPE = 'application/octet-stream'
+
+
+class FrameTable:
+    """Byte ranges of each frame of one file.
+
+    *segments* holds flattened (offset, length) pairs; frame i is made of
+    the segments starts[i] to starts[i + 1] (one, except for encapsulated
+    frames split over several fragments). *encapsulated* frames are
+    compressed fragments; native frames are raw pixel bytes.
+    """
+
+    __slots__ = ('segments', 'starts', 'encapsulated')
+
+    def __init__(self, segments, starts, encapsulated):
+        self.segments = array('Q', segments)
+        self.starts = array('I', starts)
+        self.encapsulated = encapsulated
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def frame_segments(self, frame):
+        """Return [(offset, length)] of *frame* (0-based)."""
+        segments = self.segments
+        return [
+            (segments[2 * i], segments[2 * i + 1])
+            for i in range(self.starts[frame], self.starts[frame + 1])
+        ]
+
+    def frame_length(self, frame):
+        return sum(length for _, length in self.frame_segments(frame))
+
+    def nbytes(self):
+        """Approximate bytes held by the table."""
+        return (
+            sys.getsizeof(self)
+            + self.segments.buffer_info()[1] * self.segments.itemsize
+            + self.starts.buffer_info()[1] * self.starts.itemsize
+        )
+
+    def to_meta(self):
+        """JSON-friendly form stored in scan metadata (see from_meta)."""
+        return [list(self.segments), list(self.starts), self.encapsulated]
+
+    @classmethod
+    def from_meta(cls, value):
+        if not value:
+            return None
+        segments, starts, encapsulated = value
+        return cls(segments, starts, encapsulated)
+
+
+def _read_exact(fp, size):
+    data = fp.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated pixel data')
+    return data
+
+
+def _read_element_header(fp, implicit_vr):
+    """Read the Pixel Data element header at the file position: (tag, length)."""
+    group, element = struct.unpack('<HH', _read_exact(fp, 4))
+    tag = (group << 16) | element
+    if implicit_vr:
+        (length,) = struct.unpack('<I', _read_exact(fp, 4))
+        return tag, length
+    vr = _read_exact(fp, 2)
+    if vr in _LONG_VRS:
+        (length,) = struct.unpack('<2xI', _read_exact(fp, 6))
+    else:
+        (length,) = struct.unpack('<H', _read_exact(fp, 2))
+    return tag, length
+
+
+def _read_fragments(fp):
+    """Read the items of encapsulated pixel data at the file position.
+
+    Returns (basic offset table, [(fragment item offset, value offset, length)]).
+    """
+    tag, length = struct.unpack('<II', _read_exact(fp, 8))
+    tag = ((tag & 0xFFFF) << 16) | (tag >> 16)
+    if tag != _ITEM_TAG:
+        raise ValueError('Missing Basic Offset Table item')
+    basic = array('I', _read_exact(fp, length)) if length else array('I')
+    fragments = []
+    while True:
+        item_offset = fp.tell()
+        raw = fp.read(8)
+        if len(raw) < 8:
+            break
+        tag, length = struct.unpack('<II', raw)
+        tag = ((tag & 0xFFFF) << 16) | (tag >> 16)
+        if tag == _SEQUENCE_DELIMITER_TAG:
+            break
+        if tag != _ITEM_TAG or length == _UNDEFINED_LENGTH:
+            raise ValueError('Malformed pixel data fragment')
+        fragments.append((item_offset, item_offset + 8, length))
+        fp.seek(length, 1)
+    return basic, fragments
+
+
+def _encapsulated_table(fp, frames, extended_offsets, extended_lengths):
+    basic, fragments = _read_fragments(fp)
+    if not fragments:
+        raise ValueError('No pixel data fragments')
+    first_item = fragments[0][0]
+    by_position = {item - first_item: index for index, (item, _, _) in enumerate(fragments)}
+
+    if extended_offsets is not None:
+        # One fragment per frame; offsets are relative to the first fragment item.
+        segments = []
+        for offset, length in zip(extended_offsets, extended_lengths):
+            segments += [first_item + offset + 8, length]
+        return FrameTable(segments, range(frames + 1), True)
+
+    if len(basic) == frames:
+        starts = []
+        for offset in basic:
+            if offset not in by_position:
+                raise ValueError('Basic Offset Table does not match the fragments')
+            starts.append(by_position[offset])
+        starts.append(len(fragments))
+    elif len(fragments) == frames:
+        starts = range(frames + 1)
+    elif frames == 1:
+        starts = (0, len(fragments))
+    else:
+        raise ValueError('Cannot map fragments to frames without an offset table')
+    segments = []
+    for _, value_offset, length in fragments:
+        segments += [value_offset, length]
+    return FrameTable(segments, starts, True)
+
+
+def read_frame_table(fp, frames):
+    """Return the FrameTable of the open file *fp* with *frames* frames, or None.
+
+    Returns None for layouts that cannot be indexed (big endian, deflated,
+    packed 1-bit pixels, fragments without any way to assign them to frames).
+    """
+    fp.seek(0)
+    ds = pydicom.dcmread(fp, stop_before_pixels=True)
+    transfer_syntax = str(ds.file_meta.get('TransferSyntaxUID', _IMPLICIT_VR_LITTLE_ENDIAN))
+    if transfer_syntax in _UNINDEXABLE_SYNTAXES:
+        return None
+    try:
+        tag, length = _read_element_header(fp, transfer_syntax == _IMPLICIT_VR_LITTLE_ENDIAN)
+    except ValueError:
+        return None
+    if tag not in _PIXEL_DATA_TAGS:
+        return None
+
+    if length == _UNDEFINED_LENGTH:
+        extended = ds.get('ExtendedOffsetTable')
+        extended_lengths = ds.get('ExtendedOffsetTableLengths')
+        offsets = lengths = None
+        if extended and extended_lengths:
+            offsets = array('Q', extended)
+            lengths = array('Q', extended_lengths)
+            if len(offsets) != frames or len(lengths) != frames:
+                offsets = lengths = None
+        try:
+            return _encapsulated_table(fp, frames, offsets, lengths)
+        except ValueError:
+            return None
+
+    bits_allocated = int(ds.get('BitsAllocated', 0) or 0)
+    if bits_allocated % 8:
+        return None
+    frame_size = (
+        int(ds.get('Rows', 0) or 0)
+        * int(ds.get('Columns', 0) or 0)
+        * int(ds.get('SamplesPerPixel', 1) or 1)
+        * bits_allocated
+        // 8
+    )
+    if not frame_size or frame_size * frames > length:
+        return None
+    value_offset = fp.tell()
+    segments = []
+    for frame in range(frames):
+        segments += [value_offset + frame * frame_size, frame_size]
+    return FrameTable(segments, range(frames + 1), False)
+
+
+def verify_segment(fp, offset, length, encapsulated):
+    """Check that a recorded segment still matches the file; False if it changed."""
+    if encapsulated:
+        fp.seek(offset - 8)
+        raw = fp.read(8)
+        if len(raw) < 8:
+            return False
+        tag, item_length = struct.unpack('<II', raw)
+        return tag == 0xE000FFFE and item_length == length
+    fp.seek(0, 2)
+    return offset + length <= fp.tell()
@@ -0,0 +1,163 @@
+"""
+Per-series geometry and display metadata.
+
+Scans keep each slice's ImagePositionPatient and an interned tuple of its
+other geometry and display attributes (see catalog.SliceColumns). The
+series metadata endpoint aggregates them on demand, so the viewer can
+allocate a volume and set window/level before it fetches any pixel data.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import math
+from statistics import median
+
+# (metadata key, response field) of the attributes kept in geometry tuples,
+# in tuple order.
+GEOMETRY_FIELDS = (
+    ('rows', 'rows'),
+    ('columns', 'columns'),
+    ('pixel_spacing', 'pixelSpacing'),
+    ('slice_thickness', 'sliceThickness'),
+    ('image_orientation', 'imageOrientationPatient'),
+    ('bits_allocated', 'bitsAllocated'),
+    ('bits_stored', 'bitsStored'),
+    ('pixel_representation', 'pixelRepresentation'),
+    ('photometric_interpretation', 'photometricInterpretation'),
+    ('rescale_slope', 'rescaleSlope'),
+    ('rescale_intercept', 'rescaleIntercept'),
+    ('window_center', 'windowCenter'),
+    ('window_width', 'windowWidth'),
+    ('transfer_syntax_uid', 'transferSyntaxUid'),
+)
+
+_FIELD_INDEXES = {key: field_index for field_index, (key, _) in enumerate(GEOMETRY_FIELDS)}
+_ORIENTATION = _FIELD_INDEXES['image_orientation']
+
+# Orientation normals shorter than this (degenerate or missing direction
+# cosines) fall back to the slice location order.
+_MIN_NORMAL_LENGTH = 1e-6
+
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _thaw(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _field(geometry, field_index):
+    # Slices added without geometry have an empty tuple.
+    return geometry[field_index] if geometry else None
+
+
+def geometry_key(meta):
+    """Return the hashable geometry tuple of one slice's metadata."""
+    return tuple(_freeze(meta.get(key)) for key, _ in GEOMETRY_FIELDS)
+
+
+def slice_position(meta):
+    """Return the ImagePositionPatient of one slice's metadata, or None."""
+    position = meta.get('image_position')
+    return tuple(position) if position else None
+
+
+def slice_attribute(slices, index, key):
+    """Return geometry attribute *key* (a metadata key) of slice *index* of *slices*."""
+    geometry = slices.geometry_table()[slices.geometry_ids[index]]
+    return _thaw(_field(geometry, _FIELD_INDEXES[key]))
+
+
+def _normal(orientation):
+    if not orientation or len(orientation) != 6:
+        return None
+    rx, ry, rz, cx, cy, cz = orientation
+    normal = (ry * cz - rz * cy, rz * cx - rx * cz, rx * cy - ry * cx)
+    length = math.sqrt(sum(component * component for component in normal))
+    if length < _MIN_NORMAL_LENGTH:
+        return None
+    return tuple(component / length for component in normal)
+
+
+def _projected_distances(slices, orientation):
+    """Distance of each slice along the normal of *orientation*, or None."""
+    normal = _normal(orientation)
+    if normal is None:
+        return None
+    nx, ny, nz = normal
+    distances = []
+    for index in range(len(slices)):
+        position = slices.position(index)
+        if position is None:
+            return None
+        x, y, z = position
+        distances.append(x * nx + y * ny + z * nz)
+    return distances
+
+
+def series_metadata(series):
+    """Aggregate the geometry of *series* into its metadata endpoint payload.
+
+    An attribute all slices share is reported once; one that differs between
+    slices (window per slice, PET rescale) is null at the series level,
+    listed under varying, and reported on each slice instead. Slices are
+    ordered by their position projected on the slice normal when every slice
+    has a position and they share an orientation, otherwise in the stored
+    (slice location) order; index is the slice number of the DICOM endpoint.
+    Indexed multi-frame slices report numberOfFrames (see get_library_frame).
+    """
+    slices = series.slices
+    table = slices.geometry_table()
+    geometry_ids = slices.geometry_ids
+    used = sorted(set(geometry_ids))
+
+    payload = {'seriesInstanceUid': series.series_id, 'sliceCount': len(slices)}
+    varying = []
+    for field_index, (_, name) in enumerate(GEOMETRY_FIELDS):
+        values = {_field(table[geometry_id], field_index) for geometry_id in used}
+        if len(values) > 1:
+            varying.append(field_index)
+            payload[name] = None
+        else:
+            payload[name] = _thaw(values.pop()) if values else None
+
+    distances = None
+    if _ORIENTATION not in varying:
+        distances = _projected_distances(slices, payload['imageOrientationPatient'])
+    instances = slices.instance_numbers
+    if distances is not None:
+        order = sorted(range(len(slices)), key=lambda i: (distances[i], instances[i]))
+        payload['sortedBy'] = 'imagePosition'
+        gaps = [
+            round(distances[after] - distances[before], 6)
+            for before, after in zip(order, order[1:])
+        ]
+        gaps = [gap for gap in gaps if gap > 0]
+        payload['spacingBetweenSlices'] = median(gaps) if gaps else None
+    else:
+        order = range(len(slices))
+        payload['sortedBy'] = 'sliceLocation'
+        payload['spacingBetweenSlices'] = None
+    payload['varying'] = [GEOMETRY_FIELDS[field_index][1] for field_index in varying]
+    frame_tables = slices.frame_tables
+    payload['frameCount'] = len(slices) + sum(len(table) - 1 for table in frame_tables.values())
+
+    entries = []
+    for index in order:
+        position = slices.position(index)
+        entry = {
+            'index': index,
+            'instanceNumber': instances[index],
+            'imagePositionPatient': list(position) if position else None,
+        }
+        if distances is not None:
+            entry['distance'] = round(distances[index], 6)
+        if index in frame_tables:
+            entry['numberOfFrames'] = len(frame_tables[index])
+        geometry = table[geometry_ids[index]]
+        for field_index in varying:
+            entry[GEOMETRY_FIELDS[field_index][1]] = _thaw(_field(geometry, field_index))
+        entries.append(entry)
+    payload['slices'] = entries
+    return payload
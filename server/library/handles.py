@@ -0,0 +1,105 @@
+"""
+Open file handles for hot library slices.
+
+Scrolling a series back and forth requests the same files again and again.
+FileHandleCache keeps a bounded LRU of open descriptors keyed by snapshot
+generation and path, so a repeated slice request skips the path lookup of
+open(). Handles are reference counted: a response holding one keeps it open
+after eviction, and the descriptor is closed once the last user releases
+it. Publishing a snapshot drops the entries of the one it replaces, so a
+file replaced on disk is reopened once a scan or watcher update has been
+published; a late request for an old generation only adds an entry that is
+never hit again and ages out.
+
+Cached descriptors are shared between concurrent responses, so they are
+read with os.pread and never seeked; the cache is disabled on platforms
+without it (Windows). Their file offset therefore stays at 0, which lets a
+whole-file response hand the descriptor to a sendfile-capable WSGI server
+(see server.library.serving).
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_HANDLES = 128
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+class FileHandle:
+    """A reference-counted read-only descriptor. Call release() when done."""
+
+    __slots__ = ('fd', '_cache', '_refs')
+
+    def __init__(self, fd, cache):
+        self.fd = fd
+        self._cache = cache
+        self._refs = 1
+
+    def fileno(self):
+        return self.fd
+
+    def read_at(self, offset, size):
+        return os.pread(self.fd, size, offset)
+
+    def release(self):
+        self._cache._release(self)
+
+
+class FileHandleCache:
+    """Bounded LRU of open FileHandles keyed by (generation, path)."""
+
+    def __init__(self, max_handles=DEFAULT_MAX_HANDLES):
+        self.max_handles = max_handles if hasattr(os, 'pread') else 0
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_handles > 0
+
+    def acquire(self, generation, path):
+        """Return an open FileHandle for *path*; the caller must release() it.
+
+        Raises OSError if the file cannot be opened.
+        """
+        key = (generation, path)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                handle._refs += 1
+                return handle
+
+        handle = FileHandle(os.open(path, _OPEN_FLAGS), self)
+        with self._lock:
+            if key in self._handles:
+                # Opened concurrently by another request: not cached.
+                return handle
+            handle._refs += 1
+            self._handles[key] = handle
+            while len(self._handles) > self.max_handles:
+                _, evicted = self._handles.popitem(last=False)
+                self._unref(evicted)
+        return handle
+
+    def discard_generation(self, generation):
+        """Drop the handles of *generation*, superseded by a new snapshot."""
+        with self._lock:
+            for key in [key for key in self._handles if key[0] == generation]:
+                self._unref(self._handles.pop(key))
+
+    def __len__(self):
+        return len(self._handles)
+
+    def _release(self, handle):
+        with self._lock:
+            self._unref(handle)
+
+    def _unref(self, handle):
+        handle._refs -= 1
+        if handle._refs == 0:
+            os.close(handle.fd)
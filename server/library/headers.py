@@ -0,0 +1,277 @@
+"""
+DICOM header parsing for library scans.
+
+Kept free of Flask imports so process-pool scan workers can import it cheaply.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import os
+
+import pydicom
+from pydicom.errors import InvalidDicomError
+from pydicom.filereader import read_partial
+from pydicom.multival import MultiValue
+from pydicom.tag import Tag
+
+from server.library.frames import read_frame_table
+from server.library.prefilter import (
+    HEADER_PROBE_LENGTH,
+    SKIP_PARSE_ERROR,
+    SKIP_UNREADABLE,
+    classify_header,
+)
+
+# Version of the dict shape returned by extract_metadata. Bump it whenever a
+# field is added or changes meaning so ScanIndex rows written by older code are
+# re-parsed instead of reused.
+SCAN_METADATA_VERSION = 5
+
+# Field order for the compact tuple form used to ship metadata between
+# processes. file_path is omitted: the parent already knows which file it sent.
+METADATA_FIELDS = (
+    'patient_name',
+    'patient_id',
+    'study_date',
+    'study_description',
+    'study_instance_uid',
+    'series_description',
+    'series_instance_uid',
+    'series_number',
+    'modality',
+    'instance_number',
+    'slice_location',
+    'sop_instance_uid',
+    'file_size',
+    'file_mtime_ns',
+    'link_target',
+    'image_position',
+    'image_orientation',
+    'rows',
+    'columns',
+    'pixel_spacing',
+    'slice_thickness',
+    'bits_allocated',
+    'bits_stored',
+    'pixel_representation',
+    'photometric_interpretation',
+    'rescale_slope',
+    'rescale_intercept',
+    'window_center',
+    'window_width',
+    'transfer_syntax_uid',
+    'number_of_frames',
+    'frame_table',
+)
+
+# Header parsing modes. 'selective' reads only the elements extract_metadata
+# needs and stops once past the last of them; 'full' reads every element up
+# to the pixel data.
+HEADER_MODES = ('selective', 'full')
+DEFAULT_HEADER_MODE = 'selective'
+
+# Elements read in selective mode. Specific Character Set is always read by
+# pydicom so that names decode correctly.
+METADATA_TAGS = sorted(
+    Tag(keyword)
+    for keyword in (
+        'PatientName',
+        'PatientID',
+        'StudyDate',
+        'StudyDescription',
+        'StudyInstanceUID',
+        'SeriesDescription',
+        'SeriesInstanceUID',
+        'SeriesNumber',
+        'Modality',
+        'InstanceNumber',
+        'SliceLocation',
+        'SOPInstanceUID',
+        'SliceThickness',
+        'ImagePositionPatient',
+        'ImageOrientationPatient',
+        'PhotometricInterpretation',
+        'NumberOfFrames',
+        'Rows',
+        'Columns',
+        'PixelSpacing',
+        'BitsAllocated',
+        'BitsStored',
+        'PixelRepresentation',
+        'WindowCenter',
+        'WindowWidth',
+        'RescaleIntercept',
+        'RescaleSlope',
+    )
+)
+_LAST_METADATA_TAG = int(METADATA_TAGS[-1])
+
+# Every selected element has a short VR (LO, PN, UI, ...), so anything longer
+# than this is not worth holding in memory. Applies to undefined-length
+# values that have to be walked to find their delimiter.
+SELECTIVE_DEFER_SIZE = 4096
+
+
+def _get_numbers(ds, keyword, count, cast=float):
+    """Return the first *count* values of a numeric element as a list, or None."""
+    try:
+        value = ds.get(keyword)
+        if value is None or value == '':
+            return None
+        values = list(value) if isinstance(value, (list, tuple, MultiValue)) else [value]
+        if len(values) < count:
+            return None
+        return [cast(v) for v in values[:count]]
+    except Exception:
+        return None
+
+
+def _get_number(ds, keyword, cast=float):
+    """Return a numeric element (its first value if multi-valued), or None."""
+    values = _get_numbers(ds, keyword, 1, cast)
+    return values[0] if values else None
+
+
+def _transfer_syntax(ds):
+    try:
+        return str(ds.file_meta.TransferSyntaxUID)
+    except Exception:
+        return None
+
+
+def extract_metadata(ds, file_path):
+    """Extract relevant metadata from a DICOM dataset.
+
+    Besides the listing fields this keeps the geometry and display
+    attributes the viewer needs to set up a viewport (see
+    server.library.geometry); missing or malformed ones are None.
+    """
+
+    def get_attr(attr, default=''):
+        try:
+            val = getattr(ds, attr, default)
+            return str(val) if val is not None else default
+        except Exception:
+            return default
+
+    return {
+        'file_path': str(file_path),
+        'patient_name': get_attr('PatientName', 'Unknown'),
+        'patient_id': get_attr('PatientID', ''),
+        'study_date': get_attr('StudyDate', ''),
+        'study_description': get_attr('StudyDescription', ''),
+        'study_instance_uid': get_attr('StudyInstanceUID', '').strip(),
+        'series_description': get_attr('SeriesDescription', ''),
+        'series_instance_uid': get_attr('SeriesInstanceUID', '').strip(),
+        'series_number': get_attr('SeriesNumber', ''),
+        'modality': get_attr('Modality', ''),
+        'instance_number': int(get_attr('InstanceNumber', '0') or '0'),
+        'slice_location': float(get_attr('SliceLocation', '0') or '0'),
+        'sop_instance_uid': get_attr('SOPInstanceUID', '').strip(),
+        # Filled in by scan_dicom_file from the file it parsed
+        'file_size': None,
+        'file_mtime_ns': None,
+        'link_target': None,
+        'image_position': _get_numbers(ds, 'ImagePositionPatient', 3),
+        'image_orientation': _get_numbers(ds, 'ImageOrientationPatient', 6),
+        'rows': _get_number(ds, 'Rows', int),
+        'columns': _get_number(ds, 'Columns', int),
+        'pixel_spacing': _get_numbers(ds, 'PixelSpacing', 2),
+        'slice_thickness': _get_number(ds, 'SliceThickness'),
+        'bits_allocated': _get_number(ds, 'BitsAllocated', int),
+        'bits_stored': _get_number(ds, 'BitsStored', int),
+        'pixel_representation': _get_number(ds, 'PixelRepresentation', int),
+        'photometric_interpretation': get_attr('PhotometricInterpretation', '') or None,
+        'rescale_slope': _get_number(ds, 'RescaleSlope'),
+        'rescale_intercept': _get_number(ds, 'RescaleIntercept'),
+        'window_center': _get_number(ds, 'WindowCenter'),
+        'window_width': _get_number(ds, 'WindowWidth'),
+        'transfer_syntax_uid': _transfer_syntax(ds),
+        'number_of_frames': _get_number(ds, 'NumberOfFrames', int) or 1,
+        # Filled in by scan_dicom_file for multi-frame files
+        'frame_table': None,
+    }
+
+
+def _past_metadata_tags(tag, vr, length):
+    # int() avoids BaseTag's Python-level comparison; this runs per element.
+    return int(tag) > _LAST_METADATA_TAG
+
+
+def _read_header(fp, header_mode):
+    if header_mode == 'full':
+        return pydicom.dcmread(fp, stop_before_pixels=True)
+    # Elements outside METADATA_TAGS are skipped with a seek rather than
+    # decoded, and reading ends at the first element past RescaleSlope, so
+    # large private groups (0x0029 CSA headers, vendor blobs) are never read.
+    return read_partial(
+        fp,
+        stop_when=_past_metadata_tags,
+        defer_size=SELECTIVE_DEFER_SIZE,
+        specific_tags=METADATA_TAGS,
+    )
+
+
+def _frame_table(fp, frames):
+    try:
+        table = read_frame_table(fp, frames)
+    except Exception:
+        return None
+    return table.to_meta() if table is not None else None
+
+
+def scan_dicom_file(file_path, header_mode=DEFAULT_HEADER_MODE):
+    """Pre-filter and parse one file. Returns (metadata, None) or (None, skip_reason).
+
+    The first HEADER_PROBE_LENGTH bytes are checked for the Part 10 magic
+    before pydicom is involved; the same open file is then handed to pydicom,
+    so accepted files cost one open. *header_mode* is one of HEADER_MODES.
+    Multi-frame files get a second, full header read to locate their frames
+    (see server.library.frames). The size and mtime of the parsed file are
+    recorded for HTTP validators (see server.library.serving), and the
+    resolved target of a symlinked file so it is only checked against the
+    library root once.
+    """
+    try:
+        with open(file_path, 'rb') as fp:
+            reason = classify_header(fp.read(HEADER_PROBE_LENGTH))
+            if reason is not None:
+                return None, reason
+            fp.seek(0)
+            try:
+                meta = extract_metadata(_read_header(fp, header_mode), file_path)
+                if header_mode != 'full' and not (
+                    meta['study_instance_uid'] and meta['series_instance_uid']
+                ):
+                    # Elements written out of order can fall behind the early
+                    # stop; confirm with a full read before giving up on the file.
+                    fp.seek(0)
+                    meta = extract_metadata(_read_header(fp, 'full'), file_path)
+                file_stat = os.fstat(fp.fileno())
+                meta['file_size'] = file_stat.st_size
+                meta['file_mtime_ns'] = file_stat.st_mtime_ns
+                if os.path.islink(file_path):
+                    meta['link_target'] = os.path.realpath(file_path)
+                if meta['number_of_frames'] > 1:
+                    meta['frame_table'] = _frame_table(fp, meta['number_of_frames'])
+                return meta, None
+            except (InvalidDicomError, Exception):
+                return None, SKIP_PARSE_ERROR
+    except OSError:
+        return None, SKIP_UNREADABLE
+
+
+def pack_metadata(meta):
+    """Convert a metadata dict to a compact tuple (None stays None)."""
+    if meta is None:
+        return None
+    return tuple(meta[field] for field in METADATA_FIELDS)
+
+
+def unpack_metadata(packed, file_path):
+    """Inverse of pack_metadata."""
+    if packed is None:
+        return None
+    meta = dict(zip(METADATA_FIELDS, packed))
+    meta['file_path'] = str(file_path)
+    return meta
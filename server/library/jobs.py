@@ -0,0 +1,75 @@
+"""
+Background library refresh jobs.
+
+A job wraps one rescan running on a worker thread. Clients poll it by id for
+progress while the previous library snapshot keeps being served.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import time
+import uuid
+
+from server.library.progress import ScanStats
+
+# Job states
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+
+class ScanJob:
+    """State and progress of one background refresh.
+
+    The worker thread updates the job; request threads read it with
+    to_dict(). Attribute writes are single assignments, so readers always
+    see a consistent status.
+    """
+
+    def __init__(self, folder_path):
+        self.job_id = uuid.uuid4().hex
+        self.folder_path = folder_path
+        self.stats = ScanStats()
+        self.status = JOB_RUNNING
+        self.error = None
+        self.study_count = None
+        self.image_count = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def running(self):
+        return self.status == JOB_RUNNING
+
+    def complete(self, studies):
+        self.study_count = len(studies)
+        self.image_count = sum(study.image_count for study in studies.values())
+        self.finished_at = time.time()
+        self.status = JOB_DONE
+
+    def fail(self, error):
+        self.error = error
+        self.finished_at = time.time()
+        self.status = JOB_FAILED
+
+    def cancel(self):
+        """Record that a newer refresh or folder change superseded this job."""
+        self.finished_at = time.time()
+        self.status = JOB_CANCELLED
+
+    def to_dict(self):
+        """JSON-ready snapshot in the camelCase shape used by API payloads."""
+        payload = {
+            'jobId': self.job_id,
+            'status': self.status,
+            'createdAt': self.created_at,
+            'finishedAt': self.finished_at,
+            'scan': self.stats.to_dict(),
+        }
+        if self.status == JOB_DONE:
+            payload['studyCount'] = self.study_count
+            payload['imageCount'] = self.image_count
+        if self.error:
+            payload['error'] = self.error
+        return payload
@@ -0,0 +1,198 @@
+"""
+Sorted, filtered and paginated views of the library study list.
+
+A StudyListing wraps one merged library snapshot. Snapshots are never
+mutated, so the sort order for each sort key is computed once, on first use,
+and reused by every request until a scan, patch or folder switch publishes a
+new snapshot and with it a new listing.
+
+Keyset cursors encode the sort position of the last study returned, so the
+next page starts right after it even if studies were added in the meantime.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import base64
+import binascii
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right
+
+SORT_KEYS = ('date', 'patient', 'modality')
+SORT_ORDERS = ('asc', 'desc')
+DEFAULT_SORT = 'date'
+
+# Newest studies first; names and modalities alphabetically.
+DEFAULT_ORDERS = {'date': 'desc', 'patient': 'asc', 'modality': 'asc'}
+
+_DATE_PATTERN = re.compile(r'^\d{8}$')
+
+
+class ListingQueryError(ValueError):
+    """A listing parameter or cursor is malformed."""
+
+
+def _sort_value(sort, study):
+    if sort == 'date':
+        return study.study_date or ''
+    if sort == 'patient':
+        return (study.patient_name or '').casefold()
+    return (study.modality or '').upper()
+
+
+def normalize_date(value):
+    """Return *value* (YYYYMMDD or YYYY-MM-DD) as YYYYMMDD, or raise ListingQueryError."""
+    compact = value.strip().replace('-', '')
+    if not _DATE_PATTERN.match(compact):
+        raise ListingQueryError(f'Invalid date: {value}')
+    return compact
+
+
+class StudyFilter:
+    """Study-level filters: date range, modalities and patient text.
+
+    *date_from* and *date_to* are inclusive YYYYMMDD strings. A study matches
+    a modality if the study or any of its series has it. *patient_text*
+    matches case-insensitively anywhere in the patient name or ID.
+    """
+
+    __slots__ = ('date_from', 'date_to', 'modalities', 'patient_text')
+
+    def __init__(self, date_from=None, date_to=None, modalities=None, patient_text=None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.modalities = frozenset(m.upper() for m in modalities) if modalities else None
+        self.patient_text = patient_text.casefold() if patient_text else None
+
+    def __bool__(self):
+        return any(
+            value is not None
+            for value in (self.date_from, self.date_to, self.modalities, self.patient_text)
+        )
+
+    def matches(self, study):
+        if self.date_from is not None or self.date_to is not None:
+            study_date = study.study_date or ''
+            if not study_date:
+                return False
+            if self.date_from is not None and study_date < self.date_from:
+                return False
+            if self.date_to is not None and study_date > self.date_to:
+                return False
+        if self.modalities is not None:
+            modalities = self.modalities
+            if (study.modality or '').upper() not in modalities and not any(
+                (series.modality or '').upper() in modalities for series in study.series.values()
+            ):
+                return False
+        if self.patient_text is not None:
+            text = self.patient_text
+            if (
+                text not in (study.patient_name or '').casefold()
+                and text not in (study.patient_id or '').casefold()
+            ):
+                return False
+        return True
+
+
+def encode_cursor(sort, order, key):
+    payload = json.dumps([sort, order, list(key)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, order):
+    """Return the sort key stored in *cursor*; it must match *sort* and *order*."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_order, key = json.loads(base64.urlsafe_b64decode(padded))
+        key = tuple(key)
+        valid = len(key) == 2 and all(isinstance(part, str) for part in key)
+    except (ValueError, TypeError, binascii.Error):
+        valid = False
+    if not valid:
+        raise ListingQueryError('Invalid cursor')
+    if cursor_sort != sort or cursor_order != order:
+        raise ListingQueryError('Cursor does not match the requested sort order')
+    return key
+
+
+class StudyListing:
+    """Sort indexes over one merged snapshot of library studies.
+
+    *snapshots* are the per-root snapshots *studies* was merged from; they
+    identify the listing (see LibraryCollection.listing).
+    """
+
+    def __init__(self, snapshots, studies):
+        self.snapshots = tuple(snapshots)
+        self.studies = studies
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generations(self):
+        """Generation of each snapshot (0 for a root with nothing published)."""
+        return tuple(getattr(studies, 'generation', 0) for studies in self.snapshots)
+
+    @property
+    def generation(self):
+        """The newest generation among the snapshots."""
+        return max(self.generations, default=0)
+
+    def _order(self, sort):
+        """Return (keys, study_ids) ascending by (sort value, study id)."""
+        order = self._orders.get(sort)
+        if order is None:
+            with self._lock:
+                order = self._orders.get(sort)
+                if order is None:
+                    keys = sorted(
+                        (_sort_value(sort, study), study_id)
+                        for study_id, study in self.studies.items()
+                    )
+                    order = self._orders[sort] = (keys, [key[1] for key in keys])
+        return order
+
+    def page(self, sort, order, study_filter=None, limit=None, offset=0, cursor=None):
+        """Return (study_ids, total, next_cursor) for one page of the listing.
+
+        *total* counts every study matching *study_filter*. *next_cursor* is
+        None on the last page. *cursor* (from a previous page) and *offset*
+        both skip studies; the offset applies after the cursor.
+        """
+        keys, study_ids = self._order(sort)
+        descending = order == 'desc'
+        count = len(study_ids)
+        if cursor is not None:
+            after = decode_cursor(cursor, sort, order)
+            if descending:
+                positions = range(bisect_left(keys, after) - 1, -1, -1)
+            else:
+                positions = range(bisect_right(keys, after), count)
+        else:
+            positions = range(count - 1, -1, -1) if descending else range(count)
+
+        if study_filter:
+            studies = self.studies
+            total = sum(1 for study in studies.values() if study_filter.matches(study))
+            matched = (i for i in positions if study_filter.matches(studies[study_ids[i]]))
+            skipped = 0
+            selected = []
+            for position in matched:
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                selected.append(position)
+                if limit is not None and len(selected) > limit:
+                    break
+        else:
+            total = count
+            end = None if limit is None else offset + limit + 1
+            selected = list(positions[offset:end])
+
+        next_cursor = None
+        if limit is not None and len(selected) > limit:
+            selected = selected[:limit]
+            next_cursor = encode_cursor(sort, order, keys[selected[-1]])
+        return [study_ids[i] for i in selected], total, next_cursor
@@ -0,0 +1,132 @@
+"""
+Cheap pre-classification of library files before pydicom sees them.
+
+Real archive folders hold JPEG exports, PDFs, zip files, thumbnails and OS
+litter next to the DICOM files. Handing each of those to pydicom costs a full
+open/parse attempt and an exception. These checks reject them from the
+directory entry alone (name, extension, size) or from one small read of the
+first 132 bytes.
+
+Each rejection carries a reason so scans can report what they skipped.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import struct
+
+# Skip reasons
+SKIP_SYSTEM_FILE = 'system_file'
+SKIP_DICOMDIR = 'dicomdir'
+SKIP_EXTENSION = 'extension'
+SKIP_TOO_SMALL = 'too_small'
+SKIP_RAW_DICOM = 'raw_dicom'
+SKIP_NOT_DICOM = 'not_dicom'
+SKIP_UNREADABLE = 'unreadable'
+SKIP_PARSE_ERROR = 'parse_error'
+SKIP_MISSING_UIDS = 'missing_uids'
+
+# A Part 10 file has a 128-byte preamble followed by the 'DICM' magic.
+PREAMBLE_LENGTH = 128
+HEADER_PROBE_LENGTH = PREAMBLE_LENGTH + 4
+DICM_MAGIC = b'DICM'
+
+# OS and tool litter that is never DICOM.
+_SYSTEM_FILE_NAMES = frozenset({'.ds_store', 'thumbs.db', 'desktop.ini'})
+
+# Extensions that are never DICOM. Deliberately a denylist: DICOM files use
+# .dcm, .dic, .ima, numeric suffixes or no extension at all.
+_NON_DICOM_EXTENSIONS = frozenset(
+    {
+        '.7z',
+        '.avi',
+        '.bmp',
+        '.csv',
+        '.db',
+        '.doc',
+        '.docx',
+        '.exe',
+        '.gif',
+        '.gz',
+        '.heic',
+        '.htm',
+        '.html',
+        '.ini',
+        '.jpeg',
+        '.jpg',
+        '.js',
+        '.json',
+        '.log',
+        '.md',
+        '.mov',
+        '.mp4',
+        '.pdf',
+        '.png',
+        '.rar',
+        '.rtf',
+        '.sqlite',
+        '.tar',
+        '.tgz',
+        '.tif',
+        '.tiff',
+        '.txt',
+        '.xls',
+        '.xlsx',
+        '.xml',
+        '.zip',
+    }
+)
+
+_ELEMENT_HEADER = struct.Struct('<HHI')
+_EXPLICIT_VRS = frozenset(
+    b'AE AS AT CS DA DS DT FD FL IS LO LT OB OD OF OL OV OW PN SH SL SQ SS ST SV TM UC UI UL UN UR '
+    b'US UT UV'.split()
+)
+
+
+def classify_entry(name, size):
+    """Return a skip reason from a file's name and size alone, or None.
+
+    *name* is the base name of the file. No I/O is performed.
+    """
+    lowered = name.lower()
+    # AppleDouble resource forks (._foo) and other dotfiles
+    if lowered in _SYSTEM_FILE_NAMES or lowered.startswith('.'):
+        return SKIP_SYSTEM_FILE
+    # Media directory index: valid DICOM, but it describes images rather than
+    # being one, and can be many megabytes on large exports.
+    if lowered == 'dicomdir':
+        return SKIP_DICOMDIR
+    dot = lowered.rfind('.')
+    if dot > 0 and lowered[dot:] in _NON_DICOM_EXTENSIONS:
+        return SKIP_EXTENSION
+    if size < HEADER_PROBE_LENGTH:
+        return SKIP_TOO_SMALL
+    return None
+
+
+def classify_header(head):
+    """Return a skip reason from the first HEADER_PROBE_LENGTH bytes, or None.
+
+    Files without the 'DICM' magic are rejected. Those that still look like
+    a raw (preamble-less) data set are reported separately: pydicom would
+    refuse them without force=True and the browser viewer cannot load them.
+    """
+    if len(head) < HEADER_PROBE_LENGTH:
+        return SKIP_TOO_SMALL
+    if head[PREAMBLE_LENGTH:HEADER_PROBE_LENGTH] == DICM_MAGIC:
+        return None
+    if _looks_like_raw_dataset(head):
+        return SKIP_RAW_DICOM
+    return SKIP_NOT_DICOM
+
+
+def _looks_like_raw_dataset(head):
+    """Sniff a preamble-less little-endian data set starting at offset 0."""
+    group, element, length = _ELEMENT_HEADER.unpack_from(head, 0)
+    # Raw data sets start with file meta (0002) or identifying (0008) groups.
+    if group not in (0x0002, 0x0008) or element > 0x00FF:
+        return False
+    if head[4:6] in _EXPLICIT_VRS:
+        return True
+    # Implicit VR: a 4-byte length that fits inside a plausible header.
+    return length < 0x10000
@@ -0,0 +1,107 @@
+"""
+Scan progress counters.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import threading
+import time
+from collections import Counter
+
+
+class ScanStats:
+    """Counters for one library scan.
+
+    The scanning thread updates them; other threads may read a consistent
+    copy at any time via to_dict().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files_walked = 0
+        self.files_cached = 0
+        self.files_parsed = 0
+        self.skipped = Counter()
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def walked(self):
+        with self._lock:
+            self.files_walked += 1
+
+    def cached(self):
+        with self._lock:
+            self.files_cached += 1
+
+    def parsed(self):
+        with self._lock:
+            self.files_parsed += 1
+
+    def skip(self, reason):
+        with self._lock:
+            self.skipped[reason] += 1
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.time()
+
+    def to_dict(self):
+        """JSON-ready snapshot in the camelCase shape used by API payloads."""
+        with self._lock:
+            end = self.finished_at if self.finished_at is not None else time.time()
+            return {
+                'filesWalked': self.files_walked,
+                'filesCached': self.files_cached,
+                'filesParsed': self.files_parsed,
+                'filesSkipped': sum(self.skipped.values()),
+                'skippedByReason': dict(self.skipped),
+                'elapsedSeconds': round(end - self.started_at, 3),
+                'finished': self.finished_at is not None,
+            }
+
+
+class CombinedScanStats:
+    """Counters summed over the per-root ScanStats of a multi-root scan.
+
+    Each root scanned gets its own part from add(); to_dict() has the same
+    shape as ScanStats.to_dict().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parts = []
+
+    def add(self):
+        part = ScanStats()
+        with self._lock:
+            self._parts.append(part)
+        return part
+
+    def discard(self, part):
+        """Drop a part whose root turned out not to need a scan."""
+        with self._lock:
+            self._parts.remove(part)
+
+    @property
+    def finished_at(self):
+        with self._lock:
+            parts = list(self._parts)
+        if not parts or any(part.finished_at is None for part in parts):
+            return None
+        return max(part.finished_at for part in parts)
+
+    def to_dict(self):
+        with self._lock:
+            parts = [part.to_dict() for part in self._parts]
+        skipped = Counter()
+        for part in parts:
+            skipped.update(part['skippedByReason'])
+        return {
+            'filesWalked': sum(part['filesWalked'] for part in parts),
+            'filesCached': sum(part['filesCached'] for part in parts),
+            'filesParsed': sum(part['filesParsed'] for part in parts),
+            'filesSkipped': sum(skipped.values()),
+            'skippedByReason': dict(skipped),
+            'elapsedSeconds': max((part['elapsedSeconds'] for part in parts), default=0.0),
+            'finished': bool(parts) and all(part['finished'] for part in parts),
+        }
@@ -0,0 +1,189 @@
+"""
+Read-ahead for slices requested in order.
+
+Scrolling a series requests slice n, then n + 1, n + 2, ... (or the same
+backwards), and each request otherwise reads its file cold, which costs
+network round trips per slice on NAS-backed libraries. SliceReadAhead
+follows the slice requests of each client and series; once MIN_RUN steps in
+a row went the same way, it warms the slices ahead in the background so
+that their requests read from the page cache.
+
+The window ahead covers READAHEAD_HORIZON seconds of scrolling at the
+measured rate (a moving average of slices per second between requests),
+between MIN_WINDOW and max_window slices, so a slow scroll warms a few
+slices and a fast one many. Slices already warmed for a stream are not
+warmed again; a jump, a change of direction or a new snapshot generation
+starts the stream over.
+
+Warming a file asks the kernel to read it with
+posix_fadvise(POSIX_FADV_WILLNEED), which returns at once; where that is
+not available (macOS, Windows) the file is read and the bytes dropped. The
+library routes warm slices into the slice byte cache instead when it is
+enabled.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WINDOW = 32
+MIN_WINDOW = 2
+
+# Seconds of scrolling the window ahead covers.
+READAHEAD_HORIZON = 1.0
+
+# Steps in one direction before slices are warmed; a single repeated
+# request is not a scroll.
+MIN_RUN = 2
+
+# Largest step still counted as sequential: fast wheel scrolling skips slices.
+MAX_STEP = 3
+
+# Weight of the newest interval in the scroll rate average.
+RATE_SMOOTHING = 0.3
+
+# A longer gap between requests is a pause, not a slow scroll, and does not
+# update the rate.
+PAUSE_SECONDS = 2.0
+
+# Streams (client and series pairs) followed at once, least recent dropped.
+DEFAULT_MAX_STREAMS = 256
+
+# Warm batches queued or running at once; further batches are dropped, as
+# their slices will be requested before a backlogged worker gets to them.
+MAX_PENDING = 8
+
+WARM_WORKERS = 2
+WARM_BLOCK_SIZE = 256 * 1024
+
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+
+def warm_fd(fd):
+    """Start reading the whole open file *fd* into the page cache."""
+    if _HAS_FADVISE:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        return
+    pread = getattr(os, 'pread', None)
+    offset = 0
+    while True:
+        chunk = pread(fd, WARM_BLOCK_SIZE, offset) if pread else os.read(fd, WARM_BLOCK_SIZE)
+        if not chunk:
+            return
+        offset += len(chunk)
+
+
+class _Stream:
+    """Access pattern of one client on one series."""
+
+    __slots__ = ('generation', 'last', 'last_time', 'direction', 'run', 'rate', 'warmed')
+
+    def __init__(self, generation, index, now):
+        self.generation = generation
+        self.last = index
+        self.last_time = now
+        self.direction = 0
+        self.run = 0
+        self.rate = 0.0
+        # Furthest slice warmed in the current direction, or None.
+        self.warmed = None
+
+
+class SliceReadAhead:
+    """Detects sequential slice requests and warms the slices ahead of them.
+
+    *max_window* bounds the slices warmed ahead of a request; 0 disables
+    read-ahead.
+    """
+
+    def __init__(self, max_window=DEFAULT_MAX_WINDOW, max_streams=DEFAULT_MAX_STREAMS):
+        self.max_window = max_window
+        self.max_streams = max_streams
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+
+    @property
+    def enabled(self):
+        return self.max_window > 0
+
+    def window(self, rate):
+        """Slices to keep warm ahead of a scroll at *rate* slices per second."""
+        wanted = math.ceil(rate * READAHEAD_HORIZON) if rate > 0 else MIN_WINDOW
+        return max(MIN_WINDOW, min(self.max_window, wanted))
+
+    def observe(self, key, generation, index, count, now=None):
+        """Record a request for slice *index* of a series of *count* slices.
+
+        *key* identifies the client and series. Returns the slice indices to
+        warm now, nearest first (a range), or None.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None or stream.generation != generation:
+                self._streams[key] = _Stream(generation, index, now)
+                self._streams.move_to_end(key)
+                while len(self._streams) > self.max_streams:
+                    self._streams.popitem(last=False)
+                return None
+            self._streams.move_to_end(key)
+
+            step = index - stream.last
+            if step == 0:
+                return None
+            direction = 1 if step > 0 else -1
+            elapsed = now - stream.last_time
+            stream.last = index
+            stream.last_time = now
+            if abs(step) > MAX_STEP or direction != stream.direction:
+                stream.direction = direction
+                stream.run = 1
+                stream.rate = 0.0
+                stream.warmed = None
+                return None
+
+            stream.run += 1
+            if 0 < elapsed < PAUSE_SECONDS:
+                rate = abs(step) / elapsed
+                stream.rate = (
+                    rate if not stream.rate else stream.rate + RATE_SMOOTHING * (rate - stream.rate)
+                )
+            if stream.run < MIN_RUN:
+                return None
+
+            target = index + direction * self.window(stream.rate)
+            target = max(0, min(count - 1, target))
+            first = index + direction
+            if stream.warmed is not None and (stream.warmed - first) * direction >= 0:
+                first = stream.warmed + direction
+            if (target - first) * direction < 0:
+                return None
+            stream.warmed = target
+            return range(first, target + direction, direction)
+
+    def submit(self, func, *args):
+        """Run func(*args) on a warming thread; dropped if MAX_PENDING batches are waiting."""
+        with self._lock:
+            if self._pending >= MAX_PENDING:
+                return False
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=WARM_WORKERS, thread_name_prefix='slice-readahead'
+                )
+            executor = self._executor
+        executor.submit(func, *args).add_done_callback(self._done)
+        return True
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
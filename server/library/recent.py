@@ -0,0 +1,90 @@
+"""
+Recently used library folders.
+
+Switching the library folder used to drop the cached studies and rescan the
+new folder from scratch, even when it had been scanned minutes earlier. The
+snapshots of folders switched away from are kept here, so switching back can
+reuse them.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import os
+from collections import OrderedDict
+
+from server.library.catalog import estimate_bytes
+
+DEFAULT_MAX_FOLDERS = 8
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def root_mtime_ns(folder_path):
+    """Return the mtime of *folder_path* in nanoseconds, or None if it cannot be read."""
+    try:
+        return os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class RecentFolder:
+    __slots__ = ('studies', 'root_mtime_ns', 'nbytes')
+
+    def __init__(self, studies, root_mtime_ns, nbytes):
+        self.studies = studies
+        self.root_mtime_ns = root_mtime_ns
+        self.nbytes = nbytes
+
+
+class RecentFolders:
+    """LRU of study snapshots by folder, bounded by count and estimated bytes.
+
+    Each snapshot is stored with the mtime its folder had when the scan
+    started; take() only returns it while the folder's mtime still matches.
+    Not thread-safe: the owning DicomFolderSource calls it under its lock.
+    """
+
+    def __init__(self, max_folders=DEFAULT_MAX_FOLDERS, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_folders = max_folders
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def put(self, folder_path, studies, root_mtime_ns):
+        """Remember *studies* for *folder_path*, evicting the least recently used."""
+        self.discard(folder_path)
+        if root_mtime_ns is None:
+            return
+        nbytes = estimate_bytes(studies)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[os.path.abspath(folder_path)] = RecentFolder(studies, root_mtime_ns, nbytes)
+        self._nbytes += nbytes
+        while len(self._entries) > self.max_folders or self._nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def take(self, folder_path, current_mtime_ns):
+        """Remove and return the entry for *folder_path* if it is still valid, else None.
+
+        *current_mtime_ns* is the folder's mtime now (see root_mtime_ns). An
+        entry whose folder has changed since it was scanned is dropped.
+        """
+        entry = self._entries.pop(os.path.abspath(folder_path), None)
+        if entry is None:
+            return None
+        self._nbytes -= entry.nbytes
+        if current_mtime_ns is None or entry.root_mtime_ns != current_mtime_ns:
+            return None
+        return entry
+
+    def discard(self, folder_path):
+        entry = self._entries.pop(os.path.abspath(folder_path), None)
+        if entry is not None:
+            self._nbytes -= entry.nbytes
@@ -0,0 +1,68 @@
+"""
+Memoized library listing responses.
+
+A study listing only changes when a snapshot is published, so its serialized
+JSON (and the gzip-compressed form of it) is kept under the ETag computed
+from the snapshot generations and request, and served again without
+rebuilding until a new generation makes the ETag change.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 16
+
+# Bodies smaller than this are always sent uncompressed.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+class CachedBody:
+    """A serialized response body and its lazily compressed gzip form."""
+
+    __slots__ = ('body', '_gzipped', '_lock')
+
+    def __init__(self, body):
+        self.body = body
+        self._gzipped = None
+        self._lock = threading.Lock()
+
+    @property
+    def compressible(self):
+        return len(self.body) >= GZIP_MIN_BYTES
+
+    def gzipped(self):
+        if self._gzipped is None:
+            with self._lock:
+                if self._gzipped is None:
+                    self._gzipped = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+class ResponseCache:
+    """Thread-safe LRU of CachedBody by ETag."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag, body):
+        """Store *body* (bytes) under *etag* and return its CachedBody."""
+        entry = CachedBody(body)
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
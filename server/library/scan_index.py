@@ -0,0 +1,225 @@
+"""
+Persistent on-disk index of scanned library files.
+
+Each row maps an absolute file path under a library root to the size and
+mtime the file had when it was last parsed, plus the metadata extracted from
+its header. A rescan stats every file, reuses rows whose size and mtime still
+match, and only hands new or changed files to pydicom. Rows for files that
+disappeared are pruned.
+
+Files that are not DICOM are stored with NULL metadata and the reason they
+were skipped, so they are not re-read on every scan until they change.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Rows are written in batches of this size to bound transaction length.
+_WRITE_BATCH_SIZE = 5000
+
+# Most paths one load_metadata() call looks up (below SQLite's default
+# limit of 999 bound parameters).
+METADATA_BATCH_SIZE = 500
+
+
+class ScanIndex:
+    """SQLite-backed cache of per-file scan results, keyed by (root, path).
+
+    *metadata_version* identifies the shape of the stored metadata dicts.
+    Rows written under a different version are treated as missing, so adding
+    fields to the extractor forces a one-time re-parse instead of serving
+    stale records.
+    """
+
+    def __init__(self, db_path, metadata_version=1):
+        self.db_path = db_path
+        self.metadata_version = metadata_version
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _ensure_schema(self, conn):
+        if self._initialized:
+            return
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scan_index (
+                root TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                metadata_version INTEGER NOT NULL,
+                metadata TEXT,
+                skip_reason TEXT,
+                PRIMARY KEY (root, path)
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info('scan_index')")}
+        if 'skip_reason' not in columns:
+            conn.execute('ALTER TABLE scan_index ADD COLUMN skip_reason TEXT')
+        conn.commit()
+        self._initialized = True
+
+    def load(self, root):
+        """Return {path: (size, mtime_ns, has_metadata, skip_reason)} for *root*.
+
+        Metadata is not loaded here: a rescan fetches it with
+        load_metadata() only for the rows it reuses, so memory does not grow
+        with decoded headers of the whole root. Returns an empty dict if the
+        index cannot be read; the caller then falls back to a full scan.
+        """
+        root = os.path.abspath(root)
+        entries = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    self._ensure_schema(conn)
+                    rows = conn.execute(
+                        """
+                        SELECT path, size, mtime_ns, metadata IS NOT NULL, skip_reason
+                        FROM scan_index
+                        WHERE root = ? AND metadata_version = ?
+                        """,
+                        (root, self.metadata_version),
+                    )
+                    for path, size, mtime_ns, has_metadata, skip_reason in rows:
+                        entries[path] = (size, mtime_ns, bool(has_metadata), skip_reason)
+                finally:
+                    conn.close()
+        except (sqlite3.Error, OSError, ValueError) as exc:
+            logger.warning('Failed to load scan index %s: %s', self.db_path, exc)
+            return {}
+        return entries
+
+    def load_metadata(self, root, paths):
+        """Return {path: metadata} for those of *paths* under *root* that have metadata.
+
+        Paths missing from the result (rows removed or rewritten since
+        load(), or an unreadable index) must be parsed again. Callers pass
+        at most METADATA_BATCH_SIZE paths at a time.
+        """
+        root = os.path.abspath(root)
+        paths = list(paths)
+        if not paths:
+            return {}
+        metas = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    self._ensure_schema(conn)
+                    rows = conn.execute(
+                        f"""
+                        SELECT path, metadata
+                        FROM scan_index
+                        WHERE root = ? AND metadata_version = ? AND metadata IS NOT NULL
+                            AND path IN ({', '.join('?' * len(paths))})
+                        """,
+                        (root, self.metadata_version, *paths),
+                    )
+                    for path, metadata in rows:
+                        meta = json.loads(metadata)
+                        meta['file_path'] = path
+                        metas[path] = meta
+                finally:
+                    conn.close()
+        except (sqlite3.Error, OSError, ValueError) as exc:
+            logger.warning('Failed to load scan index metadata %s: %s', self.db_path, exc)
+            return {}
+        return metas
+
+    def apply(self, root, upserts, removed_paths):
+        """Persist scan results for *root*.
+
+        *upserts* is an iterable of (path, size, mtime_ns, metadata, skip_reason).
+        *removed_paths* is an iterable of paths to drop from the index.
+        Failures are logged and swallowed: the index is an optimization and
+        must never fail a scan.
+        """
+        root = os.path.abspath(root)
+        version = self.metadata_version
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    self._ensure_schema(conn)
+                    batch = []
+                    for path, size, mtime_ns, meta, skip_reason in upserts:
+                        batch.append(
+                            (root, path, size, mtime_ns, version, _encode(meta), skip_reason)
+                        )
+                        if len(batch) >= _WRITE_BATCH_SIZE:
+                            _write_rows(conn, batch)
+                            batch = []
+                    if batch:
+                        _write_rows(conn, batch)
+
+                    batch = []
+                    for path in removed_paths:
+                        batch.append((root, path))
+                        if len(batch) >= _WRITE_BATCH_SIZE:
+                            _delete_rows(conn, batch)
+                            batch = []
+                    if batch:
+                        _delete_rows(conn, batch)
+                finally:
+                    conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning('Failed to update scan index %s: %s', self.db_path, exc)
+
+    def clear(self, root=None):
+        """Drop all rows, or only the rows for *root*."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    self._ensure_schema(conn)
+                    if root is None:
+                        conn.execute('DELETE FROM scan_index')
+                    else:
+                        conn.execute(
+                            'DELETE FROM scan_index WHERE root = ?', (os.path.abspath(root),)
+                        )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning('Failed to clear scan index %s: %s', self.db_path, exc)
+
+
+def _encode(meta):
+    if meta is None:
+        return None
+    # file_path duplicates the row key; drop it to keep rows small.
+    return json.dumps({k: v for k, v in meta.items() if k != 'file_path'}, separators=(',', ':'))
+
+
+def _write_rows(conn, rows):
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO scan_index (
+            root, path, size, mtime_ns, metadata_version, metadata, skip_reason
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.commit()
+
+
+def _delete_rows(conn, rows):
+    conn.executemany('DELETE FROM scan_index WHERE root = ? AND path = ?', rows)
+    conn.commit()
@@ -0,0 +1,171 @@
+"""
+Scan engines: fan DICOM header parsing out over threads or processes.
+
+Header parsing is pure-Python pydicom work and mostly holds the GIL, so the
+thread engine rarely keeps more than one core busy. The process engine sends
+chunks of paths to worker processes and gets compact metadata tuples back
+(see headers.pack_metadata), which keeps pickling overhead small.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from server.library.headers import (
+    DEFAULT_HEADER_MODE,
+    pack_metadata,
+    scan_dicom_file,
+    unpack_metadata,
+)
+
+SCAN_ENGINES = ('thread', 'process')
+DEFAULT_SCAN_ENGINE = 'thread'
+DEFAULT_CHUNK_SIZE = 64
+
+# Below this many files a process pool costs more to start than it saves.
+PROCESS_POOL_MIN_FILES = 256
+
+# Tasks queued per worker. Keeps every worker busy while bounding how far the
+# producer (usually a lazy directory walk) runs ahead of parsing.
+TASKS_IN_FLIGHT_PER_WORKER = 4
+
+_CONTEXT_LOCK = threading.Lock()
+_process_context = None
+
+
+def default_workers(engine):
+    cpus = os.cpu_count() or 4
+    return cpus * 2 if engine == 'thread' else cpus
+
+
+def _get_process_context():
+    """Return the multiprocessing context used for scan workers.
+
+    The server process has live threads (request handlers, the folder
+    watcher), so plain fork could copy locks mid-flight. forkserver forks
+    workers from a clean helper that has the parsing module preloaded;
+    spawn is the portable fallback.
+    """
+    global _process_context
+    with _CONTEXT_LOCK:
+        if _process_context is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload(['server.library.headers'])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _process_context = context
+        return _process_context
+
+
+def _parse_chunk(paths, header_mode):
+    """Process-pool worker: parse a batch of files into (packed, skip_reason) pairs."""
+    results = []
+    for path in paths:
+        meta, reason = scan_dicom_file(path, header_mode)
+        results.append((pack_metadata(meta), reason))
+    return results
+
+
+def parse_files(
+    items,
+    engine=DEFAULT_SCAN_ENGINE,
+    workers=None,
+    chunk_size=None,
+    header_mode=DEFAULT_HEADER_MODE,
+    cancel=None,
+):
+    """Parse files and yield (item, metadata, skip_reason) as results arrive.
+
+    Exactly one of metadata and skip_reason is None for each file (see
+    headers.scan_dicom_file, which also documents *header_mode*).
+
+    *items* is any iterable of tuples whose first element is the file path;
+    the remaining elements ride along untouched so callers can carry stat
+    results through. Items are pulled lazily and only a few tasks per worker
+    are queued at a time, so memory stays flat and parsing overlaps whatever
+    produces the items. Batches smaller than PROCESS_POOL_MIN_FILES always
+    use threads.
+
+    *cancel* (a CancelToken) is checked before every submission and after
+    every result; once set, ScanCancelledError is raised. Whenever the
+    generator stops early, queued tasks are dropped and the pool is shut
+    down without waiting, so only tasks already running finish in the
+    background (at most one file per thread, one chunk per process).
+    """
+    if engine not in SCAN_ENGINES:
+        raise ValueError(f'Unknown scan engine: {engine}')
+    items = iter(items)
+
+    if engine == 'process':
+        head = list(itertools.islice(items, PROCESS_POOL_MIN_FILES))
+        items = itertools.chain(head, items)
+        if len(head) >= PROCESS_POOL_MIN_FILES:
+            chunk_size = max(1, chunk_size or DEFAULT_CHUNK_SIZE)
+            yield from _parse_with_processes(
+                items, workers or default_workers(engine), chunk_size, header_mode, cancel
+            )
+            return
+
+    yield from _parse_with_threads(items, workers or default_workers('thread'), header_mode, cancel)
+
+
+def _check(cancel):
+    if cancel is not None:
+        cancel.check()
+
+
+def _drain(in_flight, limit, cancel):
+    """Yield finished results until at most *limit* tasks remain in flight."""
+    while len(in_flight) > limit:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        _check(cancel)
+        for future in done:
+            yield in_flight.pop(future), future.result()
+
+
+def _parse_with_threads(items, workers, header_mode, cancel):
+    limit = workers * TASKS_IN_FLIGHT_PER_WORKER
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        in_flight = {}
+        for item in items:
+            _check(cancel)
+            in_flight[executor.submit(scan_dicom_file, item[0], header_mode)] = item
+            for done_item, (meta, reason) in _drain(in_flight, limit - 1, cancel):
+                yield done_item, meta, reason
+        for done_item, (meta, reason) in _drain(in_flight, 0, cancel):
+            yield done_item, meta, reason
+    finally:
+        # Nothing is pending after a full run; after an early exit, drop the
+        # queued work instead of finishing it.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_with_processes(items, workers, chunk_size, header_mode, cancel):
+    limit = workers * TASKS_IN_FLIGHT_PER_WORKER
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=_get_process_context())
+    try:
+        in_flight = {}
+        while True:
+            _check(cancel)
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                break
+            paths = [str(item[0]) for item in chunk]
+            in_flight[executor.submit(_parse_chunk, paths, header_mode)] = chunk
+            for chunk_done, results in _drain(in_flight, limit - 1, cancel):
+                yield from _unpack_chunk(chunk_done, results)
+        for chunk_done, results in _drain(in_flight, 0, cancel):
+            yield from _unpack_chunk(chunk_done, results)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _unpack_chunk(chunk, results):
+    for item, (packed, reason) in zip(chunk, results):
+        yield item, unpack_metadata(packed, item[0]), reason
@@ -0,0 +1,422 @@
+"""
+Serving slice files: byte ranges, zero-copy bodies and proxy offload.
+
+Slice responses are the bulk of the server's traffic while a study is
+scrolled. Bodies that run to the end of the file are handed to the WSGI
+server's wsgi.file_wrapper, which servers such as gunicorn send with
+os.sendfile, so the bytes never pass through Python; other ranges are read
+in blocks. Range requests get 206 responses, as multipart/byteranges when
+several ranges are asked for.
+
+Slices carry a strong ETag built from their SOP Instance UID, size and
+mtime as recorded at scan time, a Last-Modified date and the Cache-Control
+policy SLICE_CACHE_CONTROL, so a reopened study revalidates from the
+browser cache. Conditional requests matching the scan-time validators get
+304 without the file being opened or stat'ed, so a file rewritten in place
+is only noticed by revalidation once the watcher or a refresh has rescanned
+it. A file sent after such a change carries validators from its current
+size and mtime.
+
+Given a server.library.slice_cache byte cache, slices whose file still
+matches its scan-time size and mtime are read whole into the cache and
+served from memory, later requests without touching the file; like the
+304s above, cached bytes are trusted until a rescan publishes a new
+snapshot.
+
+With SLICE_OFFLOAD set (see server.create_app), the response carries no
+body at all: an X-Accel-Redirect (nginx) or X-Sendfile (Apache mod_xsendfile,
+lighttpd) header tells the front proxy which file to send, and the proxy
+also handles ranges and conditional requests. For nginx, map the prefix to
+the filesystem root in an internal location:
+
+    location /_dicom_files/ { internal; alias /; }
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import hashlib
+import os
+import secrets
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified, parse_range_header
+from werkzeug.wsgi import wrap_file
+
+from server.library.handles import FileHandle
+
+SLICE_OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+DEFAULT_ACCEL_PREFIX = '/_dicom_files'
+
+READ_BLOCK_SIZE = 256 * 1024
+
+# Slices are PHI served behind the session token, so shared caches must not
+# keep them; browsers revalidate each reuse, which costs a 304.
+DEFAULT_SLICE_CACHE_CONTROL = 'private, no-cache'
+
+
+class _OwnedFile:
+    """A file object opened for one response; the counterpart of a cached FileHandle."""
+
+    __slots__ = ('fp',)
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def fileno(self):
+        return self.fp.fileno()
+
+    def read_at(self, offset, size):
+        # Only this response uses the file object, so seeking is safe (and
+        # os.pread is not available on Windows).
+        self.fp.seek(offset)
+        return self.fp.read(size)
+
+    def release(self):
+        self.fp.close()
+
+
+class _SharedFile:
+    """File object over a cached FileHandle, for wsgi.file_wrapper.
+
+    Cached descriptors are only ever read with os.pread, so their file
+    offset stays at 0: a sendfile-capable server can send the whole file from
+    fileno() (gunicorn sends from the current offset and restores it
+    afterwards). Servers that read() it instead read positionally from an
+    offset of their own.
+    """
+
+    __slots__ = ('_handle', '_offset')
+
+    def __init__(self, handle):
+        self._handle = handle
+        self._offset = 0
+
+    def fileno(self):
+        return self._handle.fileno()
+
+    def read(self, size=READ_BLOCK_SIZE):
+        data = self._handle.read_at(self._offset, size if size >= 0 else READ_BLOCK_SIZE)
+        self._offset += len(data)
+        return data
+
+    def close(self):
+        self._handle.release()
+
+
+class _CachedBytes:
+    """Slice bytes held by a byte cache, served in place of an open file."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def read_at(self, offset, size):
+        return self.data[offset : offset + size]
+
+    def release(self):
+        pass
+
+
+def _read_range(opened, offset, length):
+    while length > 0:
+        chunk = opened.read_at(offset, min(READ_BLOCK_SIZE, length))
+        if not chunk:
+            break
+        offset += len(chunk)
+        length -= len(chunk)
+        yield chunk
+
+
+class FileRange:
+    """WSGI body yielding *length* bytes of an open slice from *offset*, then releasing it."""
+
+    __slots__ = ('_opened', '_offset', '_length')
+
+    def __init__(self, opened, offset, length):
+        self._opened = opened
+        self._offset = offset
+        self._length = length
+
+    def __iter__(self):
+        return _read_range(self._opened, self._offset, self._length)
+
+    def close(self):
+        self._opened.release()
+
+
+class _ByteRanges:
+    """WSGI body of a multipart/byteranges response over one open slice."""
+
+    __slots__ = ('_opened', '_parts', '_closing')
+
+    def __init__(self, opened, parts, closing):
+        self._opened = opened
+        self._parts = parts
+        self._closing = closing
+
+    def __iter__(self):
+        for part_header, start, stop in self._parts:
+            yield part_header
+            yield from _read_range(self._opened, start, stop - start)
+        yield self._closing
+
+    def close(self):
+        self._opened.release()
+
+
+def _requested_ranges(size, etag, last_modified):
+    """Return the satisfiable (start, stop) ranges of the request.
+
+    None means the whole file (no Range header, an unparsable one, or an
+    If-Range validator that no longer matches); [] means none can be served.
+    """
+    header = request.headers.get('Range')
+    if not header:
+        return None
+    parsed = parse_range_header(header)
+    if parsed is None or parsed.units != 'bytes':
+        return None
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None and if_range.date != last_modified:
+        return None
+
+    ranges = []
+    for start, stop in parsed.ranges:
+        if start < 0:
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges
+
+
+def _file_body(opened, offset, length, size):
+    if isinstance(opened, _CachedBytes):
+        data = opened.data
+        return (data if length == size else data[offset : offset + length],)
+    if offset + length == size and isinstance(opened, _OwnedFile):
+        # Runs to the end of a file this response owns: servers with a
+        # sendfile-capable wsgi.file_wrapper send it without copying through
+        # Python.
+        opened.fp.seek(offset)
+        return wrap_file(request.environ, opened.fp, READ_BLOCK_SIZE)
+    if offset == 0 and length == size and isinstance(opened, FileHandle):
+        # The whole file from a cached handle, whose offset is always 0.
+        return wrap_file(request.environ, _SharedFile(opened), READ_BLOCK_SIZE)
+    return FileRange(opened, offset, length)
+
+
+def scan_file_stat(meta):
+    """Return the (SOP Instance UID hash, size, mtime_ns) kept for a scanned slice, or None.
+
+    Files without a SOP Instance UID are hashed by path instead.
+    """
+    size = meta.get('file_size')
+    mtime_ns = meta.get('file_mtime_ns')
+    if size is None or mtime_ns is None:
+        return None
+    uid = meta.get('sop_instance_uid') or meta['file_path']
+    digest = hashlib.blake2b(uid.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big'), size, mtime_ns
+
+
+def open_slice_file(file_path, open_handle=None):
+    """Open *file_path* for reading with read_at(); call release() when done.
+
+    *open_handle*, if given, returns a cached FileHandle instead (see
+    send_slice_file). Raises OSError.
+    """
+    return open_handle() if open_handle is not None else _OwnedFile(open(file_path, 'rb'))
+
+
+def open_cached_slice(file_path, open_handle=None, byte_cache=None, cache_key=None):
+    """Return (opened, size) for *file_path*, like open_slice_file.
+
+    The bytes held by *byte_cache* (a SliceByteCache) under *cache_key* are
+    used when there are any, looked up with peek() so the slice is neither
+    promoted nor counted; otherwise the file is opened and its current size
+    taken with fstat. Call release() on *opened* when done. Raises OSError.
+    """
+    if byte_cache is not None and byte_cache.enabled:
+        data = byte_cache.peek(cache_key)
+        if data is not None:
+            return _CachedBytes(data), len(data)
+    opened = open_slice_file(file_path, open_handle)
+    try:
+        return opened, os.fstat(opened.fileno()).st_size
+    except BaseException:
+        opened.release()
+        raise
+
+
+def read_unchanged(opened, file_stat):
+    """Return the bytes of an open slice if it still has its scan-time size and mtime, else None."""
+    stat_result = os.fstat(opened.fileno())
+    if file_stat[1:] != (stat_result.st_size, stat_result.st_mtime_ns):
+        return None
+    data = b''.join(_read_range(opened, 0, stat_result.st_size))
+    return data if len(data) == stat_result.st_size else None
+
+
+def _validators(sop_hash, size, mtime_ns):
+    """Return the strong ETag and the Last-Modified date (whole seconds) of a slice."""
+    etag = f'{sop_hash:016x}-{size:x}-{mtime_ns:x}'
+    return etag, datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc)
+
+
+def _not_modified(validators):
+    etag, last_modified = validators
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def _with_cache_headers(response, validators):
+    etag, last_modified = validators
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = (
+        current_app.config.get('SLICE_CACHE_CONTROL') or DEFAULT_SLICE_CACHE_CONTROL
+    )
+    return response
+
+
+def _offload_response(file_path, mimetype, mode):
+    response = Response(mimetype=mimetype)
+    if mode == 'x-sendfile':
+        response.headers['X-Sendfile'] = file_path
+    else:
+        prefix = current_app.config.get('SLICE_OFFLOAD_PREFIX') or DEFAULT_ACCEL_PREFIX
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + quote(
+            file_path.replace(os.sep, '/')
+        )
+    return response
+
+
+def _ranged_response(opened, size, etag, last_modified, mimetype):
+    ranges = _requested_ranges(size, etag, last_modified)
+    if ranges is None:
+        response = Response(
+            _file_body(opened, 0, size, size), mimetype=mimetype, direct_passthrough=True
+        )
+        response.content_length = size
+        return response
+
+    if not ranges:
+        opened.release()
+        response = Response(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        response = Response(
+            _file_body(opened, start, stop - start, size),
+            status=206,
+            mimetype=mimetype,
+            direct_passthrough=True,
+        )
+        response.content_length = stop - start
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+        return response
+
+    boundary = secrets.token_hex(16)
+    # Each part header starts with the CRLF that ends the previous part's data
+    # (before the first part, it is part of the delimiter).
+    parts = [
+        (
+            (
+                f'\r\n--{boundary}\r\nContent-Type: {mimetype}\r\n'
+                f'Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n'
+            ).encode('ascii'),
+            start,
+            stop,
+        )
+        for start, stop in ranges
+    ]
+    closing = f'\r\n--{boundary}--\r\n'.encode('ascii')
+    response = Response(
+        _ByteRanges(opened, parts, closing),
+        status=206,
+        content_type=f'multipart/byteranges; boundary={boundary}',
+        direct_passthrough=True,
+    )
+    response.content_length = sum(
+        len(header) + stop - start for header, start, stop in parts
+    ) + len(closing)
+    return response
+
+
+def send_slice_file(
+    file_path,
+    mimetype='application/dicom',
+    file_stat=None,
+    open_handle=None,
+    byte_cache=None,
+    cache_key=None,
+):
+    """Return a response serving *file_path*, a path already checked to be safe.
+
+    *file_stat* is the slice's (SOP Instance UID hash, size, mtime_ns) from
+    scan time (SliceColumns.file_stat), or None. *open_handle*, if given,
+    returns a FileHandle for the file from a server.library.handles cache;
+    the response releases it. *byte_cache*, a SliceByteCache, serves and
+    keeps the slice's bytes under *cache_key*; it is only used for slices
+    with a *file_stat*. Honors Range (single and multiple ranges), If-Range
+    and If-None-Match / If-Modified-Since. Raises OSError if the file cannot
+    be opened.
+    """
+    validators = _validators(*file_stat) if file_stat else None
+    if validators and _not_modified(validators):
+        return _with_cache_headers(Response(status=304), validators)
+
+    mode = current_app.config.get('SLICE_OFFLOAD')
+    if mode in SLICE_OFFLOAD_MODES:
+        response = _offload_response(file_path, mimetype, mode)
+        return _with_cache_headers(response, validators) if validators else response
+
+    if byte_cache is None or not byte_cache.enabled or file_stat is None:
+        byte_cache = None
+    else:
+        data = byte_cache.get(cache_key)
+        if data is not None:
+            return _send_cached(data, validators, mimetype)
+
+    opened = open_slice_file(file_path, open_handle)
+    if byte_cache is not None and byte_cache.admits(file_stat[1]):
+        try:
+            data = read_unchanged(opened, file_stat)
+        except BaseException:
+            opened.release()
+            raise
+        if data is not None:
+            opened.release()
+            byte_cache.put(cache_key, data)
+            return _send_cached(data, validators, mimetype)
+        # Changed since the scan: served from the file, with its new validators.
+    try:
+        stat_result = os.fstat(opened.fileno())
+        size = stat_result.st_size
+        mtime_ns = stat_result.st_mtime_ns
+        if file_stat is None or file_stat[1:] != (size, mtime_ns):
+            # Changed since the scan (or scanned without validators).
+            validators = _validators(file_stat[0] if file_stat else 0, size, mtime_ns)
+            if _not_modified(validators):
+                opened.release()
+                return _with_cache_headers(Response(status=304), validators)
+        response = _ranged_response(opened, size, *validators, mimetype)
+    except BaseException:
+        opened.release()
+        raise
+    response.accept_ranges = 'bytes'
+    return _with_cache_headers(response, validators)
+
+
+def _send_cached(data, validators, mimetype):
+    response = _ranged_response(_CachedBytes(data), len(data), *validators, mimetype)
+    response.accept_ranges = 'bytes'
+    return _with_cache_headers(response, validators)
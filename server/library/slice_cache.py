@@ -0,0 +1,137 @@
+"""
+In-memory bytes of hot library slices.
+
+When several readers open the same study, every slice request otherwise
+goes back to the filesystem. SliceByteCache keeps the raw bytes of recently
+served slices within a memory budget, keyed by snapshot generation and path,
+so a repeated request is answered from memory (see
+server.library.serving.send_slice_file). Publishing a snapshot drops the
+entries of the one it replaces, like the open-file cache; until then, a
+file rewritten in place is served from its cached bytes.
+
+The cache is a segmented LRU: a slice enters the probationary segment and
+moves to the protected one (at most PROTECTED_SHARE of the budget) when it
+is requested again, so one pass over a large series or the read-ahead
+warming slices nobody requests does not flush the slices readers keep
+returning to. Slices larger than MAX_ENTRY_SHARE of the budget are never
+cached.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+PROTECTED_SHARE = 0.8
+MAX_ENTRY_SHARE = 0.125
+
+
+class SliceByteCache:
+    """Thread-safe segmented LRU of slice bytes by (generation, path), bounded by bytes.
+
+    *max_bytes* of 0 disables the cache. Counts hits, misses and entries
+    evicted for space (see stats()).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._protected_max = int(max_bytes * PROTECTED_SHARE)
+        self._entry_max = int(max_bytes * MAX_ENTRY_SHARE)
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._nbytes = 0
+        self._protected_nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def admits(self, size):
+        """Whether a slice of *size* bytes may be cached."""
+        return 0 < size <= self._entry_max
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._protected or key in self._probation
+
+    def __len__(self):
+        return len(self._probation) + len(self._protected)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key):
+        """Return the cached bytes for *key*, a (generation, path) pair, or None."""
+        with self._lock:
+            data = self._protected.get(key)
+            if data is not None:
+                self._protected.move_to_end(key)
+                self.hits += 1
+                return data
+            data = self._probation.pop(key, None)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._protected[key] = data
+            self._protected_nbytes += len(data)
+            while self._protected_nbytes > self._protected_max:
+                demoted_key, demoted = self._protected.popitem(last=False)
+                self._protected_nbytes -= len(demoted)
+                self._probation[demoted_key] = demoted
+            return data
+
+    def peek(self, key):
+        """Return the cached bytes for *key*, or None, without counting or promoting it.
+
+        For bulk reads (batch downloads) that should not make their slices
+        look hot or skew the hit rate.
+        """
+        with self._lock:
+            data = self._protected.get(key)
+            return data if data is not None else self._probation.get(key)
+
+    def put(self, key, data):
+        """Cache *data* for *key* in the probationary segment, evicting as needed."""
+        if not self.admits(len(data)):
+            return
+        with self._lock:
+            if key in self._protected or key in self._probation:
+                return
+            self._probation[key] = data
+            self._nbytes += len(data)
+            while self._nbytes > self.max_bytes:
+                segment = self._probation or self._protected
+                _, evicted = segment.popitem(last=False)
+                self._nbytes -= len(evicted)
+                if segment is self._protected:
+                    self._protected_nbytes -= len(evicted)
+                self.evictions += 1
+
+    def discard_generation(self, generation):
+        """Drop the slices of *generation*, superseded by a new snapshot."""
+        with self._lock:
+            for segment in (self._probation, self._protected):
+                for key in [key for key in segment if key[0] == generation]:
+                    size = len(segment.pop(key))
+                    self._nbytes -= size
+                    if segment is self._protected:
+                        self._protected_nbytes -= size
+
+    def stats(self):
+        """Counters and sizes, JSON-friendly."""
+        with self._lock:
+            return {
+                'maxBytes': self.max_bytes,
+                'bytes': self._nbytes,
+                'entries': len(self._probation) + len(self._protected),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,365 @@
+"""
+Library folder change watcher.
+
+Watches a library root for files being added, rewritten, moved or deleted and
+reports debounced batches of changed and removed paths, so the library cache
+can be patched in place instead of rescanning the whole tree.
+
+Two backends are available:
+- inotify (Linux only, via libc; no third-party dependency)
+- polling of directory mtimes, which works everywhere. A directory's mtime
+  changes when entries are created, renamed or deleted inside it, so new
+  studies copied into the library are picked up. Rewriting an existing file
+  in place is only seen by inotify.
+
+Copyright (c) 2026 Divergent Health Technologies
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+WATCH_MODES = ('auto', 'inotify', 'poll')
+
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+DEFAULT_MAX_DELAY_SECONDS = 10.0
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+
+# Event kinds reported by backends
+CHANGED = 'changed'
+REMOVED = 'removed'
+OVERFLOW = 'overflow'
+
+# inotify constants (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class WatcherUnavailableError(Exception):
+    """Raised when the requested watch backend cannot be used on this host."""
+
+
+class _InotifyBackend:
+    """Recursive inotify watch over a directory tree."""
+
+    name = 'inotify'
+
+    def __init__(self, root):
+        if not sys.platform.startswith('linux'):
+            raise WatcherUnavailableError('inotify is only available on Linux')
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            init1 = self._libc.inotify_init1
+        except (OSError, AttributeError) as exc:
+            raise WatcherUnavailableError(f'inotify not available: {exc}') from exc
+
+        self._root = root
+        self._fd = init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise WatcherUnavailableError(os.strerror(ctypes.get_errno()))
+        self._wd_paths = {}
+        try:
+            self._watch_tree(root, report=None)
+        except WatcherUnavailableError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _IN_WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatcherUnavailableError('inotify watch limit reached')
+            # Directory vanished or is unreadable; nothing to watch.
+            return
+        self._wd_paths[wd] = path
+
+    def _watch_tree(self, top, report):
+        """Watch *top* and every directory below it.
+
+        When *report* is a list, files found along the way are appended as
+        CHANGED events: they may have landed before the watch was in place.
+        """
+        for dirpath, _dirnames, filenames in os.walk(top):
+            self._add_watch(dirpath)
+            if report is not None:
+                report.extend((CHANGED, os.path.join(dirpath, name)) for name in filenames)
+
+    def read(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                events.append((OVERFLOW, None))
+                continue
+            if mask & _IN_IGNORED:
+                self._wd_paths.pop(wd, None)
+                continue
+
+            parent = self._wd_paths.get(wd)
+            if parent is None:
+                continue
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                # Subdirectories are already reported by their parent's
+                # DELETE/MOVED_FROM event; only the root needs handling here.
+                if parent == self._root:
+                    events.append((REMOVED, parent))
+                continue
+
+            path = os.path.join(parent, name)
+            if mask & (_IN_DELETE | _IN_MOVED_FROM):
+                events.append((REMOVED, path))
+            elif mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    try:
+                        self._watch_tree(path, report=events)
+                    except WatcherUnavailableError:
+                        events.append((OVERFLOW, None))
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                events.append((CHANGED, path))
+        return events
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingBackend:
+    """Detect added and removed entries by polling directory mtimes."""
+
+    name = 'poll'
+
+    def __init__(self, root, interval):
+        self._root = root
+        self._interval = interval
+        self._dirs = {}
+        self._next_poll = time.monotonic() + interval
+        self._snapshot_tree(root, report=None)
+
+    def _snapshot_dir(self, path):
+        st = os.stat(path)
+        names = {}
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    names[entry.name] = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+        self._dirs[path] = (st.st_mtime_ns, names)
+        return names
+
+    def _snapshot_tree(self, top, report):
+        pending = [top]
+        while pending:
+            path = pending.pop()
+            try:
+                names = self._snapshot_dir(path)
+            except OSError:
+                continue
+            for name, is_dir in names.items():
+                child = os.path.join(path, name)
+                if is_dir:
+                    pending.append(child)
+                elif report is not None:
+                    report.append((CHANGED, child))
+
+    def _forget_tree(self, top):
+        prefix = top + os.sep
+        for path in [p for p in self._dirs if p == top or p.startswith(prefix)]:
+            del self._dirs[path]
+
+    def read(self, timeout):
+        remaining = self._next_poll - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            return []
+        self._next_poll = time.monotonic() + self._interval
+
+        events = []
+        for path, (mtime_ns, old_names) in list(self._dirs.items()):
+            if path not in self._dirs:
+                continue  # forgotten earlier in this pass
+            try:
+                current_mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self._forget_tree(path)
+                events.append((REMOVED, path))
+                continue
+            if current_mtime == mtime_ns:
+                continue
+
+            try:
+                new_names = self._snapshot_dir(path)
+            except OSError:
+                continue
+            for name, was_dir in old_names.items():
+                if new_names.get(name) is None or new_names[name] != was_dir:
+                    child = os.path.join(path, name)
+                    if was_dir:
+                        self._forget_tree(child)
+                    events.append((REMOVED, child))
+            for name, is_dir in new_names.items():
+                if old_names.get(name) == is_dir:
+                    continue
+                child = os.path.join(path, name)
+                if is_dir:
+                    self._snapshot_tree(child, report=events)
+                else:
+                    events.append((CHANGED, child))
+        return events
+
+    def close(self):
+        self._dirs.clear()
+
+
+class FolderWatcher:
+    """Background thread that reports debounced file changes under *root*.
+
+    *on_changes(changed_paths, removed_paths)* is called once events have
+    been quiet for *debounce* seconds, or at least every *max_delay* seconds
+    while a large copy is still in progress. Removed paths may name files or
+    whole directories. *on_overflow()* is called when events were lost and
+    the caller should fall back to a full rescan.
+    """
+
+    def __init__(
+        self,
+        root,
+        on_changes,
+        mode='auto',
+        on_overflow=None,
+        debounce=DEFAULT_DEBOUNCE_SECONDS,
+        max_delay=DEFAULT_MAX_DELAY_SECONDS,
+        poll_interval=DEFAULT_POLL_INTERVAL_SECONDS,
+    ):
+        if mode not in WATCH_MODES:
+            raise ValueError(f'Unknown watch mode: {mode}')
+        self.root = root
+        self.mode = mode
+        self.backend_name = None
+        self._on_changes = on_changes
+        self._on_overflow = on_overflow
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _open_backend(self):
+        if self.mode in ('auto', 'inotify'):
+            try:
+                return _InotifyBackend(self.root)
+            except WatcherUnavailableError as exc:
+                if self.mode == 'inotify':
+                    raise
+                logger.info('inotify unavailable (%s); polling %s instead', exc, self.root)
+        return _PollingBackend(self.root, self._poll_interval)
+
+    def start(self):
+        """Open the backend and start the watch thread. Returns False if *root* is missing."""
+        if not os.path.isdir(self.root):
+            logger.warning('Not watching missing library folder: %s', self.root)
+            return False
+        backend = self._open_backend()
+        self.backend_name = backend.name
+        self._thread = threading.Thread(
+            target=self._run, args=(backend,), name='library-watcher', daemon=True
+        )
+        self._thread.start()
+        logger.info('Watching %s for changes (%s)', self.root, backend.name)
+        return True
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self, backend):
+        pending = {}
+        overflow = False
+        first_event = last_event = 0.0
+        try:
+            while not self._stop.is_set():
+                try:
+                    events = backend.read(timeout=0.25)
+                except OSError as exc:
+                    logger.warning('Library watcher read failed for %s: %s', self.root, exc)
+                    events = [(OVERFLOW, None)]
+
+                now = time.monotonic()
+                for kind, path in events:
+                    if not pending and not overflow:
+                        first_event = now
+                    last_event = now
+                    if kind == OVERFLOW:
+                        overflow = True
+                    else:
+                        # Last event wins: create-then-delete is a removal.
+                        pending[path] = kind
+
+                if not pending and not overflow:
+                    continue
+                if now - last_event < self._debounce and now - first_event < self._max_delay:
+                    continue
+
+                batch, pending = pending, {}
+                lost, overflow = overflow, False
+                self._flush(batch, lost)
+        finally:
+            backend.close()
+
+    def _flush(self, batch, lost):
+        try:
+            if lost:
+                if self._on_overflow is not None:
+                    self._on_overflow()
+                return
+            changed = [path for path, kind in batch.items() if kind == CHANGED]
+            removed = [path for path, kind in batch.items() if kind == REMOVED]
+            self._on_changes(changed, removed)
+        except Exception:
+            logger.exception('Failed to apply library changes for %s', self.root)
@@ -5,24 +5,156 @@ folder scanning, and the DicomFolderSource cache.
 Copyright (c) 2026 Divergent Health Technologies
 """
 
+import hashlib
+import json
+import logging
 import os
+import queue
 import re
+import secrets
+import stat
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
-import pydicom
-from flask import Blueprint, current_app, jsonify, request, send_file
-from pydicom.errors import InvalidDicomError
+from flask import Blueprint, Response, current_app, jsonify, request
 
 from server import db as db_module
+from server.library.batch import (
+    BATCH_FORMATS,
+    DEFAULT_BATCH_FORMAT,
+    FRAMED_MEDIA_TYPE,
+    iter_framed,
+    iter_multipart,
+    multipart_media_type,
+)
+from server.library.cancel import CancelToken, ScanCancelledError
+from server.library.catalog import DirectoryTable, Series, SliceColumns, Snapshot, Study
+from server.library.changes import STUDY_ADDED, STUDY_CHANGED, STUDY_REMOVED, ChangeLog
+from server.library.frames import (
+    DEFAULT_FRAME_MEDIA_TYPE,
+    FRAME_MEDIA_TYPES,
+    FrameTable,
+    verify_segment,
+)
+from server.library.geometry import geometry_key, series_metadata, slice_attribute, slice_position
+from server.library.handles import FileHandleCache
+from server.library.headers import (
+    DEFAULT_HEADER_MODE,
+    HEADER_MODES,
+    SCAN_METADATA_VERSION,
+    scan_dicom_file,
+)
+from server.library.jobs import ScanJob
+from server.library.listing import (
+    DEFAULT_ORDERS,
+    DEFAULT_SORT,
+    SORT_KEYS,
+    SORT_ORDERS,
+    ListingQueryError,
+    StudyFilter,
+    StudyListing,
+    decode_cursor,
+    normalize_date,
+)
+from server.library.prefilter import SKIP_MISSING_UIDS, SKIP_NOT_DICOM, classify_entry
+from server.library.progress import CombinedScanStats, ScanStats
+from server.library.readahead import SliceReadAhead, warm_fd
+from server.library.recent import RecentFolders, root_mtime_ns
+from server.library.response_cache import ResponseCache
+from server.library.scan_index import METADATA_BATCH_SIZE, ScanIndex
+from server.library.scan_pool import DEFAULT_SCAN_ENGINE, SCAN_ENGINES, parse_files
+from server.library.serving import (
+    open_cached_slice,
+    open_slice_file,
+    read_unchanged,
+    scan_file_stat,
+    send_slice_file,
+)
+from server.library.slice_cache import SliceByteCache
+from server.library.watcher import WATCH_MODES, FolderWatcher
 
 library_bp = Blueprint('library', __name__)
+logger = logging.getLogger(__name__)
 
 # Persistent local library folder defaults (personal mode)
 DEFAULT_LIBRARY_FOLDER_RAW = '~/DICOMs'
 DEFAULT_LIBRARY_FOLDER = os.path.expanduser(DEFAULT_LIBRARY_FOLDER_RAW)
 LIBRARY_ALLOWED_ROOTS_ENV = 'DICOM_LIBRARY_ALLOWED_ROOTS'
+LIBRARY_EXTRA_ROOTS_ENV = 'DICOM_LIBRARY_EXTRA_ROOTS'
+LIBRARY_WATCH_ENV = 'DICOM_LIBRARY_WATCH'
+LIBRARY_SCAN_ENGINE_ENV = 'DICOM_LIBRARY_SCAN_ENGINE'
+LIBRARY_SCAN_WORKERS_ENV = 'DICOM_LIBRARY_SCAN_WORKERS'
+LIBRARY_SCAN_CHUNK_SIZE_ENV = 'DICOM_LIBRARY_SCAN_CHUNK_SIZE'
+LIBRARY_HEADER_MODE_ENV = 'DICOM_LIBRARY_HEADER_MODE'
+LIBRARY_RECENT_FOLDERS_MB_ENV = 'DICOM_LIBRARY_RECENT_FOLDERS_MB'
+LIBRARY_OPEN_FILES_ENV = 'DICOM_LIBRARY_OPEN_FILES'
+LIBRARY_READAHEAD_ENV = 'DICOM_LIBRARY_READAHEAD'
+LIBRARY_SLICE_CACHE_MB_ENV = 'DICOM_LIBRARY_SLICE_CACHE_MB'
+
+# Parsed results are written to the scan index in batches of this size.
+INDEX_FLUSH_SIZE = 5000
+
+# Minimum seconds between progress events on streaming scan endpoints.
+STREAM_PROGRESS_INTERVAL = 0.5
+
+# Refresh jobs kept for status polling, including finished ones.
+MAX_TRACKED_JOBS = 16
+
+# Largest page a paginated study listing returns.
+MAX_LISTING_LIMIT = 1000
+
+# Query arguments that switch /api/library/studies to a paginated listing.
+LISTING_QUERY_ARGS = (
+    'limit',
+    'offset',
+    'cursor',
+    'sort',
+    'order',
+    'dateFrom',
+    'dateTo',
+    'modality',
+    'patient',
+)
+
+# Study listing views: full studies with their series, or study-level
+# summaries whose series are fetched on demand (see get_library_study_series).
+LISTING_VIEWS = ('full', 'summary')
+
+# Most studies one batch series request may ask for.
+MAX_SERIES_BATCH = 100
+
+# Salts listing ETags, so responses of an earlier process never match.
+_LISTING_ETAG_SALT = secrets.token_hex(8)
+
+# Serialized study listings by ETag (see _memoized_json_response).
+_listing_responses = ResponseCache()
+
+# Serialized per-study series lists by ETag, kept apart so that browsing
+# series does not evict the listings.
+_series_responses = ResponseCache(max_entries=256)
+
+# Open slice files of hot series; replaced by init_library_sources.
+slice_handles = FileHandleCache()
+
+# Bytes of hot slices shared by all readers; replaced by init_library_sources.
+slice_bytes = SliceByteCache()
+
+# Sequential slice requests and the slices warmed ahead of them; replaced by
+# init_library_sources.
+slice_readahead = SliceReadAhead()
+
+# Seconds a study listing waits for library roots that are still scanning
+# before listing the others without them.
+LIBRARY_ROOT_WAIT_SECONDS = 2.0
+
+# While no root has anything to list, the listing checks again this often.
+LIBRARY_ROOT_POLL_INTERVAL = 0.25
+
+SCAN_SUPERSEDED_ERROR = 'Scan was superseded by a newer refresh or folder change'
 
 # Library config synchronization
 LIBRARY_CONFIG_LOCK = threading.Lock()
@@ -33,293 +165,1160 @@ LIBRARY_CONFIG_LOCK = threading.Lock()
 # =============================================================================
 
 
-def _extract_metadata(ds, file_path):
-    """Extract relevant metadata from a DICOM dataset."""
-
-    def get_attr(attr, default=''):
-        try:
-            val = getattr(ds, attr, default)
-            return str(val) if val is not None else default
-        except Exception:
-            return default
-
-    return {
-        'file_path': str(file_path),
-        'patient_name': get_attr('PatientName', 'Unknown'),
-        'patient_id': get_attr('PatientID', ''),
-        'study_date': get_attr('StudyDate', ''),
-        'study_description': get_attr('StudyDescription', ''),
-        'study_instance_uid': get_attr('StudyInstanceUID', '').strip(),
-        'series_description': get_attr('SeriesDescription', ''),
-        'series_instance_uid': get_attr('SeriesInstanceUID', '').strip(),
-        'series_number': get_attr('SeriesNumber', ''),
-        'modality': get_attr('Modality', ''),
-        'instance_number': int(get_attr('InstanceNumber', '0') or '0'),
-        'slice_location': float(get_attr('SliceLocation', '0') or '0'),
-    }
-
-
-def _read_single_dicom(file_path):
-    """Read a single DICOM file and return metadata or None."""
-    try:
-        ds = pydicom.dcmread(str(file_path), stop_before_pixels=True)
-        return _extract_metadata(ds, file_path)
-    except (InvalidDicomError, Exception):
-        return None
-
-
-def _resolve_series_key(series_map, bare_uid, description):
+def _resolve_series_key(series_map, bare_uid, description, composite_uids):
     """Mirror the frontend's deterministic series collision handling.
 
     Uses the bare SeriesInstanceUID unless a collision is detected for that UID
     with a different description. Once a collision exists, all colliding
     entries use composite keys of the form "{uid}|{description}".
+
+    *composite_uids* is the set of bare UIDs that already have composite keys
+    in *series_map*; it is updated here, so the collision check is a set
+    lookup rather than a scan over every key of the study.
     """
     existing = series_map.get(bare_uid)
     if existing:
-        existing_desc = existing.get('series_description', '') or ''
+        existing_desc = existing.series_description or ''
         if existing_desc == description:
             return bare_uid
         old_key = f'{bare_uid}|{existing_desc}'
         series_map[old_key] = existing
-        existing['series_id'] = old_key
+        existing.series_id = old_key
         del series_map[bare_uid]
+        composite_uids.add(bare_uid)
         return f'{bare_uid}|{description}'
 
-    composite_key = f'{bare_uid}|{description}'
-    if composite_key in series_map:
-        return composite_key
+    if bare_uid in composite_uids:
+        return f'{bare_uid}|{description}'
+    return bare_uid
 
-    has_collision = any(key.startswith(f'{bare_uid}|') for key in series_map)
-    return composite_key if has_collision else bare_uid
 
+def _add_to_studies(studies, meta, directories):
+    """Add one slice's metadata to the study/series tree.
 
-def scan_dicom_folder(folder_path, logger=None):
-    """Scan a folder for DICOM files and organize by study/series."""
-    studies = {}
-    folder = Path(folder_path)
+    *directories* is the DirectoryTable shared by the snapshot being built.
+    Returns the Series the slice was added to, or None if it was skipped.
+    """
+    if meta is None or not meta['study_instance_uid'] or not meta['series_instance_uid']:
+        return None
 
-    if not folder.exists():
-        return studies
+    study_id = meta['study_instance_uid']
+    # Initialize study
+    study = studies.get(study_id)
+    if study is None:
+        study = studies[study_id] = Study(
+            study_id,
+            meta['patient_name'],
+            meta['patient_id'],
+            meta['study_date'],
+            meta['study_description'],
+            meta['modality'],
+        )
 
-    file_paths = [f for f in folder.rglob('*') if f.is_file()]
-    if logger:
-        logger.info('Scanning %d files in %s', len(file_paths), folder_path)
+    bare_series_id = meta['series_instance_uid']
+    series_id = _resolve_series_key(
+        study.series, bare_series_id, meta['series_description'] or '', study.composite_uids
+    )
+
+    # Initialize series
+    series = study.series.get(series_id)
+    if series is None:
+        series = study.series[series_id] = Series(
+            series_id,
+            meta['series_description'],
+            meta['series_number'],
+            meta['modality'],
+            SliceColumns(directories),
+        )
 
-    with ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2) as executor:
-        futures = {executor.submit(_read_single_dicom, fp): fp for fp in file_paths}
+    # Add slice
+    series.slices.append(
+        meta['file_path'],
+        meta['instance_number'],
+        meta['slice_location'],
+        slice_position(meta),
+        geometry_key(meta),
+        FrameTable.from_meta(meta.get('frame_table')),
+        scan_file_stat(meta),
+        meta.get('link_target'),
+    )
+    study.image_count += 1
+    return series
 
-        for future in as_completed(futures):
-            meta = future.result()
-            if meta is None or not meta['study_instance_uid'] or not meta['series_instance_uid']:
-                continue
 
-            study_id = meta['study_instance_uid']
-            # Initialize study
-            if study_id not in studies:
-                studies[study_id] = {
-                    'study_id': study_id,
-                    'patient_name': meta['patient_name'],
-                    'patient_id': meta['patient_id'],
-                    'study_date': meta['study_date'],
-                    'study_description': meta['study_description'],
-                    'modality': meta['modality'],
-                    'series': {},
-                    'image_count': 0,
-                }
+def _finalize_studies(studies):
+    """Sort slices and count series once all slices have been added."""
+    for study in studies.values():
+        for series in study.series.values():
+            series.slices.sort()
+        study.series_count = len(study.series)
 
-            bare_series_id = meta['series_instance_uid']
-            series_id = _resolve_series_key(
-                studies[study_id]['series'], bare_series_id, meta['series_description'] or ''
-            )
 
-            # Initialize series
-            if series_id not in studies[study_id]['series']:
-                studies[study_id]['series'][series_id] = {
-                    'series_id': series_id,
-                    'series_description': meta['series_description'],
-                    'series_number': meta['series_number'],
-                    'modality': meta['modality'],
-                    'slices': [],
-                }
+def _rekey_series(study):
+    """Recompute series keys after a series was removed from *study*.
+
+    Collision keys depend on which series share a UID, so dropping one can
+    turn the survivors back into bare-UID keys, exactly as a fresh scan would.
+    """
+    series_map = {}
+    composite_uids = set()
+    for series in study.series.values():
+        bare_uid = series.series_id.partition('|')[0]
+        key = _resolve_series_key(
+            series_map, bare_uid, series.series_description or '', composite_uids
+        )
+        series.series_id = key
+        series_map[key] = series
+    study.series = series_map
+    study.composite_uids = composite_uids
 
-            # Add slice
-            studies[study_id]['series'][series_id]['slices'].append(
-                {
-                    'file_path': meta['file_path'],
-                    'instance_number': meta['instance_number'],
-                    'slice_location': meta['slice_location'],
-                }
-            )
-            studies[study_id]['image_count'] += 1
 
-    # Sort slices and count series
+def _snapshot_directories(studies):
+    """Return the DirectoryTable shared by the series of *studies*."""
     for study in studies.values():
-        for series in study['series'].values():
-            series['slices'].sort(key=lambda x: (x['slice_location'], x['instance_number']))
-        study['series_count'] = len(study['series'])
+        for series in study.series.values():
+            return series.slices.directories
+    return DirectoryTable()
+
+
+def _patch_studies(studies, stale_paths, metas):
+    """Patch snapshot *studies*: remove *stale_paths* and add *metas*.
+
+    A stale path drops every slice whose file is that path or lies below it,
+    so removing a directory removes all of its slices. Only the series with
+    slices in the directories concerned are checked (see DirectoryIndex), and
+    only the studies that change are copied; the rest are shared with the
+    previous snapshot, which is never mutated. Returns the patched studies
+    and their DirectoryIndex.
+    """
+    patched = dict(studies)
+    owned = set()
+    directories = _snapshot_directories(studies)
+    index = studies.directory_index()
+
+    def own_study(study_id):
+        if study_id not in owned:
+            patched[study_id] = patched[study_id].copy()
+            owned.add(study_id)
+        return patched[study_id]
+
+    removed = set()
+    if stale_paths:
+        exact = set(stale_paths)
+        prefixes = tuple(path.rstrip(os.sep) + os.sep for path in exact)
+
+        for study_id, series_keys in index.series_at(exact, prefixes).items():
+            study = studies[study_id]
+            for series_id in series_keys:
+                kept = study.series[series_id].slices.without(exact, prefixes)
+                if kept is None:
+                    continue
+                owned_study = own_study(study_id)
+                owned_series = owned_study.series[series_id]
+                owned_study.image_count -= len(owned_series.slices) - len(kept)
+                owned_series.slices = kept
+
+        for study_id in list(owned):
+            study = patched[study_id]
+            emptied = [key for key, series in study.series.items() if not len(series.slices)]
+            if not emptied:
+                continue
+            for key in emptied:
+                del study.series[key]
+            if study.series:
+                _rekey_series(study)
+            else:
+                del patched[study_id]
+                owned.discard(study_id)
+                removed.add(study_id)
+
+    for meta in metas:
+        study_id = meta['study_instance_uid']
+        if study_id in patched:
+            own_study(study_id)
+        if _add_to_studies(patched, meta, directories):
+            owned.add(study_id)
+
+    _finalize_studies({study_id: patched[study_id] for study_id in owned})
+    return patched, index.updated(patched, owned | removed)
+
+
+def _iter_library_files(folder_path):
+    """Yield (path, size, mtime_ns, is_symlink) for every regular file below *folder_path*.
+
+    Walks with os.scandir so entry types (and, on most platforms, stat data)
+    come back with the directory listing, and never materializes the whole
+    tree. Symlinked directories are not followed: their targets usually lie
+    outside the library root and could not be served anyway.
+    """
+    pending = [os.fspath(folder_path)]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    is_symlink = entry.is_symlink()
+                except OSError:
+                    continue
+                yield entry.path, st.st_size, st.st_mtime_ns, is_symlink
+
+
+def _same_link_target(meta, path, is_symlink):
+    """Whether an index row still describes the file, or the symlink target, at *path*.
+
+    Size and mtime are those of the target, so a file replaced by a symlink
+    (or a symlink pointed elsewhere) would otherwise reuse a row whose
+    link_target no longer matches.
+    """
+    if meta is None:
+        # Skipped files are never served.
+        return True
+    link_target = meta.get('link_target')
+    if not is_symlink:
+        return link_target is None
+    return link_target == os.path.realpath(path)
+
+
+def scan_dicom_folder(
+    folder_path,
+    logger=None,
+    index=None,
+    engine=DEFAULT_SCAN_ENGINE,
+    workers=None,
+    chunk_size=None,
+    header_mode=DEFAULT_HEADER_MODE,
+    stats=None,
+    on_discover=None,
+    cancel=None,
+):
+    """Scan a folder for DICOM files and organize by study/series.
+
+    The directory walk is streamed into the parser pool, so parsing starts
+    with the first file found and memory does not grow with the number of
+    paths. When *index* (a ScanIndex) is given, files whose size and mtime
+    match their indexed entry reuse the stored metadata, read from the index
+    in batches as the walk reaches them. Only new or changed files are
+    parsed, and index entries for files that no longer exist are pruned.
+
+    Files are pre-filtered by name, size and a 132-byte header probe before
+    pydicom sees them (see prefilter). Files rejected from the directory entry
+    alone are never opened or indexed. *engine* selects thread or process
+    parsing (see scan_pool.parse_files); *workers* and *chunk_size* tune it.
+    *header_mode* chooses selective or full header reads (see headers).
+    *stats* (a ScanStats) receives progress counters and skip reasons.
+
+    *on_discover*, if given, is called as on_discover(study, series) on the
+    scanning thread each time a slice starts a new series. Series keys seen
+    there are provisional: a later slice can turn a bare UID key into a
+    collision key.
+
+    *cancel* (a CancelToken) is checked for every directory entry and every
+    parse result. A cancelled scan raises ScanCancelledError after saving
+    the results it has so far to the index.
+    """
+    studies = {}
+    if not os.path.exists(folder_path):
+        return studies
+
+    if stats is None:
+        stats = ScanStats()
+    known = index.load(folder_path) if index is not None else {}
+    directories = DirectoryTable()
+
+    def add(meta):
+        series = _add_to_studies(studies, meta, directories)
+        if series is not None and on_discover is not None and len(series.slices) == 1:
+            on_discover(studies[meta['study_instance_uid']], series)
+        return series
+
+    # Unchanged files with indexed metadata, whose rows are read in batches.
+    reused = []
+
+    def add_reused():
+        metas = index.load_metadata(folder_path, [path for path, _, _, _ in reused])
+        for path, size, mtime_ns, is_symlink in reused:
+            meta = metas.get(path)
+            if meta is None or not _same_link_target(meta, path, is_symlink):
+                yield path, size, mtime_ns
+            elif add(meta):
+                stats.cached()
+            else:
+                stats.skip(SKIP_MISSING_UIDS)
+        reused.clear()
+
+    def changed_files():
+        for path, size, mtime_ns, is_symlink in _iter_library_files(folder_path):
+            if cancel is not None:
+                cancel.check()
+            stats.walked()
+            reason = classify_entry(os.path.basename(path), size)
+            if reason is not None:
+                # Left in `known`, so any stale index row is pruned below.
+                stats.skip(reason)
+                continue
+            entry = known.pop(path, None)
+            if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+                if not entry[2]:
+                    stats.skip(entry[3] or SKIP_NOT_DICOM)
+                    continue
+                reused.append((path, size, mtime_ns, is_symlink))
+                if len(reused) >= METADATA_BATCH_SIZE:
+                    yield from add_reused()
+                continue
+            yield path, size, mtime_ns
+        if reused:
+            yield from add_reused()
+
+    upserts = []
+    try:
+        for (path, size, mtime_ns), meta, reason in parse_files(
+            changed_files(),
+            engine=engine,
+            workers=workers,
+            chunk_size=chunk_size,
+            header_mode=header_mode,
+            cancel=cancel,
+        ):
+            stats.parsed()
+            if reason is None and not add(meta):
+                reason = SKIP_MISSING_UIDS
+            if reason is not None:
+                stats.skip(reason)
+            if index is not None:
+                upserts.append((path, size, mtime_ns, meta, reason))
+                if len(upserts) >= INDEX_FLUSH_SIZE:
+                    index.apply(folder_path, upserts, ())
+                    upserts = []
+    except ScanCancelledError:
+        if index is not None and upserts:
+            # Keep the work already done. Nothing is pruned: the walk did not
+            # finish, so unseen files are not known to be gone.
+            index.apply(folder_path, upserts, ())
+        if logger:
+            logger.info('Cancelled scan of %s after %d files', folder_path, stats.files_walked)
+        raise
+
+    if index is not None:
+        # Whatever is left in `known` was not seen on disk this time.
+        index.apply(folder_path, upserts, known.keys())
+
+    _finalize_studies(studies)
+    stats.finish()
 
     if logger:
-        logger.info('Found %d studies in %s', len(studies), folder_path)
+        logger.info(
+            'Scanned %d files (%d parsed) in %s: %d studies',
+            stats.files_walked,
+            stats.files_parsed,
+            folder_path,
+            len(studies),
+        )
+        if stats.skipped:
+            logger.info(
+                'Skipped %d files in %s: %s',
+                sum(stats.skipped.values()),
+                folder_path,
+                ', '.join(f'{reason}={count}' for reason, count in sorted(stats.skipped.items())),
+            )
     return studies
 
 
+def _format_series(series_id, series):
+    return {
+        'seriesInstanceUid': series_id,
+        'seriesDescription': series.series_description,
+        'seriesNumber': series.series_number,
+        'modality': series.modality,
+        'sliceCount': len(series.slices),
+    }
+
+
+def _format_study_summary(study_id, study):
+    """Study-level fields only, without the series list."""
+    return {
+        'studyInstanceUid': study_id,
+        'patientName': study.patient_name,
+        'patientId': study.patient_id,
+        'studyDate': study.study_date,
+        'studyDescription': study.study_description,
+        'modality': study.modality,
+        'seriesCount': len(study.series),
+        'imageCount': study.image_count,
+    }
+
+
+def _format_study(study_id, study):
+    formatted = _format_study_summary(study_id, study)
+    formatted['series'] = [
+        _format_series(series_id, series) for series_id, series in study.series.items()
+    ]
+    return formatted
+
+
+def _format_change(generation, op, study_id, series_key, record):
+    """Format a change log entry for /api/library/changes."""
+    change = {'op': op, 'generation': generation, 'studyInstanceUid': study_id}
+    if op == STUDY_ADDED:
+        change['study'] = _format_study(study_id, record)
+    elif op == STUDY_CHANGED:
+        change['study'] = _format_study_summary(study_id, record)
+    elif series_key is not None:
+        if record is None:
+            change['seriesInstanceUid'] = series_key
+        else:
+            change['series'] = _format_series(series_key, record)
+    return change
+
+
 # =============================================================================
 # DICOM FOLDER SOURCE (CACHED SCANNER)
 # =============================================================================
 
 
 class DicomFolderSource:
-    """Reusable DICOM folder scanner with caching."""
+    """Reusable DICOM folder scanner with caching.
+
+    An optional ScanIndex makes cold starts and rescans incremental: only files
+    added or changed since the indexed scan are parsed again.
+
+    The cached studies dict is a snapshot: it is never mutated once
+    published, and a rescan or patch replaces it with a single assignment.
+    Readers holding the previous snapshot keep a consistent view, which is
+    what lets start_refresh() rescan in the background while requests are
+    still served from the old data.
+
+    With *recent_folders* (a RecentFolders), set_folder() keeps the snapshot
+    of the folder it switches away from, and switching back to a folder
+    whose mtime is unchanged reuses it instead of rescanning.
+    """
 
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, index=None, scan_options=None, recent_folders=None):
         self.folder_path = folder_path
+        self._index = index
+        # Keyword arguments forwarded to scan_dicom_folder
+        # (engine, workers, chunk_size, header_mode)
+        self.scan_options = dict(scan_options or {})
         self._cache = None
+        # Folder mtime taken when the cached scan started
+        self._cache_root_mtime_ns = None
+        self._recent_folders = recent_folders
+        # Differences between the snapshots published, for the change feed
+        self._changes = ChangeLog(_format_change)
         self._lock = threading.Lock()
         self._scan_cv = threading.Condition(self._lock)
         self._scan_in_progress = False
+        # CancelToken and folder of the scan in progress
+        self._scan_token = None
+        self._scan_folder = None
+        # Token of the last scan whose result was published
+        self._published_token = None
+        # Callers waiting in _supersede_scan()
+        self._superseding = 0
+        self._watch_mode = None
+        self._watcher = None
+        # ScanStats of the most recent full scan (None until one has run)
+        self.last_scan_stats = None
+        # Background refresh jobs by id, oldest first
+        self._jobs = OrderedDict()
+        self._active_job = None
+        # (folder_path, its realpath), for checking symlinked slices
+        self._resolved_folder = None
 
     def is_available(self):
         return os.path.exists(self.folder_path)
 
-    def get_data(self):
-        """Load studies from the folder (cached)."""
+    def _scan(self, folder_path, cancel, stats=None, on_discover=None):
+        """Scan *folder_path*; returns (studies, folder mtime before the scan)."""
+        if stats is None:
+            stats = ScanStats()
+        self.last_scan_stats = stats
+        # Taken first, so a change made during the walk invalidates the result.
+        mtime_ns = root_mtime_ns(folder_path)
+        studies = scan_dicom_folder(
+            folder_path,
+            logger=logger,
+            index=self._index,
+            stats=stats,
+            on_discover=on_discover,
+            cancel=cancel,
+            **self.scan_options,
+        )
+        return studies, mtime_ns
+
+    def _claim_scan(self, folder_path):
+        """Mark a scan of *folder_path* as in progress; return its token. Caller holds the lock."""
+        self._scan_in_progress = True
+        self._scan_token = CancelToken()
+        self._scan_folder = folder_path
+        return self._scan_token
+
+    def _supersede_scan(self):
+        """Cancel the scan in progress and wait for it to unwind. Caller holds the lock.
+
+        Scans claimed while this waits are cancelled too, and get_data() and
+        preload() do not claim any: the caller claims the next scan (or
+        publishes a snapshot) before it releases the lock.
+        """
+        self._superseding += 1
+        try:
+            while self._scan_in_progress:
+                if self._scan_token is not None:
+                    self._scan_token.cancel()
+                self._scan_cv.wait()
+        finally:
+            self._superseding -= 1
+            self._scan_cv.notify_all()
+
+    def _publish(self, studies, root_mtime_ns, reset_changes=False, directory_index=None):
+        """Replace the cached snapshot, giving it a new generation. Caller holds the lock.
+
+        The differences from the previous snapshot go to the change log,
+        unless *reset_changes* says the two are unrelated (folder switch).
+        *directory_index*, if given, is the DirectoryIndex of *studies*.
+        """
+        previous = self._cache
+        self._cache = Snapshot(studies, directory_index) if studies is not None else None
+        if previous is not None:
+            slice_handles.discard_generation(previous.generation)
+            slice_bytes.discard_generation(previous.generation)
+        self._cache_root_mtime_ns = root_mtime_ns
+        if reset_changes:
+            self._changes.reset(self._cache)
+        else:
+            self._changes.record(previous, self._cache)
+
+    def _finish_scan(self, scanned=None, replace=True):
+        """Publish *scanned*, a _scan() result, (if *replace*) and release the scanner."""
+        with self._scan_cv:
+            if replace:
+                self._publish(*(scanned or (None, None)))
+                self._published_token = self._scan_token
+            self._scan_in_progress = False
+            self._scan_token = None
+            self._scan_folder = None
+            self._scan_cv.notify_all()
+            return self._cache or {}
+
+    def get_data(self, stats=None, on_discover=None):
+        """Load studies from the folder (cached).
+
+        *stats* and *on_discover* are passed to scan_dicom_folder if this
+        call ends up running the scan. Waits for a scan already in progress
+        rather than cancelling it, and for a folder switch to claim its own.
+        """
         with self._scan_cv:
             while True:
                 if self._cache is not None:
                     return self._cache
-                if self._scan_in_progress:
+                if self._scan_in_progress or self._superseding:
                     self._scan_cv.wait()
                     continue
                 if not os.path.exists(self.folder_path):
                     return {}
-                self._scan_in_progress = True
+                folder_path = self.folder_path
+                token = self._claim_scan(folder_path)
                 break
+        return self._load(folder_path, token, stats, on_discover)
 
+    def _load(self, folder_path, token, stats=None, on_discover=None):
+        """Run the initial scan claimed by get_data() or preload()."""
         try:
-            scanned = scan_dicom_folder(self.folder_path)
+            scanned = self._scan(folder_path, token, stats, on_discover)
+        except ScanCancelledError:
+            # A folder change took over; get_data() waits for what it produces.
+            self._finish_scan(replace=False)
+            return self.get_data()
         except Exception:
-            with self._scan_cv:
-                self._scan_in_progress = False
-                self._scan_cv.notify_all()
+            self._finish_scan(replace=False)
             raise
 
-        with self._scan_cv:
-            if self._cache is None:
-                self._cache = scanned
-            self._scan_in_progress = False
-            self._scan_cv.notify_all()
-            return self._cache or {}
+        return self._finish_scan(scanned)
 
-    def refresh(self):
-        """Rescan folder and refresh cache."""
+    def preload(self):
+        """Start the initial scan on a worker thread unless one is cached or running."""
         with self._scan_cv:
-            while self._scan_in_progress:
-                self._scan_cv.wait()
-            self._scan_in_progress = True
+            if self._cache is not None or self._scan_in_progress or self._superseding:
+                return
+            if not os.path.exists(self.folder_path):
+                return
+            folder_path = self.folder_path
+            token = self._claim_scan(folder_path)
+
+        def run():
+            try:
+                self._load(folder_path, token)
+            except Exception:
+                logger.exception('Library scan failed: %s', folder_path)
+
+        threading.Thread(target=run, name='library-preload', daemon=True).start()
+
+    def cached_data(self):
+        """Return the cached studies without scanning, or None if not loaded."""
+        return self._cache
+
+    def changes_since(self, generation):
+        """Return the change log entries published after *generation*.
+
+        Each entry is (generation, op, study_id, change), change formatted
+        by _format_change; see ChangeLog. Returns None when the log no longer reaches back to
+        *generation* (or never did, e.g. across a folder switch), in which
+        case the client has to reload the whole listing.
+        """
+        with self._lock:
+            return self._changes.since(generation)
+
+    def wait_for_data(self, timeout):
+        """Return the cached studies, waiting up to *timeout* seconds for a scan.
+
+        Returns None if a scan is still running when the time is up, and an
+        empty dict if nothing is cached and no scan is running.
+        """
+        deadline = time.monotonic() + timeout
+        with self._scan_cv:
+            while self._cache is None and self._scan_in_progress:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._scan_cv.wait(remaining)
+            return self._cache if self._cache is not None else {}
+
+    def refresh(self, stats=None, on_discover=None):
+        """Rescan folder and refresh cache (see get_data for the arguments).
+
+        A scan of the same folder already in progress is joined and its
+        result shared (*stats* and *on_discover* then see nothing); a new
+        scan only starts if it fails. Raises ScanCancelledError if the scan
+        is superseded by a switch to another folder.
+        """
+        with self._scan_cv:
+            while self._scan_in_progress and self._scan_folder == self.folder_path:
+                token = self._scan_token
+                while self._scan_token is token:
+                    self._scan_cv.wait()
+                if token.cancelled:
+                    raise ScanCancelledError()
+                if self._published_token is token:
+                    return self._cache or {}
+            self._supersede_scan()
+            folder_path = self.folder_path
+            token = self._claim_scan(folder_path)
 
         try:
-            if os.path.exists(self.folder_path):
-                scanned = scan_dicom_folder(self.folder_path)
+            if os.path.exists(folder_path):
+                scanned = self._scan(folder_path, token, stats, on_discover)
             else:
                 scanned = None
         except Exception:
-            with self._scan_cv:
-                self._scan_in_progress = False
-                self._scan_cv.notify_all()
+            self._finish_scan(replace=False)
             raise
+        return self._finish_scan(scanned)
+
+    # -- Background refresh ---------------------------------------------------
+
+    def start_refresh(self):
+        """Rescan on a worker thread and return the ScanJob tracking it.
+
+        The previous snapshot keeps being served until the rescan replaces
+        it. A request made while a refresh job is running returns that job
+        instead of queueing another full scan.
+        """
+        with self._lock:
+            job = self._active_job
+            # A job still unwinding from a folder switch does not count.
+            if job is not None and job.running and job.folder_path == self.folder_path:
+                return job
+            job = ScanJob(self.folder_path)
+            self._active_job = job
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+
+        threading.Thread(
+            target=self._run_refresh_job, args=(job,), name='library-refresh', daemon=True
+        ).start()
+        return job
+
+    def _run_refresh_job(self, job):
+        try:
+            studies = self.refresh(stats=job.stats)
+        except ScanCancelledError:
+            job.cancel()
+            return
+        except Exception:
+            logger.exception('Background library refresh failed: %s', job.folder_path)
+            job.fail('Failed to scan library folder')
+            return
+        job.complete(studies)
 
-        with self._scan_cv:
-            self._cache = scanned
-            self._scan_in_progress = False
-            self._scan_cv.notify_all()
-            return self._cache or {}
+    def get_job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_job(self):
+        """Return the running refresh job, or None."""
+        job = self._active_job
+        return job if job is not None and job.running else None
 
     def set_folder(self, new_path):
-        """Change source folder path and refresh cache from that folder."""
+        """Change source folder path and refresh cache from that folder.
+
+        Any scan in progress (of the old folder, or an earlier switch) is
+        cancelled rather than waited for. Raises ScanCancelledError if a
+        later switch supersedes this one. Setting the current folder again
+        is a refresh(), which joins a scan already running.
+
+        A recent snapshot of *new_path* whose folder mtime is unchanged is
+        published at once, and a background refresh then checks for changes
+        deeper in the tree; with the scan index that is a stat-only walk.
+        """
+        if os.path.abspath(new_path) == os.path.abspath(self.folder_path):
+            return self.refresh()
+        current_mtime_ns = root_mtime_ns(new_path)
         with self._scan_cv:
-            while self._scan_in_progress:
-                self._scan_cv.wait()
+            self._supersede_scan()
+            recent = None
+            if self._recent_folders is not None:
+                if self._cache is not None:
+                    self._recent_folders.put(
+                        self.folder_path, self._cache, self._cache_root_mtime_ns
+                    )
+                recent = self._recent_folders.take(new_path, current_mtime_ns)
             folder_path = new_path
             self.folder_path = folder_path
-            self._cache = None
-            self._scan_in_progress = True
+            if recent is not None:
+                self._publish(recent.studies, recent.root_mtime_ns, reset_changes=True)
+                restored = self._cache
+            else:
+                self._publish(None, None, reset_changes=True)
+                token = self._claim_scan(folder_path)
+
+        if recent is not None:
+            if self._watch_mode is not None:
+                self._restart_watcher()
+            self.start_refresh()
+            return restored
 
         try:
             if os.path.exists(folder_path):
-                scanned = scan_dicom_folder(folder_path)
+                scanned = self._scan(folder_path, token)
             else:
                 scanned = None
         except Exception:
-            with self._scan_cv:
-                self._scan_in_progress = False
-                self._scan_cv.notify_all()
+            self._finish_scan(replace=False)
             raise
+        result = self._finish_scan(scanned)
+
+        if self._watch_mode is not None:
+            self._restart_watcher()
+        return result
+
+    # -- Change watching ---------------------------------------------------
+
+    def start_watching(self, mode='auto'):
+        """Watch the folder and patch the cache as files change (see FolderWatcher)."""
+        if mode not in WATCH_MODES:
+            raise ValueError(f'Unknown watch mode: {mode}')
+        self._watch_mode = mode
+        self._restart_watcher()
+
+    def stop_watching(self):
+        self._watch_mode = None
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def _restart_watcher(self):
+        previous, self._watcher = self._watcher, None
+        if previous is not None:
+            previous.stop()
+
+        folder_path = self.folder_path
+        watcher = FolderWatcher(
+            folder_path,
+            on_changes=lambda changed, removed: self.apply_changes(folder_path, changed, removed),
+            mode=self._watch_mode,
+            on_overflow=self.start_refresh,
+        )
+        if watcher.start():
+            self._watcher = watcher
+
+    def apply_changes(self, folder_path, changed_paths, removed_paths):
+        """Patch the cached studies with file-level changes under *folder_path*.
+
+        Changed files are re-parsed and replace any slice previously recorded
+        for the same path. Removed paths may be files or directories. Changes
+        for a folder that is no longer active are ignored.
+        """
+        header_mode = self.scan_options.get('header_mode', DEFAULT_HEADER_MODE)
+        upserts = []
+        metas = []
+        for path in changed_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if classify_entry(os.path.basename(path), st.st_size) is not None:
+                continue
+            meta, reason = scan_dicom_file(path, header_mode)
+            upserts.append((path, st.st_size, st.st_mtime_ns, meta, reason))
+            if meta is not None:
+                metas.append(meta)
 
         with self._scan_cv:
-            self._cache = scanned
-            self._scan_in_progress = False
-            self._scan_cv.notify_all()
-            return self._cache or {}
+            # A scan in progress may or may not have seen these files; patch
+            # its result once it lands. Patching is idempotent either way.
+            while self._scan_in_progress:
+                self._scan_cv.wait()
+            if folder_path != self.folder_path:
+                return
+            if self._index is not None:
+                self._index.apply(folder_path, upserts, removed_paths)
+            if self._cache is None:
+                # Nothing cached yet; the next scan picks the changes up.
+                return
+            patched, directory_index = _patch_studies(
+                self._cache, list(changed_paths) + list(removed_paths), metas
+            )
+            self._publish(patched, self._cache_root_mtime_ns, directory_index=directory_index)
 
     def format_studies(self, studies=None):
         """Format studies in the JSON shape expected by the frontend."""
         if studies is None:
             studies = self.get_data()
-        return [
-            {
-                'studyInstanceUid': study_id,
-                'patientName': study['patient_name'],
-                'patientId': study['patient_id'],
-                'studyDate': study['study_date'],
-                'studyDescription': study['study_description'],
-                'modality': study['modality'],
-                'seriesCount': len(study['series']),
-                'imageCount': study['image_count'],
-                'series': [
-                    {
-                        'seriesInstanceUid': series_id,
-                        'seriesDescription': series['series_description'],
-                        'seriesNumber': series['series_number'],
-                        'modality': series['modality'],
-                        'sliceCount': len(series['slices']),
-                    }
-                    for series_id, series in study['series'].items()
-                ],
-            }
-            for study_id, study in studies.items()
-        ]
+        return [_format_study(study_id, study) for study_id, study in studies.items()]
 
-    def get_slice_path(self, study_id, series_id, slice_num):
-        """Look up file path for a specific slice. Returns path or None."""
-        studies = self.get_data()
+    def _find_slices(self, study_id, series_id, slice_num, studies=None):
+        """Return the SliceColumns holding a slice, or None if there is no such slice."""
+        if studies is None:
+            studies = self.get_data()
         study = studies.get(study_id)
         if not study:
             return None
 
-        series = study['series'].get(series_id)
+        series = study.series.get(series_id)
         if not series:
             return None
 
-        if slice_num < 0 or slice_num >= len(series['slices']):
+        if slice_num < 0 or slice_num >= len(series.slices):
             return None
 
-        return series['slices'][slice_num]['file_path']
+        return series.slices
+
+    def get_slice_path(self, study_id, series_id, slice_num):
+        """Look up file path for a specific slice. Returns path or None."""
+        slices = self._find_slices(study_id, series_id, slice_num)
+        return slices.file_path(slice_num) if slices is not None else None
+
+    def get_safe_slice(self, study_id, series_id, slice_num):
+        """Look up a slice; returns (safe path, its SliceColumns, snapshot generation) or None."""
+        studies = self.get_data()
+        slices = self._find_slices(study_id, series_id, slice_num, studies)
+        if slices is None:
+            return None
+        file_path = self._safe_slice_path(slices, slice_num)
+        return (file_path, slices, studies.generation) if file_path else None
 
     def get_safe_slice_path(self, study_id, series_id, slice_num):
         """Look up a slice path and ensure it stays inside source folder."""
-        file_path = self.get_slice_path(study_id, series_id, slice_num)
-        if not file_path:
+        slices = self._find_slices(study_id, series_id, slice_num)
+        if slices is None:
             return None
+        return self._safe_slice_path(slices, slice_num)
 
-        try:
-            resolved_path = Path(file_path).resolve()
-            resolved_root = Path(self.folder_path).resolve()
-            if not resolved_path.is_relative_to(resolved_root):
-                return None
-            return str(resolved_path)
-        except Exception:
+    def get_safe_series_paths(self, study_id, series_id, start=0, end=None):
+        """Look up the slices start..end (exclusive) of a series, clamped to its length.
+
+        Returns ([(slice index, safe path or None)], snapshot generation), or
+        None if there is no such series.
+        """
+        studies = self.get_data()
+        study = studies.get(study_id)
+        series = study.series.get(series_id) if study else None
+        if series is None:
             return None
+        slices = series.slices
+        return [
+            (index, self._safe_slice_path(slices, index))
+            for index in range(start, min(len(slices), len(slices) if end is None else end))
+        ], studies.generation
+
+    def _safe_slice_path(self, slices, index):
+        """Return the path of slice *index*, or None if it leads outside the source folder.
+
+        Scans walk the folder without following directory symlinks, so a
+        slice path lies inside it unless the file itself is a symlink; those
+        were resolved at scan time (SliceColumns.link_targets) and only their
+        target is checked here, without touching the filesystem.
+        """
+        target = slices.link_targets.get(index)
+        if target is None:
+            return slices.file_path(index)
+        root = self._resolved_folder_path().rstrip(os.sep) + os.sep
+        return target if target.startswith(root) else None
+
+    def _resolved_folder_path(self):
+        folder_path = self.folder_path
+        resolved = self._resolved_folder
+        if resolved is None or resolved[0] != folder_path:
+            resolved = self._resolved_folder = (folder_path, os.path.realpath(folder_path))
+        return resolved[1]
+
+
+# =============================================================================
+# LIBRARY COLLECTION (MULTIPLE ROOTS)
+# =============================================================================
+
+
+def _merge_studies(snapshots):
+    """Merge per-root studies; a study found under several roots comes from the first."""
+    non_empty = [studies for studies in snapshots if studies]
+    if len(non_empty) == 1:
+        # Nothing to merge; the snapshot is never mutated, so share it.
+        return non_empty[0]
+    merged = {}
+    for studies in non_empty:
+        for study_id, study in studies.items():
+            merged.setdefault(study_id, study)
+    return merged
+
+
+def _run_concurrently(func, items):
+    """Call func(item) for each item on its own thread and return the results in order.
+
+    Waits for every call; the first exception (in item order) is re-raised.
+    """
+    if len(items) == 1:
+        return [func(items[0])]
+    with ThreadPoolExecutor(max_workers=len(items), thread_name_prefix='library-root') as executor:
+        futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def _announce_studies(studies, on_discover):
+    for study in studies.values():
+        for series in study.series.values():
+            on_discover(study, series)
+            break
+
+
+class LibraryCollection:
+    """The library roots, listed as one library.
+
+    Each root is its own DicomFolderSource that scans, caches, refreshes and
+    watches independently, and roots are scanned concurrently. Listings merge
+    the roots that are ready and report the others as still scanning, so a
+    slow network share does not hold back a local disk. The first root is
+    the configurable library folder; a study found under several roots is
+    served from the earliest one.
+    """
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+        # StudyListing of the most recent snapshots listed
+        self._listing = None
+
+    @property
+    def primary(self):
+        return self.sources[0]
+
+    def snapshots(self, sources=None, wait=LIBRARY_ROOT_WAIT_SECONDS):
+        """Return the studies of each of *sources* (default all), None while scanning.
+
+        Roots that are not loaded yet start scanning in the background, and
+        together get *wait* seconds to finish. While no root has anything to
+        list, keeps waiting for the first that does.
+        """
+        sources = self.sources if sources is None else sources
+        for source in sources:
+            source.preload()
+        deadline = time.monotonic() + wait
+        while True:
+            snapshots = [
+                source.wait_for_data(max(0.0, deadline - time.monotonic())) for source in sources
+            ]
+            if any(snapshots) or all(studies is not None for studies in snapshots):
+                return snapshots
+            deadline = time.monotonic() + LIBRARY_ROOT_POLL_INTERVAL
+
+    def listing(self, snapshots):
+        """Return the StudyListing for *snapshots* (from snapshots()).
+
+        The listing, and with it the sort indexes, is reused until one of
+        the snapshots is replaced.
+        """
+        listing = self._listing
+        if listing is not None and len(listing.snapshots) == len(snapshots):
+            if all(
+                previous is current or (not previous and not current)
+                for previous, current in zip(listing.snapshots, snapshots)
+            ):
+                return listing
+        listing = StudyListing(snapshots, _merge_studies(snapshots))
+        self._listing = listing
+        return listing
+
+    def merged_studies(self, sources=None):
+        """Return the merged studies of the roots that are ready (see snapshots)."""
+        return _merge_studies(self.snapshots(sources))
+
+    def get_data(self, stats=None, on_discover=None, sources=None):
+        """Load *sources* (default all) concurrently and return the merged studies.
+
+        Unlike merged_studies this waits for every root. *stats* is a
+        CombinedScanStats that gets one part per root actually scanned, and
+        *on_discover* is passed to each scan. With several roots, studies of
+        roots already cached are passed to *on_discover* straight away.
+        """
+        sources = self.sources if sources is None else sources
+
+        def load(source):
+            cached = source.cached_data()
+            if cached is not None:
+                if on_discover is not None and len(sources) > 1:
+                    _announce_studies(cached, on_discover)
+                return cached
+            part = stats.add() if stats is not None else None
+            studies = source.get_data(part, on_discover)
+            if part is not None and part.finished_at is None:
+                # Another request's scan produced the data; nothing was counted.
+                stats.discard(part)
+            return studies
+
+        return _merge_studies(_run_concurrently(load, sources))
+
+    def refresh(self, stats=None, on_discover=None, sources=None):
+        """Rescan *sources* (default all) concurrently; return the merged studies of all roots.
+
+        Raises ScanCancelledError if any of the rescans was superseded.
+        """
+        sources = self.sources if sources is None else sources
+
+        def rescan(source):
+            part = stats.add() if stats is not None else None
+            studies = source.refresh(part, on_discover)
+            if part is not None and part.finished_at is None:
+                stats.discard(part)
+            return studies
+
+        refreshed = dict(zip(map(id, sources), _run_concurrently(rescan, sources)))
+        return _merge_studies(
+            refreshed[id(source)] if id(source) in refreshed else source.cached_data()
+            for source in self.sources
+        )
+
+    def start_refresh(self, sources=None):
+        """Start a background refresh of each of *sources* (default all); return the jobs."""
+        sources = self.sources if sources is None else sources
+        return [source.start_refresh() for source in sources]
+
+    def get_job(self, job_id):
+        """Return (root index, job) for *job_id*, or (None, None)."""
+        for root_index, source in enumerate(self.sources):
+            job = source.get_job(job_id)
+            if job is not None:
+                return root_index, job
+        return None, None
+
+    def active_job(self):
+        """Return the first running refresh job of any root, or None."""
+        for source in self.sources:
+            job = source.active_job()
+            if job is not None:
+                return job
+        return None
+
+    def format_studies(self, studies, summary=False):
+        """Format *studies*; with *summary*, study-level fields only (no series)."""
+        format_study = _format_study_summary if summary else _format_study
+        return [format_study(study_id, study) for study_id, study in studies.items()]
+
+    def changes_since(self, generation, sources=None):
+        """Return (current generation, changes after *generation*) for *sources*.
+
+        Changes are formatted for the client, in generation order, and cover
+        the merged listing: a change to a study that an earlier root serves
+        is left out, and a study a root drops while a later root still has
+        it is sent as added again, from that root. The current generation
+        matches the listing of the same snapshots. Returns (generation, None)
+        when any root's log does not reach back far enough to answer.
+        """
+        sources = self.sources if sources is None else sources
+        # Snapshots first: entries published after they were taken are left
+        # for the next request, whose generation will cover them.
+        snapshots = [source.cached_data() for source in sources]
+        current = max((getattr(studies, 'generation', 0) for studies in snapshots), default=0)
+        entries = []
+        for root_index, source in enumerate(sources):
+            changes = source.changes_since(generation)
+            if changes is None:
+                return current, None
+            entries.extend((entry, root_index) for entry in changes if entry[0] <= current)
+        entries.sort(key=lambda item: item[0][0])
+
+        def serving_root(study_id):
+            for root_index, studies in enumerate(snapshots):
+                if studies and study_id in studies:
+                    return root_index
+            return None
+
+        feed = []
+        for entry, root_index in entries:
+            study_id = entry[2]
+            serving = serving_root(study_id)
+            if serving is None or serving == root_index:
+                feed.append(entry[3])
+            elif entry[1] == STUDY_REMOVED and serving > root_index:
+                study = snapshots[serving][study_id]
+                feed.append(_format_change(entry[0], STUDY_ADDED, study_id, None, study))
+        return current, feed
+
+    def _source_for_study(self, study_id):
+        """Return the root serving *study_id*, with the precedence of the listing.
+
+        Loaded roots are checked first, so a root that is still scanning does
+        not delay slices from the others.
+        """
+        pending = []
+        for source in self.sources:
+            studies = source.cached_data()
+            if studies is None:
+                pending.append(source)
+            elif study_id in studies:
+                return source
+        for source in pending:
+            if study_id in source.get_data():
+                return source
+        return None
+
+    def get_safe_slice_path(self, study_id, series_id, slice_num):
+        source = self._source_for_study(study_id)
+        if source is None:
+            return None
+        return source.get_safe_slice_path(study_id, series_id, slice_num)
+
+    def get_safe_slice(self, study_id, series_id, slice_num):
+        source = self._source_for_study(study_id)
+        if source is None:
+            return None
+        return source.get_safe_slice(study_id, series_id, slice_num)
+
+    def get_safe_series_paths(self, study_id, series_id, start=0, end=None):
+        source = self._source_for_study(study_id)
+        if source is None:
+            return None
+        return source.get_safe_series_paths(study_id, series_id, start, end)
 
 
 # =============================================================================
@@ -327,9 +1326,13 @@ class DicomFolderSource:
 # =============================================================================
 
 # These are set once at app startup via init_library_sources().
+# library_source is the configurable library folder and the first root of
+# library_sources; DICOM_LIBRARY_EXTRA_ROOTS adds further, fixed roots.
 library_source = None
+library_sources = None
 library_folder_raw = None
 library_folder_source = None
+library_extra_folders_raw = []
 
 
 def _resolve_library_folder(logger):
@@ -352,14 +1355,131 @@ def _resolve_library_folder(logger):
     }
 
 
+def _positive_int_env(name, logger):
+    raw = (os.environ.get(name) or '').strip()
+    if not raw:
+        return None
+    value = db_module.parse_int(raw)
+    if value is None or value < 1:
+        logger.warning('Ignoring invalid %s value: %s', name, raw)
+        return None
+    return value
+
+
+def _scan_options_from_env(logger):
+    """Build scan_dicom_folder keyword arguments from the environment."""
+    options = {}
+    engine = (os.environ.get(LIBRARY_SCAN_ENGINE_ENV) or '').strip().lower()
+    if engine in SCAN_ENGINES:
+        options['engine'] = engine
+    elif engine:
+        logger.warning('Ignoring unknown %s value: %s', LIBRARY_SCAN_ENGINE_ENV, engine)
+
+    workers = _positive_int_env(LIBRARY_SCAN_WORKERS_ENV, logger)
+    if workers is not None:
+        options['workers'] = workers
+    chunk_size = _positive_int_env(LIBRARY_SCAN_CHUNK_SIZE_ENV, logger)
+    if chunk_size is not None:
+        options['chunk_size'] = chunk_size
+
+    header_mode = (os.environ.get(LIBRARY_HEADER_MODE_ENV) or '').strip().lower()
+    if header_mode in HEADER_MODES:
+        options['header_mode'] = header_mode
+    elif header_mode:
+        logger.warning('Ignoring unknown %s value: %s', LIBRARY_HEADER_MODE_ENV, header_mode)
+    return options
+
+
+def _recent_folders_from_env(logger):
+    """Build the RecentFolders for the library folder; None when disabled (0 MB)."""
+    raw = (os.environ.get(LIBRARY_RECENT_FOLDERS_MB_ENV) or '').strip()
+    if not raw:
+        return RecentFolders()
+    megabytes = db_module.parse_int(raw)
+    if megabytes is None or megabytes < 0:
+        logger.warning('Ignoring invalid %s value: %s', LIBRARY_RECENT_FOLDERS_MB_ENV, raw)
+        return RecentFolders()
+    if megabytes == 0:
+        return None
+    return RecentFolders(max_bytes=megabytes * 1024 * 1024)
+
+
+def _slice_handles_from_env(logger):
+    """Build the open-file cache for slice requests; 0 open files disables it."""
+    raw = (os.environ.get(LIBRARY_OPEN_FILES_ENV) or '').strip()
+    if not raw:
+        return FileHandleCache()
+    max_handles = db_module.parse_int(raw)
+    if max_handles is None or max_handles < 0:
+        logger.warning('Ignoring invalid %s value: %s', LIBRARY_OPEN_FILES_ENV, raw)
+        return FileHandleCache()
+    return FileHandleCache(max_handles=max_handles)
+
+
+def _slice_bytes_from_env(logger):
+    """Build the slice byte cache; a budget of 0 MB disables it."""
+    raw = (os.environ.get(LIBRARY_SLICE_CACHE_MB_ENV) or '').strip()
+    if not raw:
+        return SliceByteCache()
+    megabytes = db_module.parse_int(raw)
+    if megabytes is None or megabytes < 0:
+        logger.warning('Ignoring invalid %s value: %s', LIBRARY_SLICE_CACHE_MB_ENV, raw)
+        return SliceByteCache()
+    return SliceByteCache(max_bytes=megabytes * 1024 * 1024)
+
+
+def _slice_readahead_from_env(logger):
+    """Build the slice read-ahead; a window of 0 slices disables it."""
+    raw = (os.environ.get(LIBRARY_READAHEAD_ENV) or '').strip()
+    if not raw:
+        return SliceReadAhead()
+    max_window = db_module.parse_int(raw)
+    if max_window is None or max_window < 0:
+        logger.warning('Ignoring invalid %s value: %s', LIBRARY_READAHEAD_ENV, raw)
+        return SliceReadAhead()
+    return SliceReadAhead(max_window=max_window)
+
+
 def init_library_sources(logger):
-    """Initialize the library source from settings. Called once at startup."""
-    global library_source, library_folder_raw, library_folder_source
+    """Initialize the library sources from settings. Called once at startup."""
+    global library_source, library_sources, library_folder_raw, library_folder_source
+    global library_extra_folders_raw, slice_handles, slice_bytes, slice_readahead
+
+    slice_handles = _slice_handles_from_env(logger)
+    slice_bytes = _slice_bytes_from_env(logger)
+    slice_readahead = _slice_readahead_from_env(logger)
 
     config = _resolve_library_folder(logger)
     library_folder_raw = config['folder']
     library_folder_source = config['source']
-    library_source = DicomFolderSource(config['folder_resolved'])
+    index = ScanIndex(db_module.LIBRARY_INDEX_PATH, metadata_version=SCAN_METADATA_VERSION)
+    scan_options = _scan_options_from_env(logger)
+    library_source = DicomFolderSource(
+        config['folder_resolved'],
+        index=index,
+        scan_options=scan_options,
+        recent_folders=_recent_folders_from_env(logger),
+    )
+
+    sources = [library_source]
+    library_extra_folders_raw = []
+    seen = {os.path.abspath(config['folder_resolved'])}
+    for raw in _parse_library_path_list(os.environ.get(LIBRARY_EXTRA_ROOTS_ENV, '')):
+        folder_path = os.path.expanduser(raw)
+        if os.path.abspath(folder_path) in seen:
+            logger.warning('Ignoring duplicate library root: %s', raw)
+            continue
+        seen.add(os.path.abspath(folder_path))
+        library_extra_folders_raw.append(raw)
+        sources.append(DicomFolderSource(folder_path, index=index, scan_options=scan_options))
+    library_sources = LibraryCollection(sources)
+
+    watch_mode = (os.environ.get(LIBRARY_WATCH_ENV) or '').strip().lower()
+    if watch_mode in WATCH_MODES:
+        for source in library_sources.sources:
+            source.start_watching(watch_mode)
+    elif watch_mode not in ('', '0', 'off', 'false'):
+        logger.warning('Ignoring unknown %s value: %s', LIBRARY_WATCH_ENV, watch_mode)
 
 
 # =============================================================================
@@ -375,11 +1495,7 @@ def _ensure_library_folder():
         source = library_folder_source
 
     if source != 'default':
-        if not os.path.isdir(folder_path):
-            return False, f'Directory does not exist: {folder_label}'
-        if not os.access(folder_path, os.R_OK | os.X_OK):
-            return False, f'Directory is not readable: {folder_label}'
-        return True, None
+        return _check_library_folder(folder_path, folder_label)
 
     try:
         os.makedirs(folder_path, exist_ok=True)
@@ -395,12 +1511,79 @@ def _ensure_library_folder():
     return True, None
 
 
+def _check_library_folder(folder_path, folder_label):
+    """Check that an existing library folder is a readable directory."""
+    if not os.path.isdir(folder_path):
+        return False, f'Directory does not exist: {folder_label}'
+    if not os.access(folder_path, os.R_OK | os.X_OK):
+        return False, f'Directory is not readable: {folder_label}'
+    return True, None
+
+
+def _library_root_states():
+    """Return one dict per library root with its source, label and availability."""
+    available, error = _ensure_library_folder()
+    with LIBRARY_CONFIG_LOCK:
+        folder_label = library_folder_raw
+    states = [{'source': library_source, 'folder': folder_label, 'available': available}]
+    if error:
+        states[0]['error'] = error
+    for source, label in zip(library_sources.sources[1:], library_extra_folders_raw):
+        available, error = _check_library_folder(source.folder_path, label)
+        state = {'source': source, 'folder': label, 'available': available}
+        if error:
+            state['error'] = error
+        states.append(state)
+    for root_index, state in enumerate(states):
+        state['root'] = root_index
+    return states
+
+
+def _select_library_roots(states):
+    """Apply the optional ?root=<index> argument. Returns None for an unknown root."""
+    raw = request.args.get('root')
+    if raw is None:
+        return states
+    root_index = db_module.parse_int(raw)
+    if root_index is None or not 0 <= root_index < len(states):
+        return None
+    return [states[root_index]]
+
+
+def _format_root(state, studies=None):
+    """Format a library root's status for the roots list of a studies payload."""
+    source = state['source']
+    root = {
+        'root': state['root'],
+        'folder': state['folder'],
+        'folderResolved': source.folder_path,
+        'available': state['available'],
+    }
+    if not state['available']:
+        root['status'] = 'unavailable'
+        root['error'] = state.get('error')
+    elif studies is None:
+        root['status'] = 'scanning'
+    else:
+        root['status'] = 'ready'
+        root['studyCount'] = len(studies)
+    job = source.active_job()
+    if job is not None:
+        root['refreshJob'] = job.to_dict()
+    return root
+
+
+def _format_job(root_index, job):
+    return {**job.to_dict(), 'root': root_index}
+
+
 def _build_library_config_payload():
     with LIBRARY_CONFIG_LOCK:
         return {
             'folder': library_folder_raw,
             'folderResolved': library_source.folder_path,
             'source': library_folder_source,
+            'extraFolders': list(library_extra_folders_raw),
         }
 
 
@@ -414,7 +1597,7 @@ def _is_network_exposed():
     return host not in _LOOPBACK_HOSTS
 
 
-def _parse_library_allowed_roots(raw_value):
+def _parse_library_path_list(raw_value):
     if not raw_value:
         return []
 
@@ -424,7 +1607,7 @@ def _parse_library_allowed_roots(raw_value):
 
 
 def _get_library_allowed_roots():
-    return _parse_library_allowed_roots(os.environ.get(LIBRARY_ALLOWED_ROOTS_ENV, ''))
+    return _parse_library_path_list(os.environ.get(LIBRARY_ALLOWED_ROOTS_ENV, ''))
 
 
 def _path_is_within(candidate_path, root_path):
@@ -462,6 +1645,108 @@ def _validate_library_config_path(folder_path, folder_label):
     return False, f'Library folder is outside allowed roots: {folder_label}', 403
 
 
+def _wants_event_stream():
+    # EventSource sends exactly this; fetch() sends */* and gets NDJSON.
+    return request.accept_mimetypes.best == 'text/event-stream'
+
+
+def _stream_library_scan(run_scan, folder_label):
+    """Run *run_scan* on a worker thread and stream its discoveries.
+
+    *run_scan* is called as run_scan(stats=..., on_discover=...), with a
+    CombinedScanStats, and returns the scanned studies. Roots may be scanned
+    concurrently, so *on_discover* can be called from several threads. The
+    response is NDJSON by default, or Server-Sent Events when the client asks
+    for text/event-stream. Events:
+
+    - study: a study seen for the first time, with its first series
+    - series: a further series of an already announced study
+    - progress: scan counters (ScanStats.to_dict), at most every
+      STREAM_PROGRESS_INTERVAL seconds
+    - done: the final payload, the same shape /api/library/refresh returns
+    - error: the scan failed
+
+    Study and series events are provisional (slice counts grow and series
+    keys can change on collisions); the done event is authoritative.
+    """
+    sse = _wants_event_stream()
+    events = queue.Queue()
+    stats = CombinedScanStats()
+    announced = set()
+    announced_lock = threading.Lock()
+    result = {}
+
+    def on_discover(study, series):
+        study_id = study.study_id
+        with announced_lock:
+            first = study_id not in announced
+            announced.add(study_id)
+        if not first:
+            events.put(
+                {
+                    'type': 'series',
+                    'studyInstanceUid': study_id,
+                    'series': _format_series(series.series_id, series),
+                }
+            )
+            return
+        events.put({'type': 'study', 'study': _format_study(study_id, study)})
+
+    def worker():
+        try:
+            result['studies'] = run_scan(stats=stats, on_discover=on_discover)
+        except ScanCancelledError:
+            result['error'] = SCAN_SUPERSEDED_ERROR
+        except Exception:
+            logger.exception('Streaming library scan failed: %s', folder_label)
+            result['error'] = 'Failed to scan library folder'
+        finally:
+            events.put(None)
+
+    def encode(event):
+        data = json.dumps(event, separators=(',', ':'))
+        if sse:
+            return f'event: {event["type"]}\ndata: {data}\n\n'
+        return data + '\n'
+
+    def generate():
+        last_progress = 0.0
+        while True:
+            try:
+                event = events.get(timeout=STREAM_PROGRESS_INTERVAL)
+            except queue.Empty:
+                event = False
+            if event is None:
+                break
+            if event:
+                yield encode(event)
+            now = time.monotonic()
+            if now - last_progress >= STREAM_PROGRESS_INTERVAL:
+                last_progress = now
+                yield encode({'type': 'progress', 'scan': stats.to_dict()})
+
+        if 'error' in result:
+            yield encode({'type': 'error', 'error': result['error']})
+            return
+        done = {
+            'type': 'done',
+            'available': True,
+            'folder': folder_label,
+            'studies': [_format_study(k, v) for k, v in result['studies'].items()],
+        }
+        if stats.finished_at is not None:
+            done['scan'] = stats.to_dict()
+        yield encode(done)
+
+    threading.Thread(target=worker, name='library-scan-stream', daemon=True).start()
+    return Response(
+        generate(),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        # Disable proxy buffering so events reach the client as they happen.
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 # =============================================================================
 # LIBRARY ROUTES
 # =============================================================================
@@ -510,19 +1795,21 @@ def update_library_config():
 
     # Environment variable has highest precedence; keep runtime folder unchanged.
     if source == 'env':
-        available, error = _ensure_library_folder()
+        states = _library_root_states()
         response = {
             **_build_library_config_payload(),
-            'available': available,
-            'studies': library_source.format_studies() if available else [],
+            'available': states[0]['available'],
+            'studies': _list_library_studies(states),
             'overridden': True,
         }
-        if error:
-            response['error'] = error
+        if 'error' in states[0]:
+            response['error'] = states[0]['error']
         return jsonify(response)
 
     try:
-        refreshed = library_source.set_folder(folder_path)
+        library_source.set_folder(folder_path)
+    except ScanCancelledError:
+        return jsonify({'error': SCAN_SUPERSEDED_ERROR}), 409
     except Exception:
         current_app.logger.exception('Failed to rescan updated library folder: %s', folder_path)
         return jsonify({'error': 'Failed to scan library folder'}), 500
@@ -535,56 +1822,574 @@ def update_library_config():
         {
             **_build_library_config_payload(),
             'available': True,
-            'studies': library_source.format_studies(refreshed),
+            'studies': _list_library_studies(_library_root_states()),
             'overridden': False,
         }
     )
 
 
+def _list_library_studies(states):
+    """Format the merged studies of the available roots in *states*."""
+    sources = [state['source'] for state in states if state['available']]
+    if not sources:
+        return []
+    return library_sources.format_studies(library_sources.merged_studies(sources))
+
+
+def _unavailable_payload(states, folder):
+    """Error payload for when none of the requested roots is available."""
+    return {'available': False, 'folder': folder, 'studies': [], 'error': states[0].get('error')}
+
+
+def _parse_listing_query():
+    """Parse the pagination, sort and filter arguments of /api/library/studies."""
+    args = request.args
+    sort = args.get('sort', DEFAULT_SORT)
+    if sort not in SORT_KEYS:
+        raise ListingQueryError(f'sort must be one of: {", ".join(SORT_KEYS)}')
+    order = args.get('order', DEFAULT_ORDERS[sort])
+    if order not in SORT_ORDERS:
+        raise ListingQueryError(f'order must be one of: {", ".join(SORT_ORDERS)}')
+
+    limit = None
+    if 'limit' in args:
+        limit = db_module.parse_int(args['limit'])
+        if limit is None or not 1 <= limit <= MAX_LISTING_LIMIT:
+            raise ListingQueryError(f'limit must be between 1 and {MAX_LISTING_LIMIT}')
+    offset = db_module.parse_int(args.get('offset', 0))
+    if offset is None or offset < 0:
+        raise ListingQueryError('offset must be a non-negative integer')
+
+    modalities = [m.strip() for m in args.get('modality', '').split(',') if m.strip()]
+    study_filter = StudyFilter(
+        date_from=normalize_date(args['dateFrom']) if args.get('dateFrom') else None,
+        date_to=normalize_date(args['dateTo']) if args.get('dateTo') else None,
+        modalities=modalities or None,
+        patient_text=args.get('patient', '').strip() or None,
+    )
+    cursor = args.get('cursor') or None
+    if cursor is not None:
+        decode_cursor(cursor, sort, order)
+    return {
+        'sort': sort,
+        'order': order,
+        'study_filter': study_filter,
+        'limit': limit,
+        'offset': offset,
+        'cursor': cursor,
+    }
+
+
+def _listing_etag(listing, envelope=None):
+    """Strong ETag for a study listing: snapshot generations, envelope and request."""
+    key = [
+        _LISTING_ETAG_SALT,
+        listing.generations,
+        envelope,
+        request.path,
+        request.query_string.decode('latin-1'),
+    ]
+    encoded = json.dumps(key, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return 'library-' + hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def _memoized_json_response(etag, build_payload, cache=_listing_responses):
+    """Serve the JSON payload memoized in *cache* under *etag*, building it only on a miss.
+
+    A matching If-None-Match gets 304 without touching the payload. Clients
+    accepting gzip get the memoized compressed body; its ETag has a -gzip
+    suffix because the bytes differ.
+    """
+    gzip_etag = f'{etag}-gzip'
+    headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'private, no-cache'}
+    if_none_match = request.if_none_match
+    if if_none_match.contains(etag) or if_none_match.contains(gzip_etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(gzip_etag if if_none_match.contains(gzip_etag) else etag)
+        return response
+
+    entry = cache.get(etag)
+    if entry is None:
+        body = current_app.json.dumps(build_payload()).encode('utf-8') + b'\n'
+        entry = cache.put(etag, body)
+
+    if entry.compressible and request.accept_encodings.quality('gzip') > 0:
+        response = Response(entry.gzipped(), mimetype='application/json', headers=headers)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(gzip_etag)
+    else:
+        response = Response(entry.body, mimetype='application/json', headers=headers)
+        response.set_etag(etag)
+    return response
+
+
 @library_bp.route('/api/library/studies')
 def get_library_studies():
-    """Get studies from local persistent library folder."""
-    available, error = _ensure_library_folder()
+    """Get studies from the local library roots, merged into one list.
+
+    Roots still scanning after LIBRARY_ROOT_WAIT_SECONDS are left out and
+    reported with status "scanning" under roots; list again to pick them up.
+
+    Responses carry a strong ETag derived from the snapshot generations, and
+    the serialized (and gzipped) body is memoized under it, so repeated and
+    conditional requests cost almost nothing until the library changes.
+
+    Any of the LISTING_QUERY_ARGS returns a sorted, filtered page instead of
+    every study: limit and offset or cursor (nextCursor of the previous
+    page), sort (date, patient or modality) and order (asc or desc),
+    dateFrom and dateTo (YYYYMMDD or YYYY-MM-DD, inclusive), modality
+    (comma-separated) and patient (text in the patient name or ID). The
+    payload then also has total, the number of matching studies.
+
+    view=summary lists study-level fields only, without the series of each
+    study; clients fetch those per study when it is opened (see
+    get_library_study_series and get_library_series_batch).
+    """
+    view = request.args.get('view', 'full')
+    if view not in LISTING_VIEWS:
+        return jsonify({'error': f'view must be one of: {", ".join(LISTING_VIEWS)}'}), 400
+    summary = view == 'summary'
+    paginated = any(name in request.args for name in LISTING_QUERY_ARGS)
+    if paginated:
+        try:
+            query = _parse_listing_query()
+        except ListingQueryError as exc:
+            return jsonify({'error': str(exc)}), 400
+
+    states = _library_root_states()
     current_config = _build_library_config_payload()
+    ready = [state for state in states if state['available']]
+    snapshots = library_sources.snapshots([state['source'] for state in ready])
+    studies_by_root = {state['root']: studies for state, studies in zip(ready, snapshots)}
+    listing = library_sources.listing(snapshots)
 
-    payload = {
-        'available': available,
+    envelope = {
+        'available': bool(ready),
         'folder': current_config['folder'],
-        'studies': library_source.format_studies() if available else [],
+        'generation': listing.generation,
+        'roots': [_format_root(state, studies_by_root.get(state['root'])) for state in states],
     }
-    if error:
-        payload['error'] = error
+    if 'error' in states[0]:
+        envelope['error'] = states[0]['error']
+
+    def build_payload():
+        payload = dict(envelope)
+        if paginated:
+            study_ids, total, next_cursor = listing.page(**query)
+            studies = listing.studies
+            format_study = _format_study_summary if summary else _format_study
+            payload['studies'] = [format_study(sid, studies[sid]) for sid in study_ids]
+            payload['total'] = total
+            payload['sort'] = query['sort']
+            payload['order'] = query['order']
+            payload['nextCursor'] = next_cursor
+        else:
+            payload['studies'] = library_sources.format_studies(listing.studies, summary)
+        return payload
+
+    job = library_sources.active_job()
+    if job is not None:
+        # The studies are the previous snapshot and a rescan is under way;
+        # its progress changes from one request to the next, so skip the memo.
+        payload = build_payload()
+        payload['refreshJob'] = job.to_dict()
+        return jsonify(payload)
+    return _memoized_json_response(_listing_etag(listing, envelope), build_payload)
+
+
+def _ready_listing():
+    """Return the StudyListing of the available roots, as /api/library/studies lists it."""
+    states = _library_root_states()
+    sources = [state['source'] for state in states if state['available']]
+    return library_sources.listing(library_sources.snapshots(sources))
+
+
+def _format_study_series(study_id, study):
+    return {
+        'studyInstanceUid': study_id,
+        'series': [_format_series(series_id, series) for series_id, series in study.series.items()],
+    }
+
+
+@library_bp.route('/api/library/studies/<study_id>/series')
+def get_library_study_series(study_id):
+    """Get the series of one library study, for listings fetched with view=summary.
+
+    Memoized and revalidated with ETags like the study listing.
+    """
+    listing = _ready_listing()
+    study = listing.studies.get(study_id)
+    if study is None:
+        return jsonify({'error': 'Study not found'}), 404
+    return _memoized_json_response(
+        _listing_etag(listing),
+        lambda: _format_study_series(study_id, study),
+        cache=_series_responses,
+    )
+
+
+@library_bp.route('/api/library/studies/series')
+def get_library_series_batch():
+    """Get the series of several studies: ?study=<uid>&study=<uid> or ?study=<uid>,<uid>.
+
+    Returns up to MAX_SERIES_BATCH studies in request order, and the UIDs
+    not found under missing.
+    """
+    study_ids = list(
+        dict.fromkeys(
+            study_id.strip()
+            for value in request.args.getlist('study')
+            for study_id in value.split(',')
+            if study_id.strip()
+        )
+    )
+    if not study_ids:
+        return jsonify({'error': 'study is required'}), 400
+    if len(study_ids) > MAX_SERIES_BATCH:
+        return jsonify({'error': f'At most {MAX_SERIES_BATCH} studies per request'}), 400
+
+    listing = _ready_listing()
+    studies = listing.studies
+
+    def build_payload():
+        return {
+            'studies': [
+                _format_study_series(study_id, studies[study_id])
+                for study_id in study_ids
+                if study_id in studies
+            ],
+            'missing': [study_id for study_id in study_ids if study_id not in studies],
+        }
+
+    return _memoized_json_response(_listing_etag(listing), build_payload, cache=_series_responses)
+
+
+@library_bp.route('/api/library/metadata/<study_id>/<path:series_id>')
+def get_library_series_metadata(study_id, series_id):
+    """Get the geometry and display metadata of one library series.
+
+    Rows/columns, pixel spacing, orientation, pixel format, rescale, default
+    window and transfer syntax as collected at scan time (see
+    server.library.geometry.series_metadata), with the slices ordered by
+    position, so a viewport can be set up before any slice is downloaded.
+    """
+    listing = _ready_listing()
+    study = listing.studies.get(study_id)
+    series = study.series.get(series_id) if study is not None else None
+    if series is None:
+        return jsonify({'error': 'Series not found'}), 404
+
+    def build_payload():
+        return {'studyInstanceUid': study_id, **series_metadata(series)}
+
+    return _memoized_json_response(_listing_etag(listing), build_payload, cache=_series_responses)
+
+
+@library_bp.route('/api/library/changes')
+def get_library_changes():
+    """Get what changed in the library since ?since=<generation>.
+
+    *since* is the generation of a studies listing (or of a previous changes
+    response) the client holds. The response has the current generation and
+    the changes after *since* in order: studyAdded (with the full study),
+    studyChanged (study-level fields), studyRemoved, and seriesAdded,
+    seriesChanged or seriesRemoved within a study. Apply them as upserts and
+    deletes by UID. When the change logs no longer reach back to *since*
+    (truncated, folder switched, server restarted), reload is true and the
+    client lists the studies again instead. A root going offline or coming
+    back changes the listing without a logged change, so the roots status is
+    included for clients to notice that.
+    """
+    since = db_module.parse_int(request.args.get('since', ''))
+    if since is None or since < 0:
+        return jsonify({'error': 'since must be a non-negative integer generation'}), 400
+
+    states = _library_root_states()
+    ready = [state for state in states if state['available']]
+    generation, changes = library_sources.changes_since(since, [state['source'] for state in ready])
+    payload = {
+        'generation': generation,
+        'since': since,
+        'reload': changes is None or since > generation,
+        'roots': [_format_root(state, state['source'].cached_data()) for state in states],
+    }
+    if not payload['reload']:
+        payload['changes'] = changes
     return jsonify(payload)
 
 
+@library_bp.route('/api/library/studies/stream')
+def stream_library_studies():
+    """Stream studies as the library roots are scanned (see _stream_library_scan).
+
+    Serves the cached studies in a single done event when no scan is needed.
+    """
+    states = _library_root_states()
+    current_config = _build_library_config_payload()
+    sources = [state['source'] for state in states if state['available']]
+    if not sources:
+        payload = {'type': 'done', **_unavailable_payload(states, current_config['folder'])}
+        return Response(json.dumps(payload) + '\n', mimetype='application/x-ndjson')
+    return _stream_library_scan(
+        partial(library_sources.get_data, sources=sources), current_config['folder']
+    )
+
+
+def _slice_opener(generation, file_path):
+    """Return the open_handle argument of send_slice_file for a library slice."""
+    if slice_handles.enabled:
+        return partial(slice_handles.acquire, generation, file_path)
+    return None
+
+
+def send_library_slice(found, slice_num):
+    """Serve a slice found by get_safe_slice from slice_bytes or an open file.
+
+    Open files are reused from slice_handles. Raises OSError if the file
+    cannot be opened.
+    """
+    file_path, slices, generation = found
+    return send_slice_file(
+        file_path,
+        file_stat=slices.file_stat(slice_num),
+        open_handle=_slice_opener(generation, file_path),
+        byte_cache=slice_bytes,
+        cache_key=(generation, file_path),
+    )
+
+
+def _open_batch_slice(generation, file_path):
+    """Open a slice of a batch response: its bytes from slice_bytes, or the file.
+
+    Batches neither add to slice_bytes nor promote or count the slices they
+    find there, so downloading a series does not push out the slices
+    readers keep returning to.
+    """
+    return open_cached_slice(
+        file_path, _slice_opener(generation, file_path), slice_bytes, (generation, file_path)
+    )
+
+
+def _warm_slice(found, slice_num):
+    """Load a slice into slice_bytes, or into the page cache if it is not kept in memory."""
+    file_path, slices, generation = found
+    file_stat = slices.file_stat(slice_num)
+    key = (generation, file_path)
+    to_memory = slice_bytes.enabled and file_stat is not None and slice_bytes.admits(file_stat[1])
+    if to_memory and key in slice_bytes:
+        return
+    opened = open_slice_file(file_path, _slice_opener(generation, file_path))
+    try:
+        if not to_memory:
+            warm_fd(opened.fileno())
+            return
+        data = read_unchanged(opened, file_stat)
+        if data is not None:
+            slice_bytes.put(key, data)
+    finally:
+        opened.release()
+
+
+def _warm_slices(study_id, series_id, indices):
+    """Warm slices *indices* of a series (see server.library.readahead).
+
+    Runs on a read-ahead thread. Files are opened through slice_handles when
+    it is enabled, so the requests that follow also skip opening them.
+    """
+    for index in indices:
+        found = library_sources.get_safe_slice(study_id, series_id, index)
+        if found is None:
+            continue
+        try:
+            _warm_slice(found, index)
+        except OSError:
+            continue
+
+
+def _read_ahead(study_id, series_id, found, slice_num):
+    """Record a slice request and warm the slices ahead of a sequential scroll."""
+    _, slices, generation = found
+    indices = slice_readahead.observe(
+        (request.remote_addr, study_id, series_id), generation, slice_num, len(slices)
+    )
+    if indices:
+        slice_readahead.submit(_warm_slices, study_id, series_id, indices)
+
+
 @library_bp.route('/api/library/dicom/<study_id>/<path:series_id>/<int:slice_num>')
 def get_library_dicom(study_id, series_id, slice_num):
     """Get raw DICOM file bytes for a local library slice."""
-    file_path = library_source.get_safe_slice_path(study_id, series_id, slice_num)
-    if not file_path:
+    found = library_sources.get_safe_slice(study_id, series_id, slice_num)
+    if not found:
         return jsonify({'error': 'Slice not found'}), 404
+    if slice_readahead.enabled:
+        _read_ahead(study_id, series_id, found, slice_num)
 
     try:
-        return send_file(file_path, mimetype='application/dicom')
-    except Exception:
+        return send_library_slice(found, slice_num)
+    except OSError:
+        return jsonify({'error': 'Failed to read DICOM file'}), 500
+
+
+@library_bp.route('/api/library/slice-cache')
+def get_library_slice_cache():
+    """Size and hit, miss and eviction counters of the slice byte cache."""
+    return jsonify(slice_bytes.stats())
+
+
+@library_bp.route('/api/library/dicom-batch/<study_id>/<path:series_id>')
+def get_library_dicom_batch(study_id, series_id):
+    """Stream the DICOM files of a library series in one response.
+
+    ?start and ?end (exclusive) select a slice range, the whole series by
+    default; ?format is multipart (multipart/mixed) or framed
+    (length-prefixed). See server.library.batch for both encodings. Session,
+    CSRF and audit hooks and the folder resolution run once per batch
+    instead of once per slice.
+    """
+    batch_format = request.args.get('format', DEFAULT_BATCH_FORMAT)
+    if batch_format not in BATCH_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(BATCH_FORMATS)}'}), 400
+    raw_end = request.args.get('end')
+    start = db_module.parse_int(request.args.get('start', 0))
+    end = db_module.parse_int(raw_end)
+    if start is None or start < 0 or (raw_end is not None and (end is None or end < start)):
+        return jsonify({'error': 'Invalid slice range'}), 400
+
+    found = library_sources.get_safe_series_paths(study_id, series_id, start, end)
+    if found is None:
+        return jsonify({'error': 'Series not found'}), 404
+    slices, generation = found
+    if not slices and start != end:
+        return jsonify({'error': 'Slice not found'}), 404
+
+    open_slice = partial(_open_batch_slice, generation)
+    if batch_format == 'framed':
+        response = Response(iter_framed(slices, open_slice), mimetype=FRAMED_MEDIA_TYPE)
+    else:
+        boundary = secrets.token_hex(16)
+        response = Response(
+            iter_multipart(slices, boundary, open_slice),
+            content_type=multipart_media_type(boundary),
+        )
+    response.headers['X-Slice-Count'] = str(len(slices))
+    return response
+
+
+@library_bp.route('/api/library/frame/<study_id>/<path:series_id>/<int:slice_num>/<int:frame_num>')
+def get_library_frame(study_id, series_id, slice_num, frame_num):
+    """Get one frame (0-based) of a multi-frame library slice.
+
+    Reads only the frame's bytes, at the offsets recorded by the scan: raw
+    pixel data for native files, the compressed bitstream (image/jpeg,
+    image/jp2, ...) for encapsulated ones. Slices without a frame index
+    (single-frame files, layouts that cannot be indexed) are served whole
+    by get_library_dicom. A file changed since the scan gets 409.
+    """
+    found = library_sources.get_safe_slice(study_id, series_id, slice_num)
+    if not found:
+        return jsonify({'error': 'Slice not found'}), 404
+    file_path, slices, _ = found
+    table = slices.frame_tables.get(slice_num)
+    if table is None:
+        return jsonify({'error': 'Slice has no frame index'}), 404
+    if not 0 <= frame_num < len(table):
+        return jsonify({'error': 'Frame not found'}), 404
+
+    segments = table.frame_segments(frame_num)
+    try:
+        with open(file_path, 'rb') as fp:
+            if not all(
+                verify_segment(fp, offset, length, table.encapsulated)
+                for offset, length in segments
+            ):
+                return jsonify({'error': 'File changed since the library was scanned'}), 409
+            chunks = []
+            for offset, length in segments:
+                fp.seek(offset)
+                chunks.append(fp.read(length))
+    except OSError:
         return jsonify({'error': 'Failed to read DICOM file'}), 500
 
+    mimetype = DEFAULT_FRAME_MEDIA_TYPE
+    if table.encapsulated:
+        transfer_syntax = slice_attribute(slices, slice_num, 'transfer_syntax_uid')
+        mimetype = FRAME_MEDIA_TYPES.get(transfer_syntax, DEFAULT_FRAME_MEDIA_TYPE)
+    response = Response(b''.join(chunks), mimetype=mimetype)
+    response.headers['X-Frame-Count'] = str(len(table))
+    return response
+
 
 @library_bp.route('/api/library/refresh', methods=['POST'])
 def refresh_library():
-    """Rescan local library folder and return updated studies."""
-    available, error = _ensure_library_folder()
+    """Rescan the library roots (or only ?root=<index>) and return updated studies.
+
+    Roots are rescanned concurrently; the studies are those of every root.
+    """
+    states = _select_library_roots(_library_root_states())
+    if states is None:
+        return jsonify({'error': 'Unknown library root'}), 400
     current_config = _build_library_config_payload()
-    if not available:
-        return jsonify(
-            {'available': False, 'folder': current_config['folder'], 'studies': [], 'error': error}
-        ), 500
+    sources = [state['source'] for state in states if state['available']]
+    if not sources:
+        return jsonify(_unavailable_payload(states, current_config['folder'])), 500
 
-    refreshed = library_source.refresh()
-    return jsonify(
-        {
-            'available': available,
-            'folder': current_config['folder'],
-            'studies': library_source.format_studies(refreshed),
-        }
+    stats = CombinedScanStats()
+    try:
+        refreshed = library_sources.refresh(stats, sources=sources)
+    except ScanCancelledError:
+        return jsonify({'error': SCAN_SUPERSEDED_ERROR}), 409
+    payload = {
+        'available': True,
+        'folder': current_config['folder'],
+        'studies': library_sources.format_studies(refreshed),
+    }
+    if stats.finished_at is not None:
+        payload['scan'] = stats.to_dict()
+    return jsonify(payload)
+
+
+@library_bp.route('/api/library/refresh/stream', methods=['POST'])
+def refresh_library_stream():
+    """Rescan the library roots, streaming studies and progress as they are found."""
+    states = _select_library_roots(_library_root_states())
+    if states is None:
+        return jsonify({'error': 'Unknown library root'}), 400
+    current_config = _build_library_config_payload()
+    sources = [state['source'] for state in states if state['available']]
+    if not sources:
+        return jsonify(_unavailable_payload(states, current_config['folder'])), 500
+    return _stream_library_scan(
+        partial(library_sources.refresh, sources=sources), current_config['folder']
     )
+
+
+@library_bp.route('/api/library/refresh/jobs', methods=['POST'])
+def start_library_refresh_job():
+    """Start background rescans, one job per root (or only ?root=<index>).
+
+    Poll /api/library/jobs/<job_id> for progress.
+    """
+    states = _select_library_roots(_library_root_states())
+    if states is None:
+        return jsonify({'error': 'Unknown library root'}), 400
+    current_config = _build_library_config_payload()
+    ready = [state for state in states if state['available']]
+    if not ready:
+        payload = _unavailable_payload(states, current_config['folder'])
+        del payload['studies']
+        return jsonify(payload), 500
+
+    jobs = library_sources.start_refresh([state['source'] for state in ready])
+    return jsonify(
+        {'jobs': [_format_job(state['root'], job) for state, job in zip(ready, jobs)]}
+    ), 202
+
+
+@library_bp.route('/api/library/jobs/<job_id>')
+def get_library_job(job_id):
+    """Get the status and scan progress of a background refresh job."""
+    root_index, job = library_sources.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_format_job(root_index, job))
@@ -9,9 +9,9 @@ Copyright (c) 2026 Divergent Health Technologies
 
 import os
 
-from flask import Blueprint, jsonify, send_file
+from flask import Blueprint, jsonify
 
-from server.routes.library import DicomFolderSource
+from server.routes.library import DicomFolderSource, send_library_slice
 
 test_data_bp = Blueprint('test_data', __name__)
 
@@ -33,13 +33,13 @@ def get_test_studies():
 @test_data_bp.route('/api/test-data/dicom/<study_id>/<path:series_id>/<int:slice_num>')
 def get_test_dicom(study_id, series_id, slice_num):
     """Get raw DICOM file bytes for a test data slice."""
-    file_path = test_source.get_safe_slice_path(study_id, series_id, slice_num)
-    if not file_path:
+    found = test_source.get_safe_slice(study_id, series_id, slice_num)
+    if not found:
         return jsonify({'error': 'Slice not found'}), 404
 
     try:
-        return send_file(file_path, mimetype='application/dicom')
-    except Exception:
+        return send_library_slice(found, slice_num)
+    except OSError:
         return jsonify({'error': 'Failed to read DICOM file'}), 500
 
 
@@ -51,6 +51,6 @@ def get_test_info():
         {
             'available': test_source.is_available(),
             'studyCount': len(studies),
-            'totalImages': sum(s['image_count'] for s in studies.values()),
+            'totalImages': sum(s.image_count for s in studies.values()),
         }
     )
@@ -68,16 +68,112 @@ for index, entry in enumerate(payload["entries"], start=1):
     ds.save_as(str(file_path), write_like_original=False)
 `;
 
+const MULTI_FRAME_SCRIPT = `
+import json
+import struct
+import sys
+from pathlib import Path
+
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.encaps import encapsulate, encapsulate_extended
+from pydicom.filewriter import dcmwrite
+from pydicom.uid import (
+    ExplicitVRBigEndian,
+    ExplicitVRLittleEndian,
+    ImplicitVRLittleEndian,
+    JPEGBaseline8Bit,
+    MultiFrameGrayscaleWordSecondaryCaptureImageStorage,
+)
+
+payload = json.loads(sys.argv[1])
+folder = Path(payload["folder"])
+folder.mkdir(parents=True, exist_ok=True)
+study_uid = payload["studyUid"]
+frames = payload["frames"]
+
+# 4x4 16-bit native frames; compressed frames are opaque JPEG-like bitstreams
+# of different lengths, as the scan never decodes them.
+native = b"".join(struct.pack("<16H", *range(frame * 16, frame * 16 + 16)) for frame in range(frames))
+bitstreams = [b"\\xff\\xd8" + bytes([frame]) * (10 + 4 * frame) + b"\\xff\\xd9" for frame in range(frames)]
+
+for index, variant in enumerate(payload["variants"], start=1):
+    series_uid = f"{study_uid}.{index}"
+    sop_instance_uid = f"{series_uid}.1"
+    syntax = {
+        "native": ExplicitVRLittleEndian,
+        "implicit": ImplicitVRLittleEndian,
+        "big-endian": ExplicitVRBigEndian,
+    }.get(variant, JPEGBaseline8Bit)
+
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = MultiFrameGrayscaleWordSecondaryCaptureImageStorage
+    file_meta.MediaStorageSOPInstanceUID = sop_instance_uid
+    file_meta.TransferSyntaxUID = syntax
+    file_meta.ImplementationClassUID = "1.2.826.0.1.3680043.10.54321.1"
+
+    file_path = folder / f"{variant}.dcm"
+    ds = FileDataset(str(file_path), {}, file_meta=file_meta, preamble=b"\\0" * 128)
+    ds.SOPClassUID = MultiFrameGrayscaleWordSecondaryCaptureImageStorage
+    ds.SOPInstanceUID = sop_instance_uid
+    ds.StudyInstanceUID = study_uid
+    ds.SeriesInstanceUID = series_uid
+    ds.SeriesDescription = variant
+    ds.SeriesNumber = index
+    ds.InstanceNumber = 1
+    ds.Modality = "OT"
+    ds.PatientName = "Test^MultiFrame"
+    ds.PatientID = "MULTI-FRAME"
+    ds.StudyDescription = "Synthetic multi-frame test"
+    ds.StudyDate = "20260320"
+    ds.NumberOfFrames = frames
+    ds.Rows = 4
+    ds.Columns = 4
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelRepresentation = 0
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+
+    if variant in ("native", "implicit", "big-endian"):
+        ds.PixelData = native
+    elif variant == "basic-offsets":
+        # Two fragments per frame, located through the Basic Offset Table.
+        ds.PixelData = encapsulate(bitstreams, fragments_per_frame=2, has_bot=True)
+    elif variant == "extended-offsets":
+        ds.PixelData, ds.ExtendedOffsetTable, ds.ExtendedOffsetTableLengths = encapsulate_extended(bitstreams)
+    elif variant == "fragment-per-frame":
+        ds.PixelData = encapsulate(bitstreams, fragments_per_frame=1, has_bot=False)
+    elif variant == "no-table":
+        # Several fragments per frame and no offset table: frames cannot be located.
+        ds.PixelData = encapsulate(bitstreams, fragments_per_frame=2, has_bot=False)
+    else:
+        raise SystemExit(f"Unknown multi-frame variant: {variant}")
+    if syntax.is_encapsulated:
+        ds["PixelData"].VR = "OB"
+        ds["PixelData"].is_undefined_length = True
+
+    if syntax == ExplicitVRBigEndian:
+        # save_as() refuses to change endianness; dcmwrite() can be told to.
+        dcmwrite(file_path, ds, little_endian=False, implicit_vr=False, force_encoding=True)
+    else:
+        ds.save_as(str(file_path), enforce_file_format=True)
+`;
+
 function makeUid(suffix = '') {
     const randomPart = `${Date.now()}${Math.floor(Math.random() * 1e6)}`;
     return `${UID_ROOT}.${randomPart}${suffix}`;
 }
 
-function createSyntheticDicomFolder(entries, options = {}) {
+function assertPythonAvailable() {
     const pythonNeedsPathCheck = path.isAbsolute(PYTHON_BIN) || PYTHON_BIN.includes(path.sep);
     if (pythonNeedsPathCheck && !fs.existsSync(PYTHON_BIN)) {
         throw new Error(`Missing test python environment: ${PYTHON_BIN}`);
     }
+}
+
+function createSyntheticDicomFolder(entries, options = {}) {
+    assertPythonAvailable();
 
     const folder = fs.mkdtempSync(path.join(os.tmpdir(), 'dicom-series-split-'));
     const studyUid = options.studyUid || makeUid('.1');
@@ -113,12 +209,43 @@ function createSyntheticDicomFolder(entries, options = {}) {
     };
 }
 
+/**
+ * Create a folder with one multi-frame file per variant, each in its own
+ * series (SeriesDescription is the variant) of one study:
+ * - native, implicit, big-endian: uncompressed frames in that transfer syntax
+ * - basic-offsets: two fragments per frame with a Basic Offset Table
+ * - extended-offsets: one fragment per frame with an Extended Offset Table
+ * - fragment-per-frame: one fragment per frame and no offset table
+ * - no-table: two fragments per frame and no offset table
+ */
+function createMultiFrameDicomFolder(variants, options = {}) {
+    assertPythonAvailable();
+
+    const folder = fs.mkdtempSync(path.join(os.tmpdir(), 'dicom-multi-frame-'));
+    const studyUid = options.studyUid || makeUid('.1');
+    const frames = options.frames || 5;
+    const payload = JSON.stringify({ folder, studyUid, frames, variants });
+
+    execFileSync(PYTHON_BIN, ['-c', MULTI_FRAME_SCRIPT, payload], {
+        cwd: REPO_ROOT,
+        stdio: 'pipe',
+    });
+
+    return {
+        folder,
+        studyUid,
+        frames,
+        files: Object.fromEntries(variants.map((variant) => [variant, path.join(folder, `${variant}.dcm`)])),
+    };
+}
+
 function removeSyntheticDicomFolder(folder) {
     if (!folder) return;
     fs.rmSync(folder, { recursive: true, force: true });
 }
 
 module.exports = {
+    createMultiFrameDicomFolder,
     createSyntheticDicomFolder,
     removeSyntheticDicomFolder,
 };
@@ -0,0 +1,1222 @@
+// @ts-check
+// Copyright (c) 2026 Divergent Health Technologies
+const { test, expect } = require('@playwright/test');
+const fs = require('node:fs');
+const path = require('node:path');
+const { execFileSync } = require('node:child_process');
+const {
+    createMultiFrameDicomFolder,
+    createSyntheticDicomFolder,
+    removeSyntheticDicomFolder,
+} = require('./dicom-fixture-helper');
+
+/**
+ * Playwright API tests for the personal-mode library scanner.
+ *
+ * Each test points /api/library/config at a synthetic folder, exercises the
+ * scan path, and restores the previous folder afterwards. The suite runs
+ * serially because the library folder is process-wide server state.
+ */
+
+const BASE_URL = 'http://127.0.0.1:5001';
+const REPO_ROOT = path.resolve(__dirname, '..');
+
+function resolvePythonCommand() {
+    const venvPython = path.join(REPO_ROOT, 'venv', 'bin', 'python');
+    if (fs.existsSync(venvPython)) {
+        return venvPython;
+    }
+    return process.env.PYTHON || 'python3';
+}
+
+function runPythonJson(script, ...args) {
+    const output = execFileSync(resolvePythonCommand(), ['-c', script, REPO_ROOT, ...args], {
+        cwd: REPO_ROOT,
+        stdio: 'pipe',
+    });
+    return JSON.parse(output.toString('utf8'));
+}
+
+async function useLibraryFolder(request, folder) {
+    const configResponse = await request.get(`${BASE_URL}/api/library/config`);
+    const previousConfig = await configResponse.json();
+    test.skip(previousConfig.overridden === true, 'DICOM_LIBRARY env override pins the library folder');
+
+    const saveResponse = await request.post(`${BASE_URL}/api/library/config`, { data: { folder } });
+    expect(saveResponse.status()).toBe(200);
+    return { previousConfig, savePayload: await saveResponse.json() };
+}
+
+async function restoreLibraryFolder(request, previousConfig) {
+    if (previousConfig && (previousConfig.folderResolved || previousConfig.folder)) {
+        await request.post(`${BASE_URL}/api/library/config`, {
+            data: { folder: previousConfig.folderResolved || previousConfig.folder },
+        });
+    }
+}
+
+function totalImages(studies) {
+    return studies.reduce((sum, study) => sum + study.imageCount, 0);
+}
+
+test.describe('Library scanning', () => {
+    test.describe.configure({ mode: 'serial' });
+
+    test('refresh picks up added files and drops removed files', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+            expect(totalImages(result.savePayload.studies)).toBe(3);
+
+            // Remove one slice and add an unrelated non-DICOM file.
+            fs.rmSync(fixture.entries[0].path);
+            fs.writeFileSync(path.join(fixture.folder, 'notes.txt'), 'not a dicom file');
+
+            const refreshResponse = await request.post(`${BASE_URL}/api/library/refresh`);
+            expect(refreshResponse.status()).toBe(200);
+            const refreshed = await refreshResponse.json();
+            expect(totalImages(refreshed.studies)).toBe(2);
+            expect(refreshed.scan.filesWalked).toBe(3);
+            expect(refreshed.scan.skippedByReason).toEqual({ extension: 1 });
+
+            // A second refresh with no changes serves the same result.
+            const again = await (await request.post(`${BASE_URL}/api/library/refresh`)).json();
+            expect(again.studies).toEqual(refreshed.studies);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('streaming refresh emits studies, progress and a final payload', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const response = await request.post(`${BASE_URL}/api/library/refresh/stream`);
+            expect(response.status()).toBe(200);
+            expect(response.headers()['content-type']).toContain('application/x-ndjson');
+
+            const events = (await response.text())
+                .split('\n')
+                .filter((line) => line.trim())
+                .map((line) => JSON.parse(line));
+            expect(events.filter((event) => event.type === 'study').length).toBeGreaterThan(0);
+
+            const done = events[events.length - 1];
+            expect(done.type).toBe('done');
+            expect(totalImages(done.studies)).toBe(3);
+            expect(done.scan.finished).toBe(true);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('studies listing paginates, sorts and filters', async ({ request }) => {
+        // Three single-slice studies in one folder, one per modality.
+        const fixture = createSyntheticDicomFolder([{ modality: 'CT', fileName: 'ct.dcm' }]);
+        const extras = ['MR', 'DX'].map((modality) =>
+            createSyntheticDicomFolder([{ modality, fileName: `${modality.toLowerCase()}.dcm` }]),
+        );
+        for (const extra of extras) {
+            fs.renameSync(extra.entries[0].path, path.join(fixture.folder, extra.entries[0].fileName));
+        }
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const firstPage = await (
+                await request.get(`${BASE_URL}/api/library/studies?sort=modality&limit=2`)
+            ).json();
+            expect(firstPage.total).toBe(3);
+            expect(firstPage.studies.map((study) => study.modality)).toEqual(['CT', 'DX']);
+            expect(firstPage.nextCursor).toBeTruthy();
+
+            const secondPage = await (
+                await request.get(
+                    `${BASE_URL}/api/library/studies?sort=modality&limit=2&cursor=${firstPage.nextCursor}`,
+                )
+            ).json();
+            expect(secondPage.studies.map((study) => study.modality)).toEqual(['MR']);
+            expect(secondPage.nextCursor).toBeNull();
+
+            const filtered = await (
+                await request.get(`${BASE_URL}/api/library/studies?modality=mr,dx&dateFrom=2026-03-20`)
+            ).json();
+            expect(filtered.total).toBe(2);
+
+            const invalid = await request.get(`${BASE_URL}/api/library/studies?sort=size`);
+            expect(invalid.status()).toBe(400);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+            extras.forEach((extra) => removeSyntheticDicomFolder(extra.folder));
+        }
+    });
+
+    test('studies listing revalidates with ETag until the library changes', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const first = await request.get(`${BASE_URL}/api/library/studies`);
+            const etag = first.headers()['etag'];
+            expect(etag).toBeTruthy();
+
+            const unchanged = await request.get(`${BASE_URL}/api/library/studies`, {
+                headers: { 'If-None-Match': etag },
+            });
+            expect(unchanged.status()).toBe(304);
+
+            await request.post(`${BASE_URL}/api/library/refresh`);
+            const changed = await request.get(`${BASE_URL}/api/library/studies`, {
+                headers: { 'If-None-Match': etag },
+            });
+            expect(changed.status()).toBe(200);
+            expect((await changed.json()).generation).toBeGreaterThan((await first.json()).generation);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('summary listing leaves series to the per-study endpoints', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const listing = await (await request.get(`${BASE_URL}/api/library/studies?view=summary`)).json();
+            expect(listing.studies).toHaveLength(1);
+            expect(listing.studies[0].series).toBeUndefined();
+            expect(listing.studies[0].seriesCount).toBe(1);
+
+            const studyUid = listing.studies[0].studyInstanceUid;
+            const single = await (await request.get(`${BASE_URL}/api/library/studies/${studyUid}/series`)).json();
+            expect(single.series.map((series) => series.sliceCount)).toEqual([2]);
+
+            const batch = await (
+                await request.get(`${BASE_URL}/api/library/studies/series?study=${studyUid},unknown`)
+            ).json();
+            expect(batch.studies).toEqual([single]);
+            expect(batch.missing).toEqual(['unknown']);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('series metadata reports geometry collected at scan time', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const [study] = result.savePayload.studies;
+            const [series] = study.series;
+            const response = await request.get(
+                `${BASE_URL}/api/library/metadata/${study.studyInstanceUid}/${series.seriesInstanceUid}`,
+            );
+            expect(response.status()).toBe(200);
+            const metadata = await response.json();
+            expect(metadata.sliceCount).toBe(2);
+            expect(metadata.bitsAllocated).toBe(16);
+            expect(metadata.slices.map((slice) => slice.index).sort()).toEqual([0, 1]);
+
+            const missing = await request.get(`${BASE_URL}/api/library/metadata/${study.studyInstanceUid}/unknown`);
+            expect(missing.status()).toBe(404);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('batch download streams a series range in one response', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const [study] = result.savePayload.studies;
+            const [series] = study.series;
+            const seriesPath = `${study.studyInstanceUid}/${series.seriesInstanceUid}`;
+            const batchUrl = `${BASE_URL}/api/library/dicom-batch/${seriesPath}`;
+
+            const framed = await request.get(`${batchUrl}?format=framed&start=1`);
+            expect(framed.status()).toBe(200);
+            expect(framed.headers()['x-slice-count']).toBe('2');
+            const body = await framed.body();
+            const indexes = [];
+            for (let offset = 0; offset < body.length; ) {
+                indexes.push(body.readUInt32BE(offset));
+                const length = Number(body.readBigUInt64BE(offset + 4));
+                expect(body.subarray(offset + 12 + 128, offset + 12 + 132).toString()).toBe('DICM');
+                offset += 12 + length;
+            }
+            expect(indexes).toEqual([1, 2]);
+
+            const multipart = await request.get(batchUrl);
+            expect(multipart.headers()['content-type']).toContain('multipart/mixed');
+            expect((await multipart.text()).match(/X-Slice-Index: \d+/g)).toHaveLength(3);
+
+            const invalid = await request.get(`${batchUrl}?start=2&end=1`);
+            expect(invalid.status()).toBe(400);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('batch parts come from the byte cache and the open-file cache', async () => {
+        const fixture = createSyntheticDicomFolder([{}, {}, {}]);
+
+        try {
+            const result = runPythonJson(
+                `
+import json
+import os
+import struct
+import sys
+import tempfile
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_LIBRARY'] = sys.argv[2]
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+
+from server import create_app
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN}
+study = client.get('/api/library/studies', headers=headers).get_json()['studies'][0]
+series_path = f"{study['studyInstanceUid']}/{study['series'][0]['seriesInstanceUid']}"
+slice_bytes = library_routes.slice_bytes
+first = client.get(f'/api/library/dicom/{series_path}/0', headers=headers).data
+cached = slice_bytes.stats()
+(cache_key,) = list(slice_bytes._probation)
+# Rewritten in place after it was cached: a part read from the cache keeps
+# the old bytes.
+with open(cache_key[1], 'r+b') as fp:
+    fp.seek(-2, os.SEEK_END)
+    tail = fp.read()
+    fp.seek(-2, os.SEEK_END)
+    fp.write(bytes(255 - value for value in tail))
+body = client.get(f'/api/library/dicom-batch/{series_path}?format=framed', headers=headers).data
+after = slice_bytes.stats()
+
+parts = {}
+offset = 0
+while offset < len(body):
+    index, length = struct.unpack_from('>IQ', body, offset)
+    parts[index] = body[offset + 12 : offset + 12 + length]
+    offset += 12 + length
+expected = {}
+for index in range(3):
+    path = library_routes.library_sources.get_safe_slice_path(
+        study['studyInstanceUid'], study['series'][0]['seriesInstanceUid'], index
+    )
+    with open(path, 'rb') as fp:
+        expected[index] = fp.read()
+print(json.dumps({
+    'firstPartFromCache': parts[0] == first != expected[0],
+    'countersUnchanged': after == cached,
+    'promoted': cache_key in slice_bytes._protected,
+    'cachedHandles': len(library_routes.slice_handles),
+    'otherPartsMatch': all(parts[index] == expected[index] for index in (1, 2)),
+}))
+        `,
+                fixture.folder,
+            );
+
+            expect(result.firstPartFromCache).toBe(true);
+            expect(result.countersUnchanged).toBe(true);
+            expect(result.promoted).toBe(false);
+            expect(result.cachedHandles).toBe(3);
+            expect(result.otherPartsMatch).toBe(true);
+        } finally {
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('frame endpoint serves one frame of multi-frame files', async ({ request }) => {
+        const indexed = ['native', 'implicit', 'basic-offsets', 'extended-offsets', 'fragment-per-frame'];
+        const fixture = createMultiFrameDicomFolder([...indexed, 'big-endian', 'no-table']);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const study = result.savePayload.studies.find((item) => item.studyInstanceUid === fixture.studyUid);
+            const seriesUids = Object.fromEntries(
+                study.series.map((series) => [series.seriesDescription, series.seriesInstanceUid]),
+            );
+            const frameUrl = (variant, frame) =>
+                `${BASE_URL}/api/library/frame/${fixture.studyUid}/${seriesUids[variant]}/0/${frame}`;
+
+            // The frame bytes as pydicom reads them from the file.
+            const middle = Math.floor(fixture.frames / 2);
+            const expected = runPythonJson(
+                `
+import base64
+import json
+import sys
+
+from pydicom import dcmread
+from pydicom.encaps import get_frame
+
+files = json.loads(sys.argv[2])
+frame = int(sys.argv[3])
+expected = {}
+for variant, path in files.items():
+    ds = dcmread(path)
+    frames = int(ds.NumberOfFrames)
+    if ds.file_meta.TransferSyntaxUID.is_encapsulated:
+        extended = None
+        if 'ExtendedOffsetTable' in ds:
+            extended = (ds.ExtendedOffsetTable, ds.ExtendedOffsetTableLengths)
+        data = get_frame(ds.PixelData, frame, number_of_frames=frames, extended_offsets=extended)
+    else:
+        size = len(ds.PixelData) // frames
+        data = ds.PixelData[frame * size : (frame + 1) * size]
+    expected[variant] = base64.b64encode(data).decode()
+print(json.dumps(expected))
+        `,
+                JSON.stringify(Object.fromEntries(indexed.map((variant) => [variant, fixture.files[variant]]))),
+                String(middle),
+            );
+
+            for (const variant of indexed) {
+                const response = await request.get(frameUrl(variant, middle));
+                expect(response.status()).toBe(200);
+                expect(response.headers()['x-frame-count']).toBe(String(fixture.frames));
+                const encapsulated = variant.includes('offsets') || variant.includes('fragment');
+                expect(response.headers()['content-type']).toBe(
+                    encapsulated ? 'image/jpeg' : 'application/octet-stream',
+                );
+                expect((await response.body()).toString('base64')).toBe(expected[variant]);
+            }
+
+            const outOfRange = await request.get(frameUrl('native', fixture.frames));
+            expect(outOfRange.status()).toBe(404);
+            expect((await outOfRange.json()).error).toBe('Frame not found');
+
+            for (const variant of ['big-endian', 'no-table']) {
+                const unindexed = await request.get(frameUrl(variant, middle));
+                expect(unindexed.status()).toBe(404);
+                expect((await unindexed.json()).error).toBe('Slice has no frame index');
+            }
+
+            // A file cut short after the scan no longer holds its last frame.
+            const native = fixture.files.native;
+            fs.truncateSync(native, fs.statSync(native).size - 8);
+            const changed = await request.get(frameUrl('native', fixture.frames - 1));
+            expect(changed.status()).toBe(409);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('slice responses serve byte ranges and revalidate', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const [study] = result.savePayload.studies;
+            const seriesPath = `${study.studyInstanceUid}/${study.series[0].seriesInstanceUid}`;
+            const sliceUrl = `${BASE_URL}/api/library/dicom/${seriesPath}/0`;
+            const whole = await request.get(sliceUrl);
+            expect(whole.headers()['accept-ranges']).toBe('bytes');
+            const size = (await whole.body()).length;
+
+            const magic = await request.get(sliceUrl, { headers: { Range: 'bytes=128-131' } });
+            expect(magic.status()).toBe(206);
+            expect(magic.headers()['content-range']).toBe(`bytes 128-131/${size}`);
+            expect((await magic.body()).toString()).toBe('DICM');
+
+            const beyond = await request.get(sliceUrl, { headers: { Range: `bytes=${size}-` } });
+            expect(beyond.status()).toBe(416);
+
+            expect(whole.headers()['cache-control']).toBe('private, no-cache');
+            const revalidated = await request.get(sliceUrl, { headers: { 'If-None-Match': whole.headers()['etag'] } });
+            expect(revalidated.status()).toBe(304);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('whole slices from the open-file cache still reach wsgi.file_wrapper', async () => {
+        const fixture = createSyntheticDicomFolder([{}]);
+
+        try {
+            // Runs its own app instance: the suite's server cannot show which
+            // body its WSGI server was handed.
+            const result = runPythonJson(
+                `
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_LIBRARY'] = sys.argv[2]
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+os.environ['DICOM_LIBRARY_SLICE_CACHE_MB'] = '0'
+
+from server import create_app
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+
+class SendfileWrapper:
+    """wsgi.file_wrapper of a sendfile server: sends from fileno() at its current offset."""
+
+    filelikes = []
+
+    def __init__(self, filelike, block_size=8192):
+        self.filelike = filelike
+        SendfileWrapper.filelikes.append(filelike)
+
+    def __iter__(self):
+        fd = self.filelike.fileno()
+        offset = os.lseek(fd, 0, os.SEEK_CUR)
+        yield os.pread(fd, os.fstat(fd).st_size - offset, offset)
+
+    def close(self):
+        self.filelike.close()
+
+
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN}
+study = client.get('/api/library/studies', headers=headers).get_json()['studies'][0]
+url = f"/api/library/dicom/{study['studyInstanceUid']}/{study['series'][0]['seriesInstanceUid']}/0"
+environ = {'wsgi.file_wrapper': SendfileWrapper}
+bodies = [client.get(url, headers=headers, environ_overrides=environ).data for _ in range(2)]
+ranged = client.get(url, headers={**headers, 'Range': 'bytes=0-3'}, environ_overrides=environ)
+path = library_routes.library_sources.get_safe_slice_path(
+    study['studyInstanceUid'], study['series'][0]['seriesInstanceUid'], 0
+)
+with open(path, 'rb') as fp:
+    expected = fp.read()
+print(json.dumps({
+    'handleCache': library_routes.slice_handles.enabled,
+    'cachedHandles': len(library_routes.slice_handles),
+    'sendfileBodies': len(SendfileWrapper.filelikes),
+    'sameDescriptor': len({filelike.fileno() for filelike in SendfileWrapper.filelikes}) == 1,
+    'bodiesMatch': all(body == expected for body in bodies),
+    'rangeBytes': ranged.data == expected[:4],
+}))
+        `,
+                fixture.folder,
+            );
+
+            expect(result.handleCache).toBe(true);
+            expect(result.cachedHandles).toBe(1);
+            expect(result.sendfileBodies).toBe(2);
+            expect(result.sameDescriptor).toBe(true);
+            expect(result.bodiesMatch).toBe(true);
+            expect(result.rangeBytes).toBe(true);
+        } finally {
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('repeated slice requests are served from the byte cache', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const [study] = result.savePayload.studies;
+            const seriesPath = `${study.studyInstanceUid}/${study.series[0].seriesInstanceUid}`;
+            const sliceUrl = `${BASE_URL}/api/library/dicom/${seriesPath}/0`;
+            const before = await (await request.get(`${BASE_URL}/api/library/slice-cache`)).json();
+
+            const first = await request.get(sliceUrl);
+            const second = await request.get(sliceUrl);
+            expect(await second.body()).toEqual(await first.body());
+            expect(second.headers()['etag']).toBe(first.headers()['etag']);
+
+            const after = await (await request.get(`${BASE_URL}/api/library/slice-cache`)).json();
+            expect(after.misses).toBe(before.misses + 1);
+            expect(after.hits).toBe(before.hits + 1);
+            expect(after.bytes).toBeGreaterThan(0);
+            expect(after.bytes).toBeLessThanOrEqual(after.maxBytes);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('read-ahead serves the same slice bytes as plain reads', async () => {
+        const fixture = createSyntheticDicomFolder(Array.from({ length: 16 }, () => ({})));
+
+        try {
+            const runs = {};
+            // Read-ahead into the byte cache, into the page cache only, and off.
+            for (const [name, readahead, cacheMb] of [
+                ['memory', '', ''],
+                ['pageCache', '', '0'],
+                ['disabled', '0', ''],
+            ]) {
+                runs[name] = runPythonJson(
+                    `
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_LIBRARY'] = sys.argv[2]
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+os.environ['DICOM_LIBRARY_READAHEAD'] = sys.argv[3]
+os.environ['DICOM_LIBRARY_SLICE_CACHE_MB'] = sys.argv[4]
+
+from server import create_app
+from server.library import readahead
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN}
+study = client.get('/api/library/studies', headers=headers).get_json()['studies'][0]
+series = study['series'][0]
+series_path = f"{study['studyInstanceUid']}/{series['seriesInstanceUid']}"
+warmed = []
+warm_slices = library_routes._warm_slices
+warm_fd = readahead.warm_fd
+fadvised = []
+
+
+def recording_warm_slices(study_id, series_id, indices):
+    warmed.extend(indices)
+    warm_slices(study_id, series_id, indices)
+
+
+def recording_warm_fd(fd):
+    fadvised.append(fd)
+    warm_fd(fd)
+
+
+library_routes._warm_slices = recording_warm_slices
+library_routes.warm_fd = recording_warm_fd
+order = list(range(series['sliceCount'])) + list(range(series['sliceCount'] - 2, -1, -1))
+digests = []
+for index in order:
+    response = client.get(f'/api/library/dicom/{series_path}/{index}', headers=headers)
+    digests.append([index, response.status_code, hashlib.sha256(response.data).hexdigest()])
+    time.sleep(0.02)
+while library_routes.slice_readahead._pending:
+    time.sleep(0.01)
+print(json.dumps({
+    'digests': digests,
+    'warmed': len(warmed),
+    'fadvised': len(fadvised),
+    'cacheHits': library_routes.slice_bytes.stats()['hits'],
+}))
+                `,
+                    fixture.folder,
+                    readahead,
+                    cacheMb,
+                );
+            }
+
+            const { memory, pageCache, disabled } = runs;
+            expect(disabled.digests).toHaveLength(31);
+            expect(disabled.digests.every(([, status]) => status === 200)).toBe(true);
+            expect(memory.digests).toEqual(disabled.digests);
+            expect(pageCache.digests).toEqual(disabled.digests);
+            expect(disabled.warmed).toBe(0);
+            expect(memory.warmed).toBeGreaterThan(0);
+            expect(memory.fadvised).toBe(0);
+            expect(memory.cacheHits).toBeGreaterThan(disabled.cacheHits);
+            expect(pageCache.warmed).toBeGreaterThan(0);
+            expect(pageCache.fadvised).toBeGreaterThan(0);
+        } finally {
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('change feed returns only what changed since a generation', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const { generation } = await (await request.get(`${BASE_URL}/api/library/studies`)).json();
+            fs.rmSync(fixture.entries[0].path);
+            await request.post(`${BASE_URL}/api/library/refresh`);
+
+            const feed = await (await request.get(`${BASE_URL}/api/library/changes?since=${generation}`)).json();
+            expect(feed.reload).toBe(false);
+            expect(feed.generation).toBeGreaterThan(generation);
+            const ops = Object.fromEntries(feed.changes.map((change) => [change.op, change]));
+            expect(ops.studyChanged.study.imageCount).toBe(2);
+            expect(ops.seriesChanged.series.sliceCount).toBe(2);
+
+            const changesUrl = `${BASE_URL}/api/library/changes?since=${feed.generation}`;
+            const upToDate = await (await request.get(changesUrl)).json();
+            expect(upToDate.changes).toEqual([]);
+
+            const stale = await (await request.get(`${BASE_URL}/api/library/changes?since=0`)).json();
+            expect(stale.reload).toBe(true);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('background refresh job reports progress and completes', async ({ request }) => {
+        const fixture = createSyntheticDicomFolder([{}, {}]);
+        let previousConfig = null;
+
+        try {
+            const result = await useLibraryFolder(request, fixture.folder);
+            previousConfig = result.previousConfig;
+
+            const startResponse = await request.post(`${BASE_URL}/api/library/refresh/jobs`);
+            expect(startResponse.status()).toBe(202);
+            const { jobs } = await startResponse.json();
+            expect(jobs).toHaveLength(1);
+            const { jobId, root } = jobs[0];
+            expect(jobId).toBeTruthy();
+            expect(root).toBe(0);
+
+            let job = null;
+            await expect
+                .poll(async () => {
+                    job = await (await request.get(`${BASE_URL}/api/library/jobs/${jobId}`)).json();
+                    return job.status;
+                })
+                .toBe('done');
+            expect(job.imageCount).toBe(2);
+            expect(job.scan.finished).toBe(true);
+
+            const missing = await request.get(`${BASE_URL}/api/library/jobs/does-not-exist`);
+            expect(missing.status()).toBe(404);
+        } finally {
+            await restoreLibraryFolder(request, previousConfig);
+            removeSyntheticDicomFolder(fixture.folder);
+        }
+    });
+
+    test('a folder switch during the first scan does not rescan the old folder', async () => {
+        const slow = createSyntheticDicomFolder(Array.from({ length: 300 }, () => ({})));
+        const other = createSyntheticDicomFolder([{}]);
+
+        try {
+            // Parsing is slowed so the switch lands mid-scan. The cancelled
+            // scan (a request's get_data() or a preload) must wait for the
+            // switch, not claim a fresh scan of the folder it was scanning.
+            const results = runPythonJson(
+                `
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+
+from server.library import scan_pool
+from server.routes import library as library_routes
+
+parse = scan_pool.scan_dicom_file
+
+
+def slow_parse(path, header_mode):
+    time.sleep(0.01)
+    return parse(path, header_mode)
+
+
+scan_pool.scan_dicom_file = slow_parse
+old_folder, new_folder = sys.argv[2], sys.argv[3]
+results = []
+for start in ('get_data', 'preload'):
+    source = library_routes.DicomFolderSource(
+        old_folder, scan_options={'engine': 'thread', 'workers': 2}
+    )
+    scanned = []
+    scan = source._scan
+
+    def counting_scan(folder_path, *args, scan=scan, scanned=scanned, **kwargs):
+        scanned.append(folder_path)
+        return scan(folder_path, *args, **kwargs)
+
+    source._scan = counting_scan
+    loaded = []
+    if start == 'get_data':
+        loader = threading.Thread(target=lambda: loaded.append(source.get_data()))
+        loader.start()
+    else:
+        source.preload()
+    time.sleep(0.1)
+    started = time.monotonic()
+    studies = source.set_folder(new_folder)
+    elapsed = time.monotonic() - started
+    if start == 'get_data':
+        loader.join()
+    results.append({
+        'start': start,
+        'scanned': [folder == old_folder and 'old' or 'new' for folder in scanned],
+        'switchSeconds': elapsed,
+        'loaderGotNewFolder': all(result is studies for result in loaded),
+    })
+print(json.dumps(results))
+        `,
+                slow.folder,
+                other.folder,
+            );
+
+            for (const result of results) {
+                expect(result.scanned).toEqual(['old', 'new']);
+                expect(result.loaderGotNewFolder).toBe(true);
+                expect(result.switchSeconds).toBeLessThan(1);
+            }
+        } finally {
+            removeSyntheticDicomFolder(slow.folder);
+            removeSyntheticDicomFolder(other.folder);
+        }
+    });
+
+    test('switching folders cancels a scan in progress and keeps its parsed files', async () => {
+        const slow = createSyntheticDicomFolder(Array.from({ length: 300 }, () => ({})));
+        const other = createSyntheticDicomFolder([{}]);
+
+        try {
+            const result = runPythonJson(
+                `
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+os.environ.pop('DICOM_LIBRARY', None)
+os.environ['DICOM_LIBRARY_SCAN_ENGINE'] = 'thread'
+os.environ['DICOM_LIBRARY_SCAN_WORKERS'] = '2'
+
+from server import create_app
+from server.library import scan_pool
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+slow_folder, other_folder = sys.argv[2], sys.argv[3]
+parse = scan_pool.scan_dicom_file
+
+
+def slow_parse(path, header_mode):
+    time.sleep(0.01)
+    return parse(path, header_mode)
+
+
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN, 'Origin': 'http://localhost'}
+source = library_routes.library_source
+scan_pool.scan_dicom_file = slow_parse
+superseded = []
+scan = threading.Thread(
+    target=lambda: superseded.append(
+        client.post('/api/library/config', json={'folder': slow_folder}, headers=headers)
+    )
+)
+scan.start()
+while source.last_scan_stats is None or source.last_scan_stats.files_parsed < 20:
+    time.sleep(0.01)
+cancelled_stats = source.last_scan_stats
+started = time.monotonic()
+switched = client.post('/api/library/config', json={'folder': other_folder}, headers=headers)
+switch_seconds = time.monotonic() - started
+scan.join()
+parsed_before = cancelled_stats.files_parsed
+
+scan_pool.scan_dicom_file = parse
+back = client.post('/api/library/config', json={'folder': slow_folder}, headers=headers)
+rescan = source.last_scan_stats.to_dict()
+print(json.dumps({
+    'switchStatus': switched.status_code,
+    'switchSeconds': switch_seconds,
+    'supersededStatus': superseded[0].status_code,
+    'parsedBeforeCancel': parsed_before,
+    'walkedBeforeCancel': cancelled_stats.files_walked,
+    'backStatus': back.status_code,
+    'rescanCached': rescan['filesCached'],
+    'rescanParsed': rescan['filesParsed'],
+    'images': sum(study['imageCount'] for study in back.get_json()['studies']),
+}))
+        `,
+                slow.folder,
+                other.folder,
+            );
+
+            expect(result.switchStatus).toBe(200);
+            expect(result.switchSeconds).toBeLessThan(1);
+            expect(result.supersededStatus).toBe(409);
+            expect(result.parsedBeforeCancel).toBeGreaterThan(0);
+            expect(result.backStatus).toBe(200);
+            expect(result.rescanCached).toBeGreaterThanOrEqual(result.parsedBeforeCancel);
+            expect(result.rescanCached + result.rescanParsed).toBe(300);
+            expect(result.images).toBe(300);
+        } finally {
+            removeSyntheticDicomFolder(slow.folder);
+            removeSyntheticDicomFolder(other.folder);
+        }
+    });
+
+    test('process scan engine lists the same studies as the thread engine', async () => {
+        const library = createSyntheticDicomFolder(
+            Array.from({ length: 24 }, (_, index) => ({ seriesNumber: (index % 3) + 1 })),
+        );
+        const other = createSyntheticDicomFolder([{ modality: 'CT' }, { modality: 'CT' }]);
+        fs.cpSync(other.folder, path.join(library.folder, 'nested', 'other'), { recursive: true });
+        fs.writeFileSync(path.join(library.folder, 'nested', 'notes.txt'), 'not dicom');
+
+        try {
+            const listings = {};
+            for (const engine of ['thread', 'process']) {
+                listings[engine] = runPythonJson(
+                    `
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+os.environ['DICOM_LIBRARY'] = sys.argv[2]
+os.environ['DICOM_LIBRARY_SCAN_ENGINE'] = sys.argv[3]
+os.environ['DICOM_LIBRARY_SCAN_WORKERS'] = '2'
+
+from server import create_app
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+client = create_app().test_client()
+response = client.get('/api/library/studies', headers={'X-Session-Token': SESSION_TOKEN})
+source = library_routes.library_source
+print(json.dumps({
+    'status': response.status_code,
+    'engine': source.scan_options.get('engine'),
+    'parsed': source.last_scan_stats.files_parsed,
+    'studies': sorted(response.get_json()['studies'], key=lambda study: study['studyInstanceUid']),
+}))
+                `,
+                    library.folder,
+                    engine,
+                );
+            }
+
+            const { thread, process: processListing } = listings;
+            expect(thread.status).toBe(200);
+            expect(processListing.status).toBe(200);
+            expect(thread.engine).toBe('thread');
+            expect(processListing.engine).toBe('process');
+            expect(processListing.parsed).toBe(thread.parsed);
+            expect(thread.studies.map((study) => study.studyInstanceUid)).toEqual(
+                [library.studyUid, other.studyUid].sort(),
+            );
+            expect(processListing.studies).toEqual(thread.studies);
+        } finally {
+            removeSyntheticDicomFolder(library.folder);
+            removeSyntheticDicomFolder(other.folder);
+        }
+    });
+
+    test('switching back to a recent folder reuses it until its root changes', async () => {
+        const first = createSyntheticDicomFolder([{}, {}]);
+        const second = createSyntheticDicomFolder([{}]);
+
+        try {
+            const result = runPythonJson(
+                `
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+os.environ.pop('DICOM_LIBRARY', None)
+
+from server import create_app
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+first_folder, second_folder = sys.argv[2], sys.argv[3]
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN, 'Origin': 'http://localhost'}
+source = library_routes.library_source
+scans = []
+scan = source._scan
+
+
+def recording_scan(folder_path, *args, **kwargs):
+    # Scans run by the request itself, not by the background refresh.
+    if threading.current_thread() is threading.main_thread():
+        scans.append(os.path.basename(folder_path))
+    return scan(folder_path, *args, **kwargs)
+
+
+def switch(folder):
+    jobs = len(source._jobs)
+    response = client.post('/api/library/config', json={'folder': folder}, headers=headers)
+    job = list(source._jobs.values())[-1] if len(source._jobs) > jobs else None
+    while job is not None and job.running:
+        time.sleep(0.01)
+    return response, job
+
+
+source._scan = recording_scan
+switch(first_folder)
+switch(second_folder)
+del scans[:]
+back, refresh = switch(first_folder)
+reused = list(scans)
+
+with open(os.path.join(first_folder, 'notes.txt'), 'w') as handle:
+    handle.write('not dicom')
+mtime_ns = os.stat(first_folder).st_mtime_ns + 1000000000
+os.utime(first_folder, ns=(mtime_ns, mtime_ns))
+switch(second_folder)
+del scans[:]
+changed, _ = switch(first_folder)
+print(json.dumps({
+    'backStatus': back.status_code,
+    'backImages': sum(study['imageCount'] for study in back.get_json()['studies']),
+    'scansOnReturn': reused,
+    'refreshStatus': refresh and refresh.to_dict()['status'],
+    'refreshParsed': refresh and refresh.stats.files_parsed,
+    'changedStatus': changed.status_code,
+    'scansAfterChange': scans,
+    'changedImages': sum(study['imageCount'] for study in changed.get_json()['studies']),
+}))
+        `,
+                first.folder,
+                second.folder,
+            );
+
+            expect(result.backStatus).toBe(200);
+            expect(result.backImages).toBe(2);
+            expect(result.scansOnReturn).toEqual([]);
+            // The background check after a restore only stats files the index knows.
+            expect(result.refreshStatus).toBe('done');
+            expect(result.refreshParsed).toBe(0);
+            expect(result.changedStatus).toBe(200);
+            expect(result.scansAfterChange).toEqual([path.basename(first.folder)]);
+            expect(result.changedImages).toBe(2);
+        } finally {
+            removeSyntheticDicomFolder(first.folder);
+            removeSyntheticDicomFolder(second.folder);
+        }
+    });
+
+    for (const mode of ['inotify', 'poll']) {
+        test(`watched root (${mode}) feeds added and removed studies to the change feed`, async () => {
+            test.skip(mode === 'inotify' && process.platform !== 'linux', 'inotify is Linux only');
+            const root = createSyntheticDicomFolder([{}]);
+            const incoming = createSyntheticDicomFolder([{}, {}]);
+
+            try {
+                // The poll backend checks directory mtimes every 5 seconds.
+                const result = runPythonJson(
+                    `
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, sys.argv[1])
+root, incoming, mode = sys.argv[2], sys.argv[3], sys.argv[4]
+os.environ['DICOM_LIBRARY'] = root
+os.environ['DICOM_LIBRARY_WATCH'] = mode
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+
+from server import create_app
+from server.routes import library as library_routes
+from server.security import SESSION_TOKEN
+
+client = create_app().test_client()
+headers = {'X-Session-Token': SESSION_TOKEN}
+listing = client.get('/api/library/studies', headers=headers).get_json()
+
+
+def wait_for_change(since, op, study_uid):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        feed = client.get(f'/api/library/changes?since={since}', headers=headers).get_json()
+        for change in feed['changes']:
+            if change['op'] == op and change['studyInstanceUid'] == study_uid:
+                return feed
+        time.sleep(0.2)
+    return None
+
+
+study_uid = sys.argv[5]
+copied = os.path.join(root, 'incoming-study')
+shutil.copytree(incoming, copied)
+added = wait_for_change(listing['generation'], 'studyAdded', study_uid)
+shutil.rmtree(copied)
+removed = wait_for_change(added['generation'], 'studyRemoved', study_uid) if added else None
+added_study = added and next(c['study'] for c in added['changes'] if c['op'] == 'studyAdded')
+print(json.dumps({
+    'backend': library_routes.library_source._watcher.backend_name,
+    'added': added is not None,
+    'addedImages': added_study and added_study['imageCount'],
+    'removed': removed is not None,
+    'listedAfter': [
+        study['studyInstanceUid']
+        for study in client.get('/api/library/studies', headers=headers).get_json()['studies']
+    ],
+}))
+            `,
+                    root.folder,
+                    incoming.folder,
+                    mode,
+                    incoming.studyUid,
+                );
+
+                expect(result.backend).toBe(mode);
+                expect(result.added).toBe(true);
+                expect(result.addedImages).toBe(2);
+                expect(result.removed).toBe(true);
+                expect(result.listedAfter).toEqual([root.studyUid]);
+            } finally {
+                removeSyntheticDicomFolder(root.folder);
+                removeSyntheticDicomFolder(incoming.folder);
+            }
+        });
+    }
+
+    test('watcher debounces bursts and falls back to a refresh job on overflow', async () => {
+        const root = createSyntheticDicomFolder([{}]);
+
+        try {
+            const result = runPythonJson(
+                `
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DICOM_LIBRARY'] = sys.argv[2]
+os.environ['DICOM_LIBRARY_WATCH'] = 'auto'
+os.environ['DICOM_VIEWER_DATA_DIR'] = tempfile.mkdtemp()
+
+from server.library import watcher as watcher_module
+from server.library.watcher import FolderWatcher
+
+# Debounce: files written in quick succession arrive as one batch.
+batches = []
+flushed = threading.Event()
+folder = tempfile.mkdtemp()
+watcher = FolderWatcher(
+    folder,
+    on_changes=lambda changed, removed: (
+        batches.append(sorted(os.path.basename(path) for path in changed)),
+        flushed.set(),
+    ),
+    mode='poll',
+    debounce=0.5,
+    poll_interval=0.1,
+)
+watcher.start()
+for index in range(5):
+    with open(os.path.join(folder, f'file-{index}.dcm'), 'wb') as fp:
+        fp.write(b'x')
+    time.sleep(0.05)
+flushed.wait(10)
+time.sleep(1)
+watcher.stop()
+
+
+class OverflowBackend:
+    """Reports lost events once, like an inotify queue overflow."""
+
+    name = 'overflow'
+
+    def __init__(self):
+        self.events = [[(watcher_module.OVERFLOW, None)]]
+
+    def read(self, timeout):
+        if self.events:
+            return self.events.pop()
+        time.sleep(timeout)
+        return []
+
+    def close(self):
+        pass
+
+
+# Overflow: the library source falls back to a background refresh job.
+FolderWatcher._open_backend = lambda self: OverflowBackend()
+from server import create_app
+from server.routes import library as library_routes
+
+create_app()
+source = library_routes.library_source
+source.get_data()
+deadline = time.monotonic() + 10
+while time.monotonic() < deadline and not source._jobs:
+    time.sleep(0.1)
+jobs = list(source._jobs.values())
+while jobs and jobs[0].running and time.monotonic() < deadline:
+    time.sleep(0.1)
+print(json.dumps({
+    'batches': batches,
+    'overflowJobs': len(jobs),
+    'overflowJobStatus': jobs[0].status if jobs else None,
+}))
+        `,
+                root.folder,
+            );
+
+            expect(result.batches).toEqual([[0, 1, 2, 3, 4].map((index) => `file-${index}.dcm`)]);
+            expect(result.overflowJobs).toBe(1);
+            expect(result.overflowJobStatus).toBe('done');
+        } finally {
+            removeSyntheticDicomFolder(root.folder);
+        }
+    });
+});